@@ -0,0 +1,40 @@
+"""
+- Description: benchmark of the batched augmentations against a per-clip loop.
+    Usage: python benchmarks/bench_batch.py [n_clips] [n_samples]
+"""
+import sys
+import numpy as np
+from pydiogment import ops, batch
+from common import timeit
+
+
+if __name__ == "__main__":
+    n_clips = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    n_samples = int(sys.argv[2]) if len(sys.argv) > 2 else 16000
+    fs = 16000
+    sigs = np.random.uniform(-0.5, 0.5, (n_clips, n_samples))
+    snrs = np.random.choice([0, 5, 10, 20], n_clips)
+    gains = np.random.choice([-50, -25, -3], n_clips)
+    shifts = np.random.choice([0.1, 0.2, 0.5], n_clips)
+
+    cases = [("add_noise",
+              lambda: [ops.add_noise(sig, fs, snr) for sig, snr in zip(sigs, snrs)],
+              lambda: batch.add_noise(sigs, fs, snrs)),
+             ("apply_gain",
+              lambda: [ops.apply_gain(sig, fs, gain) for sig, gain in zip(sigs, gains)],
+              lambda: batch.apply_gain(sigs, fs, gains)),
+             ("fade_in_and_out",
+              lambda: [ops.fade_in_and_out(sig, fs) for sig in sigs],
+              lambda: batch.fade_in_and_out(sigs, fs)),
+             ("shift_time",
+              lambda: [ops.shift_time(sig, fs, t, "left") for sig, t in zip(sigs, shifts)],
+              lambda: batch.shift_time(sigs, fs, shifts, "left")),
+             ("reverse",
+              lambda: [ops.reverse(sig, fs) for sig in sigs],
+              lambda: batch.reverse(sigs, fs))]
+
+    print("%d clips of %d samples" % (n_clips, n_samples))
+    print("%-16s %12s %12s %8s" % ("operation", "loop (s)", "batch (s)", "speedup"))
+    for name, loop, batched in cases:
+        t_loop, t_batch = timeit(loop), timeit(batched)
+        print("%-16s %12.4f %12.4f %7.1fx" % (name, t_loop, t_batch, t_loop / t_batch))
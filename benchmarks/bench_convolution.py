@@ -0,0 +1,35 @@
+"""
+- Description: benchmark of the direct convolution against the overlap-add FFT
+    convolution for growing impulse response lengths, to locate their crossover,
+    and of an IR bank against one FFT convolution per impulse response.
+    Usage: python benchmarks/bench_convolution.py [duration] [fs]
+"""
+import sys
+import numpy as np
+from pydiogment.utils.convolution import convolve, IRBank
+from common import timeit
+
+
+if __name__ == "__main__":
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+    fs = int(sys.argv[2]) if len(sys.argv) > 2 else 16000
+    sig = np.random.uniform(-0.5, 0.5, int(duration * fs))
+
+    print("%.1f s signal at %d Hz, output truncated to the signal length" % (duration, fs))
+    print("%-10s %12s %12s %12s %8s" % ("ir length", "direct (s)", "fft (s)", "fft32 (s)", "speedup"))
+    for ir_length in [16, 64, 128, 256, 512, 1024, 4096, 16000, 64000]:
+        ir = np.random.uniform(-0.5, 0.5, ir_length) * np.exp(-np.arange(ir_length) / (0.1 * fs))
+        t_direct = timeit(lambda: convolve(sig, ir, len(sig), "direct"), 1 if ir_length > 4096 else 3)
+        t_fft = timeit(lambda: convolve(sig, ir, len(sig), "fft"))
+        t_fft32 = timeit(lambda: convolve(sig, ir, len(sig), "fft", np.float32))
+        print("%-10d %12.4f %12.4f %12.4f %7.1fx" % (ir_length, t_direct, t_fft, t_fft32,
+                                                     t_direct / t_fft))
+
+    irs = [np.random.uniform(-0.5, 0.5, int(0.5 * fs)) for _ in range(40)]
+    bank = IRBank(irs)
+    t_loop = timeit(lambda: [convolve(sig, ir, len(sig), "fft") for ir in irs])
+    t_bank = timeit(lambda: bank.convolve(sig, len(sig)))
+    print()
+    print("%d impulse responses of 0.5 s" % len(irs))
+    print("%-10s %12s %12s %8s" % ("", "loop (s)", "bank (s)", "speedup"))
+    print("%-10s %12.4f %12.4f %7.1fx" % ("", t_loop, t_bank, t_loop / t_bank))
@@ -0,0 +1,29 @@
+"""
+- Description: benchmark of the FilterBank "iir" method against the "fft"
+    method for growing filter orders, to locate the crossover behind the
+    "auto" method defaults (FilterBank.fft_min_sections and fft_max_length).
+    Usage: python benchmarks/bench_filters.py [duration] [fs]
+"""
+import sys
+import numpy as np
+from pydiogment.utils.filters import FilterBank
+from common import timeit
+
+
+if __name__ == "__main__":
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+    fs = int(sys.argv[2]) if len(sys.argv) > 2 else 16000
+    sig = np.random.uniform(-0.5, 0.5, int(duration * fs))
+    bands = [("low", 500, None), ("high", None, 4000), ("band", 300, 3000), ("band", 1000, 2000)]
+
+    print("%.1f s signal at %d Hz, %d bands" % (duration, fs, len(bands)))
+    print("%-6s %9s %10s %12s %12s %8s" % ("order", "sections", "ir length", "iir (s)",
+                                           "fft (s)", "speedup"))
+    for order in [2, 3, 4, 5, 6, 8, 10, 12]:
+        iir, fft = FilterBank(bands, order, "iir"), FilterBank(bands, order, "fft")
+        sections = np.mean([len(sos) for sos in iir.get_sos(fs)])
+        ir_length = max(len(ir) for ir in fft.get_ir_bank(fs).irs)
+        t_iir = timeit(lambda: iir.apply(sig, fs))
+        t_fft = timeit(lambda: fft.apply(sig, fs))
+        print("%-6d %9.1f %10d %12.4f %12.4f %7.1fx" % (order, sections, ir_length, t_iir,
+                                                        t_fft, t_iir / t_fft))
@@ -0,0 +1,36 @@
+"""
+- Description: benchmark of the noise injection with the legacy global
+    generator against the seeded float64 and float32 paths.
+    Usage: python benchmarks/bench_noise.py [n_clips] [duration]
+"""
+import sys
+import numpy as np
+from pydiogment import batch
+from common import timeit
+
+
+def add_noise_legacy(sigs, snr):
+    """
+    Inject noise like batch.add_noise with the legacy np.random.randn.
+    """
+    noise = np.random.randn(*sigs.shape)
+    noise_power = np.mean(np.square(noise), axis=1, keepdims=True)
+    sig_power = np.mean(np.square(sigs), axis=1, keepdims=True)
+    noise *= np.sqrt((sig_power / noise_power) * (1 / 10**(snr / 10.0)))
+    noise += sigs
+    return noise
+
+
+if __name__ == "__main__":
+    n_clips = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    fs, snr = 16000, 10
+
+    print("%d clips of %.1f s at %d Hz" % (n_clips, duration, fs))
+    print("%-10s %10s" % ("path", "time (s)"))
+    sigs = np.random.uniform(-0.5, 0.5, (n_clips, int(duration * fs)))
+    print("%-10s %10.4f" % ("legacy", timeit(lambda: add_noise_legacy(sigs, snr))))
+    print("%-10s %10.4f" % ("float64", timeit(lambda: batch.add_noise(sigs, fs, snr, seed=0))))
+    sigs32 = sigs.astype(np.float32)
+    print("%-10s %10.4f" % ("float32", timeit(lambda: batch.add_noise(sigs32, fs, snr, seed=0,
+                                                                       dtype=np.float32))))
@@ -0,0 +1,33 @@
+"""
+- Description: benchmark of the cached polyphase resampler against designing
+    the same filter on every call.
+    Usage: python benchmarks/bench_resample.py [n_clips] [duration]
+"""
+import sys
+import numpy as np
+from scipy.signal import resample_poly
+from pydiogment.utils.resample import get_filter, resample
+from common import timeit
+
+
+def resample_uncached(sig, fs_in, fs_out):
+    """
+    Resample like utils.resample.resample but design the filter again.
+    """
+    up, down, h = get_filter.__wrapped__(fs_in, fs_out)
+    return resample_poly(sig, up, down, window=h)
+
+
+if __name__ == "__main__":
+    n_clips = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    fs_out = 16000
+
+    print("%d clips of %.1f s resampled to %d Hz" % (n_clips, duration, fs_out))
+    print("%-8s %12s %12s %12s" % ("fs_in", "uncached (s)", "cached (s)", "batch (s)"))
+    for fs_in in [44100, 48000, 22050]:
+        sigs = np.random.uniform(-0.5, 0.5, (n_clips, int(duration * fs_in)))
+        t_uncached = timeit(lambda: [resample_uncached(sig, fs_in, fs_out) for sig in sigs])
+        t_cached = timeit(lambda: [resample(sig, fs_in, fs_out) for sig in sigs])
+        t_batch = timeit(lambda: resample(sigs, fs_in, fs_out))
+        print("%-8d %12.4f %12.4f %12.4f" % (fs_in, t_uncached, t_cached, t_batch))
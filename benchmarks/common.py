@@ -0,0 +1,17 @@
+"""
+- Description: helpers shared by the benchmark scripts, which import this
+    module from their own directory.
+"""
+import time
+
+
+def timeit(func, repeat=3):
+    """
+    Return the best run time of func in seconds.
+    """
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - t0)
+    return min(times)
@@ -1,18 +1,23 @@
 import os
 from pydiogment import auga, augf, augt
+from pydiogment.utils.io import AsyncWriter, AudioCache
 
 
 def augment_file(test_file):
     """
     Generate audio augmentations from one file.
+
+    Returns:
+        list of (name, future) tuples of the ffmpeg commands still running.
     """
+    futures = []
     try:
-        augt.slowdown(test_file, coefficient=0.8)
+        futures.append(("slow_down", augt.slow_down(test_file, coefficient=0.8)))
     except Exception:
-        print("cannot %10s for %20s" % ("slowdown", test_file))
+        print("cannot %10s for %20s" % ("slow_down", test_file))
 
     try:
-        augt.speed(test_file, coefficient=1.2)
+        futures.append(("speed", augt.speed(test_file, coefficient=1.2)))
     except Exception:
         print("cannot %10s for %20s" % ("speed", test_file))
 
@@ -57,14 +62,15 @@ def augment_file(test_file):
         print("cannot %10s for %20s" % ("convolve", test_file))
 
     try:
-        augf.change_tone(test_file, .9)
+        futures.append(("change_tone", augf.change_tone(test_file, .9)))
     except Exception:
         print("cannot %10s for %20s" % ("change_tone", test_file))
 
     try:
-        augf.change_tone(test_file, 1.1)
+        futures.append(("change_tone", augf.change_tone(test_file, 1.1)))
     except Exception:
         print("cannot %10s for %20s" % ("change_tone", test_file))
+    return futures
 
 
 if __name__ == "__main__":
@@ -80,7 +86,15 @@ if __name__ == "__main__":
     print("                      Start Augmenting                       ")
     print("-" * 61)
 
-    # augment files
-    for wave_fname in wave_fnames[:]:
-        augment_file(wave_fname)
-        print("-" * 61)
+    # augment files, every input is decoded once and outputs are written in the background
+    with AudioCache(), AsyncWriter(workers=2):
+        for wave_fname in wave_fnames[:]:
+            futures = augment_file(wave_fname)
+
+            # wait for the ffmpeg commands, their errors are raised here
+            for name, future in futures:
+                try:
+                    future.result()
+                except Exception:
+                    print("cannot %10s for %20s" % (name, wave_fname))
+            print("-" * 61)
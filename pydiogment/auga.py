@@ -2,7 +2,7 @@
 - Description: amplitude based augmentation techniques/manipulations for audio data.
 """
 import os
-import numpy as np
+from . import ops
 from .utils.io import read_file, write_file
 
 
@@ -18,10 +18,7 @@ def apply_gain(infile, gain):
     fs, x = read_file(filename=infile)
 
     # apply gain
-    x = np.copy(x)
-    x = x * (10**(gain / 10.0))
-    x = np.minimum(np.maximum(-1.0, x), 1.0)
-    x /= np.mean(np.abs(x))
+    x = ops.apply_gain(x, fs, gain)
 
     # export data to file
     output_file_path = os.path.dirname(infile)
@@ -33,33 +30,26 @@ def apply_gain(infile, gain):
                fs=fs)
 
 
-def add_noise(infile, snr):
+def add_noise(infile, snr, seed=None, dtype=None):
     """
     Augment data using noise injection.
 
     Note:
         It simply add some random values to the input file data based on the snr.
+        The same seed gives the same output file.
 
     Args:
-        infile (str) : input filename/path.
-        snr    (int) : signal to noise ratio in dB.
+        infile                      (str) : input filename/path.
+        snr                         (int) : signal to noise ratio in dB.
+        seed (int/SeedSequence/Generator) : seed or generator of the noise.
+        dtype                     (dtype) : noise and output type, float32 (faster)
+                                             or float64 (default).
     """
     # read input file
     fs, sig = read_file(filename=infile)
 
-    # compute and apply noise
-    noise = np.random.randn(len(sig))
-
-    # compute powers
-    noise_power = np.mean(np.power(noise, 2))
-    sig_power = np.mean(np.power(sig, 2))
-
-    # compute snr and scaling factor
-    snr_linear = 10**(snr / 10.0)
-    noise_factor = (sig_power / noise_power) * (1 / snr_linear)
-
     # add noise
-    y = sig + np.sqrt(noise_factor) * noise
+    y = ops.add_noise(sig, fs, snr, seed, dtype)
 
     # construct file names
     output_file_path = os.path.dirname(infile)
@@ -82,16 +72,13 @@ def fade_in_and_out(infile):
     """
     # read input file
     fs, sig = read_file(filename=infile)
-    window = np.hamming(len(sig))
 
     # construct file names
     output_file_path = os.path.dirname(infile)
     name_attribute = "_augmented_fade_in_out.wav"
 
     # fade in and out
-    window = np.hamming(len(sig))
-    augmented_sig = window * sig
-    augmented_sig /= np.mean(np.abs(augmented_sig))
+    augmented_sig = ops.fade_in_and_out(sig, fs)
 
     # export data to file
     write_file(output_file_path=output_file_path,
@@ -114,19 +101,7 @@ def normalize(infile, normalization_technique="peak", rms_level=0):
     fs, sig = read_file(filename=infile)
 
     # normalize signal
-    if normalization_technique == "peak" :
-        y = sig / np.max(sig)
-
-    elif normalization_technique == "rms":
-        # linear rms level and scaling factor
-        r = 10**(rms_level / 10.0)
-        a = np.sqrt( (len(sig) * r**2) / np.sum(sig**2) )
-
-        # normalize
-        y = sig * a
-
-    else :
-        print("ParameterError: Unknown normalization_technique variable.")
+    y = ops.normalize(sig, fs, normalization_technique, rms_level)
 
     # construct file names
     output_file_path = os.path.dirname(infile)
@@ -2,10 +2,11 @@
 - Description: frequency based augmentation techniques/manipulations for audio data.
 """
 import os
-import subprocess
 import numpy as np
-from .utils.filters import butter_filter
-from .utils.io import read_file, write_file
+from . import ops
+from .utils.io import read_file, read_info, write_file, read_chunks, write_file_chunks, cast_samples
+from .utils.filters import BlockFilter
+from .utils.ffmpeg import get_runner, report
 
 
 def convolve(infile, ir_fname, level=0.5):
@@ -19,16 +20,12 @@ def convolve(infile, ir_fname, level=0.5):
     """
     # read input file
     fs1, x = read_file(filename=infile)
-    x = np.copy(x)
 
     # change the path below for the sounds folder
     _, ir = read_file(filename=ir_fname)
 
     # apply convolution
-    y = np.convolve(x, ir, 'full')[0:x.shape[0]] * level + x * (1 - level)
-
-    # normalize
-    y /= np.mean(np.abs(y))
+    y = ops.convolve(x, fs1, ir, level)
 
     # export data to file
     output_file_path = os.path.dirname(infile)
@@ -41,16 +38,63 @@ def convolve(infile, ir_fname, level=0.5):
                fs=fs1)
 
 
-def change_tone(infile, tone):
+def convolve_bank(infile, bank, level=0.5):
     """
-    Change the tone of an audio file.
+    Apply convolution to infile with every impulse response of a bank.
+
+    Note:
+        The input is transformed once for all impulse responses and the bank
+        caches their spectra, use one bank for all the files.
 
     Args:
-        infile (str) : input audio filename.
-        tone   (int) : tone to change.
+        infile  (str) : input filename/path.
+        bank (IRBank) : impulse responses, see utils.convolution.IRBank.
+        level (float) : can be between 0 and 1, default value = 0.5
+
+    Returns:
+        array of shape (n_irs, n_samples) of the augmented signals.
     """
     # read input file
-    fs, _ = read_file(filename=infile)
+    fs, x = read_file(filename=infile)
+
+    # apply convolutions
+    x = np.asarray(x, dtype=np.float64)
+    ys = bank.convolve(x, len(x)) * level + x * (1 - level)
+
+    # normalize
+    ys /= np.mean(np.abs(ys), axis=1, keepdims=True)
+
+    # export data to files
+    output_file_path = os.path.dirname(infile)
+    for name, y in zip(bank.names, ys):
+        name_attribute = "_augmented_{0}_convolved_with_level_{1}.wav".format(name, level)
+        write_file(output_file_path=output_file_path,
+                   input_file_name=infile,
+                   name_attribute=name_attribute,
+                   sig=y,
+                   fs=fs)
+    return ys
+
+
+def change_tone(infile, tone, runner=None, backend="ffmpeg"):
+    """
+    Change the tone of an audio file.
+
+    Note:
+        The ffmpeg backend also scales the duration by 1 / tone, the native
+        backend keeps the duration of the input.
+
+    Args:
+        infile          (str) : input audio filename.
+        tone            (int) : tone to change.
+        runner (FFmpegRunner) : runner of the ffmpeg command, by default the shared one.
+        backend         (str) : "ffmpeg" or "native" to pitch shift in-process (see ops.change_tone).
+
+    Returns:
+        future of the ffmpeg process (see FFmpegRunner.submit), None with the native backend.
+    """
+    # read the sampling rate only, ffmpeg decodes the file itself
+    fs, _ = read_info(infile)
 
     # prepare file names for the tone changing command
     input_file_name = os.path.basename(infile).split(".wav")[0]
@@ -58,42 +102,97 @@ def change_tone(infile, tone):
     name_attribute = "_augmented_%s_toned.wav" % str(tone)
     outfile = os.path.join(output_file_path, input_file_name + name_attribute)
 
+    if backend == "native":
+        fs, sig = read_file(filename=infile)
+        write_file(output_file_path=output_file_path,
+                   input_file_name=infile,
+                   name_attribute=name_attribute,
+                   sig=cast_samples(ops.change_tone(sig, fs, tone), sig.dtype),
+                   fs=fs)
+        return None
+
     # change tone
-    tone_change_command = ["ffmpeg", "-i", infile, "-af",
+    tone_change_command = ["ffmpeg", "-y", "-i", infile, "-af",
                            "asetrate="+str(fs) + "*" + str(tone) + ",aresample=" + str(fs),
                            outfile]
-
-    _ = subprocess.Popen(tone_change_command,
-                         stdin=subprocess.PIPE,
-                         stdout=subprocess.PIPE,
-                         stderr=subprocess.PIPE)
+    return report((runner or get_runner()).submit(tone_change_command), outfile)
 
 
-def apply_filter(infile, filter_type, low_cutoff_freq, high_cutoff_freq=None, order=5):
+def apply_filter(infile, filter_type, low_cutoff_freq, high_cutoff_freq=None, order=5,
+                 block_size=None):
     """
     Apply a certain type of Buttenworth filter on the input audio.
 
+    Note:
+        With a block_size the file is streamed through a block filter carrying
+        its state (see utils.filters.BlockFilter) and written block by block,
+        so memory is bounded and the output is identical to the one-shot path.
+        The output format and writer hooks apply as in the one-shot path, see
+        utils.io.write_file_chunks.
+
     Args:
         infile             (str) : input audio filename.
         filter_type        (str) : type of the filter to apply.
         low_cutoff_freq  (float) : the low cut-off frequency of the filter.
         high_cutoff_freq (float) : the high cut-off frequency of the filter.
         order              (int) : filter order to define its accuracy.
+        block_size         (int) : number of samples per block to stream the file, None to read it at once.
     """
+    # set-up variables for paths and file names
+    output_file_path = os.path.dirname(infile)
+    name_attribute = "_augmented_{0}_pass_filtered.wav".format(filter_type)
+
+    if block_size is not None:
+        fs, _ = read_info(infile)
+
+        def filtered():
+            # stream the file through a new filter on every pass
+            _, chunks = read_chunks(infile, block_size)
+            block_filter = BlockFilter.from_parameters(filter_type, fs, low_cutoff_freq,
+                                                       high_cutoff_freq, order)
+            return block_filter.stream(chunks)
+
+        write_file_chunks(output_file_path, infile, name_attribute, filtered, fs)
+        return
+
     # read input file
     fs, sig = read_file(filename=infile)
 
     # apply filter
-    y = butter_filter(sig=sig, fs=fs, ftype=filter_type,
-                      low_cut=low_cutoff_freq,
-                      high_cut=high_cutoff_freq,
-                      order=order)
+    y = ops.apply_filter(sig, fs, filter_type, low_cutoff_freq,
+                         high_cutoff_freq, order)
 
     # export data to file
-    output_file_path = os.path.dirname(infile)
-    name_attribute = "_augmented_{0}_pass_filtered.wav".format(filter_type)
     write_file(output_file_path=output_file_path,
                input_file_name=infile,
                name_attribute=name_attribute,
                sig=y,
                fs=fs)
+
+
+def apply_filter_bank(infile, bank):
+    """
+    Apply every filter of a filter bank on the input audio, read once.
+
+    Args:
+        infile      (str) : input audio filename.
+        bank (FilterBank) : filters to apply, see utils.filters.FilterBank.
+
+    Returns:
+        array of shape (n_bands, n_samples) of the filtered signals.
+    """
+    # read input file
+    fs, sig = read_file(filename=infile)
+
+    # apply filters
+    ys = bank.apply(sig, fs)
+
+    # export data to files
+    output_file_path = os.path.dirname(infile)
+    for name_attribute, y in zip(bank.get_names(), ys):
+        write_file(output_file_path=output_file_path,
+                   input_file_name=infile,
+                   name_attribute=name_attribute,
+                   sig=y,
+                   fs=fs)
+    return ys
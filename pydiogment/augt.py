@@ -2,66 +2,80 @@
 - Description: time based augmentation techniques/manipulations for audio data.
 """
 import os
-import math
-import random
-import warnings
-import subprocess
-import numpy as np
-from .utils.io import read_file, write_file
+import asyncio
+from . import ops
+from .utils.io import (read_file, read_info, write_file, cast_samples, convert_samples,
+                       get_full_scale)
+from .utils.ffmpeg import get_runner, report, get_tempo_filter, get_tone_filter
+from .utils.resample import resample
+from .utils.silence import remove_silence_file
 
 
-def eliminate_silence(infile):
+def eliminate_silence(infile, runner=None, backend="ffmpeg"):
     """
     Eliminate silence from voice file using ffmpeg library.
 
     Args:
-        infile  (str) : Path to get the original voice file from.
+        infile          (str) : Path to get the original voice file from.
+        runner (FFmpegRunner) : runner of the ffmpeg commands, by default the shared one.
+        backend         (str) : "ffmpeg" or "native" to stream the file in-process (see utils.silence).
 
     Returns:
-        list including True for successful authentication, False otherwise and
-        a percentage value representing the certainty of the decision.
+        future of a tuple of the durations in seconds of the file with and without
+        silence, the tuple itself with the native backend.
     """
     # define output name if none specified
     output_path = infile.split(".wav")[0] + "_augmented_without_silence.wav"
 
+    if backend == "native":
+        return remove_silence_file(infile, output_path)
+    runner = runner or get_runner()
+
     # filter silence in wav
-    remove_silence_command = ["ffmpeg", "-i", infile,
+    remove_silence_command = ["ffmpeg", "-y", "-i", infile,
                               "-af",
                               "silenceremove=stop_periods=-1:stop_duration=0.25:stop_threshold=-36dB",
                               "-acodec", "pcm_s16le",
                               "-ac", "1", output_path]
-    out = subprocess.Popen(remove_silence_command,
-                           stdout=subprocess.PIPE,
-                           stderr=subprocess.PIPE)
-    out.wait()
 
-    with_silence_duration = os.popen(
-        "ffprobe -i '" + infile +
-        "' -show_format -v quiet | sed -n 's/duration=//p'").read()
-    no_silence_duration = os.popen(
-        "ffprobe -i '" + output_path +
-        "' -show_format -v quiet | sed -n 's/duration=//p'").read()
-    return with_silence_duration, no_silence_duration
+    async def remove_silence():
+        await runner.execute(remove_silence_command)
+        with_silence_duration = await runner.execute(get_duration_command(infile))
+        no_silence_duration = await runner.execute(get_duration_command(output_path))
+        return float(with_silence_duration.stdout), float(no_silence_duration.stdout)
+
+    return report(runner.spawn(remove_silence()), output_path)
 
 
-def random_cropping(infile, min_len=1):
+def get_duration_command(infile):
     """
-    Crop the infile with an input minimum duration.
+    Build the ffprobe command printing the duration of a file.
 
     Args:
-        infile    (str) : Input filename.
-        min_len (float) : Minimum duration for randomly cropped excerpt
+        infile (str) : input filename/path.
+
+    Returns:
+        list of the command arguments.
     """
-    fs, x = read_file(filename=infile)
-    t_end = x.size / fs
-    if (t_end > min_len):
-        # get start and end time
-        start = random.uniform(0.0, t_end - min_len)
-        end = random.uniform(start + min_len, t_end)
+    return ["ffprobe", "-v", "quiet", "-show_entries", "format=duration",
+            "-of", "default=noprint_wrappers=1:nokey=1", infile]
 
-        # crop data
-        y = x[int(math.floor(start * fs)):int(math.ceil(end * fs))]
 
+def random_cropping(infile, min_len=1, seed=None):
+    """
+    Crop the infile with an input minimum duration.
+
+    Args:
+        infile                      (str) : Input filename.
+        min_len                   (float) : Minimum duration for randomly cropped excerpt
+        seed (int/SeedSequence/Generator) : seed or generator of the crop bounds.
+    """
+    # map the file so only the cropped excerpt is paged in
+    fs, x = read_file(filename=infile, mmap=True)
+
+    # crop data
+    y = ops.random_cropping(x, fs, min_len, seed)
+    if y is not None:
         # construct file names
         output_file_path = os.path.dirname(infile)
         name_attribute = "_augmented_randomly_cropped_%s.wav" % str(min_len)
@@ -73,62 +87,136 @@ def random_cropping(infile, min_len=1):
                    sig=y,
                    fs=fs)
 
-    else:
-        warning_msg = """
-                      min_len provided is greater than the duration of the song.
-                      """
-        warnings.warn(warning_msg)
 
-
-def slow_down(input_file, coefficient=0.8):
+def slow_down(input_file, coefficient=0.8, runner=None, backend="ffmpeg"):
     """
     Slow or stretch a wave.
 
     Args:
-        infile        (str) : Input filename.
-        coefficient (float) : coefficient caracterising the slowing degree.
+        infile          (str) : Input filename.
+        coefficient   (float) : coefficient caracterising the slowing degree.
+        runner (FFmpegRunner) : runner of the ffmpeg command, by default the shared one.
+        backend         (str) : "ffmpeg" or "native" to stretch in-process (see ops.slow_down).
+
+    Returns:
+        future of the ffmpeg process (see FFmpegRunner.submit), None with the native backend.
     """
     # set-up variables for paths and file names
     name_attribute = "_augmented_slowed.wav"
     output_file = input_file.split(".wav")[0] + name_attribute
 
+    if backend == "native":
+        fs, sig = read_file(filename=input_file)
+        write_file(output_file_path=os.path.dirname(input_file),
+                   input_file_name=input_file,
+                   name_attribute=name_attribute,
+                   sig=cast_samples(ops.slow_down(sig, fs, coefficient), sig.dtype),
+                   fs=fs)
+        return None
+
     # apply slowing command
-    slowing_command = ["ffmpeg", "-i", input_file, "-filter:a",
+    slowing_command = ["ffmpeg", "-y", "-i", input_file, "-filter:a",
                        "atempo={0}".format(str(coefficient)),
                        output_file]
-    print(" ".join(slowing_command))
-    p = subprocess.Popen(slowing_command,
-                         stdin=subprocess.PIPE,
-                         stdout=subprocess.PIPE,
-                         stderr=subprocess.PIPE)
-    output, error = p.communicate()
-    print(output, error.decode("utf-8") )
+    return report((runner or get_runner()).submit(slowing_command), output_file)
 
-    # for i in error.decode("utf-8") : print(i)
-    print("Writing data to " + output_file + ".")
 
-
-def speed(input_file, coefficient=1.25):
+def speed(input_file, coefficient=1.25, runner=None, backend="ffmpeg"):
     """
     Speed or shrink a wave.
 
     Args:
-        infile        (str) : Input filename.
-        coefficient (float) : coefficient caracterising the speeding degree.
+        infile          (str) : Input filename.
+        coefficient   (float) : coefficient caracterising the speeding degree.
+        runner (FFmpegRunner) : runner of the ffmpeg command, by default the shared one.
+        backend         (str) : "ffmpeg" or "native" to stretch in-process (see ops.speed).
+
+    Returns:
+        future of the ffmpeg process (see FFmpegRunner.submit), None with the native backend.
     """
     # set-up variables for paths and file names
     name_attribute = "_augmented_speeded.wav"
     output_file = input_file.split(".wav")[0] + name_attribute
 
+    if backend == "native":
+        fs, sig = read_file(filename=input_file)
+        write_file(output_file_path=os.path.dirname(input_file),
+                   input_file_name=input_file,
+                   name_attribute=name_attribute,
+                   sig=cast_samples(ops.speed(sig, fs, coefficient), sig.dtype),
+                   fs=fs)
+        return None
+
     # apply slowing command
-    speeding_command = ["ffmpeg", "-i", input_file, "-filter:a",
+    speeding_command = ["ffmpeg", "-y", "-i", input_file, "-filter:a",
                         "atempo={0}".format(str(coefficient)),
                         output_file]
-    _ = subprocess.Popen(speeding_command,
-                         stdin=subprocess.PIPE,
-                         stdout=subprocess.PIPE,
-                         stderr=subprocess.PIPE)
-    print("Writing data to " + output_file + ".")
+    return report((runner or get_runner()).submit(speeding_command), output_file)
+
+
+def change_tempo_and_tone(infile, slow_coefficients=(), speed_coefficients=(), tones=(),
+                          runner=None):
+    """
+    Slow down, speed and change the tone of a wave with one ffmpeg process.
+
+    Note:
+        The file is read once and split by ffmpeg into one filter chain per
+        output (see FFmpegRunner.execute_split), the outputs are written with
+        write_file in the sample type of the input. Without POSIX pipes one
+        ffmpeg command is run per output instead.
+
+    Args:
+        infile                (str) : input filename/path.
+        slow_coefficients    (list) : coefficients of the slowed outputs, see slow_down.
+        speed_coefficients   (list) : coefficients of the speeded outputs, see speed.
+        tones                (list) : tones of the toned outputs, see augf.change_tone.
+        runner     (FFmpegRunner) : runner of the ffmpeg command, by default the shared one.
+
+    Returns:
+        future of the list of output filenames/paths (see FFmpegRunner.spawn).
+    """
+    runner = runner or get_runner()
+    fs, _ = read_info(infile)
+    outputs = ([("_augmented_slowed_%s.wav" % c, get_tempo_filter(c)) for c in slow_coefficients]
+               + [("_augmented_speeded_%s.wav" % c, get_tempo_filter(c)) for c in speed_coefficients]
+               + [("_augmented_%s_toned.wav" % tone, get_tone_filter(fs, tone)) for tone in tones])
+    if not outputs:
+        raise ValueError("ParameterError: At least one coefficient or tone is needed.")
+
+    # construct file names
+    output_file_path = os.path.dirname(infile)
+    input_file_name = os.path.basename(infile).split(".wav")[0]
+    outfiles = [os.path.join(output_file_path, input_file_name + name) for name, _ in outputs]
+
+    if not runner.split_supported:
+        async def run_commands():
+            await asyncio.gather(*[runner.execute(["ffmpeg", "-y", "-i", infile, "-af", chain, outfile])
+                                   for (_, chain), outfile in zip(outputs, outfiles)])
+            return outfiles
+        return runner.spawn(run_commands())
+
+    # ffmpeg takes float samples within [-1, 1]
+    fs, sig = read_file(filename=infile)
+    full_scale = get_full_scale(sig)
+    x = convert_samples(sig, "float32", full_scale)
+
+    def write_outputs(ys):
+        for (name_attribute, _), y in zip(outputs, ys):
+            if sig.dtype.kind in "iu" : y = convert_samples(y, sig.dtype.name, 1.0)
+            else                      : y = cast_samples(y * full_scale, sig.dtype)
+            write_file(output_file_path=output_file_path,
+                       input_file_name=infile,
+                       name_attribute=name_attribute,
+                       sig=y,
+                       fs=fs)
+        return outfiles
+
+    async def split():
+        ys = await runner.execute_split(x, fs, [chain for _, chain in outputs])
+        # write off the runner loop
+        return await asyncio.get_running_loop().run_in_executor(None, write_outputs, ys)
+
+    return runner.spawn(split())
 
 
 def shift_time(infile, tshift, direction):
@@ -147,11 +235,9 @@ def shift_time(infile, tshift, direction):
         direction (str) : shift direction (to the left or right).
     """
     fs, sig = read_file(filename=infile)
-    shift = int(tshift * fs) * int(direction == "left") - \
-            int(tshift * fs) * int(direction == "right")
 
     # shift time
-    augmented_sig = np.roll(sig, shift)
+    augmented_sig = ops.shift_time(sig, fs, tshift, direction)
 
     # construct file names
     output_file_path = os.path.dirname(infile)
@@ -174,7 +260,7 @@ def reverse(infile):
         infile (str): Input filename.
     """
     fs, sig = read_file(filename=infile)
-    augmented_sig = sig[::-1]
+    augmented_sig = ops.reverse(sig, fs)
 
     # construct file names
     output_file_path = os.path.dirname(infile)
@@ -189,22 +275,33 @@ def reverse(infile):
 
 
 
-def resample_audio(infile, sr):
+def resample_audio(infile, sr, runner=None, backend="ffmpeg"):
     """
     Resample the signal according a new input sampling rate with respect to the
     Nyquist-Shannon theorem.
 
     Args:
-        infile (str) : input filename/path.
-        sr     (int) : new sampling rate.
+        infile          (str) : input filename/path.
+        sr              (int) : new sampling rate.
+        runner (FFmpegRunner) : runner of the ffmpeg command, by default the shared one.
+        backend         (str) : "ffmpeg" or "native" to resample in-process (see utils.resample.resample).
+
+    Returns:
+        future of the ffmpeg process (see FFmpegRunner.submit), None with the native backend.
     """
     # set-up variables for paths and file names
-    output_file = "{0}_augmented_resampled_to_{1}.wav".format(infile.split(".wav")[0],
-                                                            sr)
+    name_attribute = "_augmented_resampled_to_{0}.wav".format(sr)
+    output_file = infile.split(".wav")[0] + name_attribute
+
+    if backend == "native":
+        fs, sig = read_file(filename=infile)
+        write_file(output_file_path=os.path.dirname(infile),
+                   input_file_name=infile,
+                   name_attribute=name_attribute,
+                   sig=cast_samples(resample(sig, fs, sr), sig.dtype),
+                   fs=sr)
+        return None
 
     # apply slowing command
-    sampling_command = ["ffmpeg", "-i", infile, "-ar", str(sr), output_file]
-    print(" ".join(sampling_command))
-    _ = subprocess.Popen(sampling_command,
-                         stdout=subprocess.PIPE,
-                         stderr=subprocess.PIPE)
+    sampling_command = ["ffmpeg", "-y", "-i", infile, "-ar", str(sr), output_file]
+    return report((runner or get_runner()).submit(sampling_command), output_file)
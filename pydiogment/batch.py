@@ -0,0 +1,161 @@
+"""
+- Description: batched augmentations over many equal-length clips.
+    Every function takes a 2-D array of shape (n_clips, n_samples) and the
+    sampling rate, parameters are either scalars shared by all clips or vectors
+    with one value per clip, and everything is computed with numpy broadcasting.
+"""
+import numpy as np
+from .utils.filters import butter_filter
+from .utils.rng import get_noise
+
+
+def get_row_parameter(value, n_clips):
+    """
+    Broadcast a scalar or per-clip parameter to a column vector.
+
+    Args:
+        value (float/array) : scalar or vector of n_clips values.
+        n_clips       (int) : number of clips in the batch.
+
+    Returns:
+        array of shape (n_clips, 1).
+    """
+    value = np.asarray(value)
+    if value.ndim == 0:
+        return np.full((n_clips, 1), value)
+    if value.shape != (n_clips,):
+        raise ValueError("ParameterError: Expected a scalar or %d values per parameter." % n_clips)
+    return value.reshape(n_clips, 1)
+
+
+def apply_gain(sigs, fs, gain):
+    """
+    Apply gain to a batch of clips, see ops.apply_gain.
+
+    Args:
+        sigs       (array) : clips array of shape (n_clips, n_samples).
+        fs           (int) : sampling rate.
+        gain (float/array) : gain in dB, scalar or one value per clip.
+
+    Returns:
+        array of the augmented clips.
+    """
+    factor = 10**(get_row_parameter(gain, len(sigs)) / 10.0)
+    y = sigs * factor
+    np.clip(y, -1.0, 1.0, out=y)
+    y /= np.mean(np.abs(y), axis=1, keepdims=True)
+    return y
+
+
+def add_noise(sigs, fs, snr, seed=None, dtype=None):
+    """
+    Augment a batch of clips using noise injection, see ops.add_noise.
+
+    Args:
+        sigs                      (array) : clips array of shape (n_clips, n_samples).
+        fs                          (int) : sampling rate.
+        snr                 (float/array) : signal to noise ratio in dB, scalar or one value per clip.
+        seed (int/SeedSequence/Generator) : seed or generator of the noise.
+        dtype                     (dtype) : noise and output type, float32 (faster)
+                                             or float64 (default).
+
+    Returns:
+        array of the augmented clips.
+    """
+    noise = get_noise(sigs.shape, seed, dtype)
+
+    # compute per clip powers
+    noise_power = np.mean(np.square(noise), axis=1, keepdims=True, dtype=np.float64)
+    sig_power = np.mean(np.square(sigs, dtype=np.float64), axis=1, keepdims=True)
+
+    # compute snr and scaling factor
+    snr_linear = 10**(get_row_parameter(snr, len(sigs)) / 10.0)
+    noise_factor = (sig_power / noise_power) * (1 / snr_linear)
+
+    # add noise
+    noise *= np.sqrt(noise_factor).astype(noise.dtype)
+    noise += sigs
+    return noise
+
+
+def fade_in_and_out(sigs, fs):
+    """
+    Add a fade in and out effect to a batch of clips, see ops.fade_in_and_out.
+
+    Args:
+        sigs (array) : clips array of shape (n_clips, n_samples).
+        fs     (int) : sampling rate.
+
+    Returns:
+        array of the augmented clips.
+    """
+    # one window shared by all clips
+    y = sigs * np.hamming(sigs.shape[1])
+    y /= np.mean(np.abs(y), axis=1, keepdims=True)
+    return y
+
+
+def apply_filter(sigs, fs, filter_type, low_cutoff_freq, high_cutoff_freq=None, order=5):
+    """
+    Apply a Buttenworth filter to a batch of clips, see ops.apply_filter.
+
+    Args:
+        sigs             (array) : clips array of shape (n_clips, n_samples).
+        fs                 (int) : sampling rate.
+        filter_type        (str) : type of the filter to apply.
+        low_cutoff_freq  (float) : the low cut-off frequency of the filter.
+        high_cutoff_freq (float) : the high cut-off frequency of the filter.
+        order              (int) : filter order to define its accuracy.
+
+    Returns:
+        array of the filtered clips.
+    """
+    # one design shared by all clips, filtered along the samples axis
+    return butter_filter(sig=sigs, fs=fs, ftype=filter_type,
+                         low_cut=low_cutoff_freq,
+                         high_cut=high_cutoff_freq,
+                         order=order,
+                         axis=1)
+
+
+def shift_time(sigs, fs, tshift, direction):
+    """
+    Shift a batch of clips in time to the left or right, see ops.shift_time.
+
+    Args:
+        sigs           (array) : clips array of shape (n_clips, n_samples).
+        fs               (int) : sampling rate.
+        tshift   (float/array) : time shift in seconds, scalar or one value per clip.
+        direction  (str/array) : shift direction ("left" or "right"), scalar or one value per clip.
+
+    Returns:
+        array of the shifted clips.
+    """
+    shift = (get_row_parameter(tshift, len(sigs)) * fs).astype(int)[:, 0]
+    direction = get_row_parameter(direction, len(sigs))[:, 0]
+    shift = shift * (direction == "left") - shift * (direction == "right")
+
+    # roll the rows sharing the same shift together
+    n_samples = sigs.shape[1]
+    values = np.unique(shift)
+    y = np.empty_like(sigs)
+    for value in values:
+        rows = slice(None) if len(values) == 1 else np.flatnonzero(shift == value)
+        k = value % n_samples
+        y[rows, k:] = sigs[rows, :n_samples - k]
+        y[rows, :k] = sigs[rows, n_samples - k:]
+    return y
+
+
+def reverse(sigs, fs):
+    """
+    Inverse a batch of clips to play from the end to the beginning, see ops.reverse.
+
+    Args:
+        sigs (array) : clips array of shape (n_clips, n_samples).
+        fs     (int) : sampling rate.
+
+    Returns:
+        array of the reversed clips.
+    """
+    return sigs[:, ::-1]
@@ -0,0 +1,236 @@
+"""
+- Description: chunked (out-of-core) versions of the point-wise augmentations.
+    The input file is streamed block by block, operations that depend on a
+    statistic of the whole signal make a first pass to compute it and a second
+    pass to write the output, so peak memory is bounded by the block size.
+"""
+import numpy as np
+from .utils.filters import BlockFilter
+from .utils.rng import get_generator, get_noise_generator
+from .utils.io import BLOCK_SIZE, read_file, read_info, read_chunks, write_chunks, process_chunks
+from .utils.convolution import PartitionedConvolver
+
+
+def hamming_block(offset, size, length):
+    """
+    Compute a block of a Hamming window without building the full window.
+
+    Args:
+        offset (int) : index of the first window sample of the block.
+        size   (int) : number of samples in the block.
+        length (int) : length of the full window.
+
+    Returns:
+        array of the window samples, equal to np.hamming(length)[offset:offset + size].
+    """
+    if length == 1:
+        return np.ones(size)
+    n = np.arange(offset, offset + size)
+    return 0.54 - 0.46 * np.cos(2.0 * np.pi * n / (length - 1))
+
+
+def apply_gain(infile, outfile, gain, block_size=BLOCK_SIZE):
+    """
+    Apply gain to infile block by block.
+
+    Args:
+        infile     (str) : input filename/path.
+        outfile    (str) : output filename/path.
+        gain     (float) : gain in dB (both positive and negative).
+        block_size (int) : number of samples per block.
+    """
+    factor = 10**(gain / 10.0)
+
+    def clipped(block):
+        y = block * factor
+        return np.clip(y, -1.0, 1.0, out=y)
+
+    # first pass: mean absolute value of the clipped signal
+    _, chunks = read_chunks(infile, block_size)
+    total, n = 0.0, 0
+    for block in chunks:
+        total += np.sum(np.abs(clipped(block)))
+        n += len(block)
+    mean_abs = total / n
+
+    # second pass: scale and write
+    process_chunks(infile, outfile,
+                   lambda block, offset: clipped(block) / mean_abs,
+                   block_size)
+
+
+def add_noise(infile, outfile, snr, block_size=BLOCK_SIZE, seed=None, dtype=None):
+    """
+    Augment infile using noise injection block by block.
+
+    Note:
+        Both passes draw the noise from generators built from the same seed,
+        so they see the same noise without storing it. With an int seed the
+        noise is the one of ops.add_noise with that seed.
+
+    Args:
+        infile                      (str) : input filename/path.
+        outfile                     (str) : output filename/path.
+        snr                         (int) : signal to noise ratio in dB.
+        block_size                  (int) : number of samples per block.
+        seed (int/SeedSequence/Generator) : seed or generator of the noise.
+        dtype                     (dtype) : noise type, float32 (faster) or float64 (default).
+    """
+    dtype = np.dtype(dtype or np.float64)
+    if seed is None or isinstance(seed, np.random.Generator):
+        seed = get_generator(seed).integers(2**63)
+
+    # first pass: signal and noise powers
+    _, chunks = read_chunks(infile, block_size)
+    rng = get_noise_generator(seed, dtype)
+    sig_energy, noise_energy, n = 0.0, 0.0, 0
+    for block in chunks:
+        sig_energy += np.sum(np.square(block, dtype=np.float64))
+        noise_energy += np.sum(np.square(rng.standard_normal(len(block), dtype=dtype)),
+                               dtype=np.float64)
+        n += len(block)
+
+    # compute snr and scaling factor
+    snr_linear = 10**(snr / 10.0)
+    noise_factor = (sig_energy / noise_energy) * (1 / snr_linear)
+    scale = dtype.type(np.sqrt(noise_factor))
+
+    # second pass: regenerate the same noise and add it
+    rng = get_noise_generator(seed, dtype)
+    process_chunks(infile, outfile,
+                   lambda block, offset: block + scale * rng.standard_normal(len(block),
+                                                                             dtype=dtype),
+                   block_size)
+
+
+def fade_in_and_out(infile, outfile, block_size=BLOCK_SIZE):
+    """
+    Add a fade in and out effect to infile block by block.
+
+    Args:
+        infile     (str) : input filename/path.
+        outfile    (str) : output filename/path.
+        block_size (int) : number of samples per block.
+    """
+    # the window length is the number of frames in the file
+    _, length = read_info(infile)
+
+    def faded(block, offset):
+        return hamming_block(offset, len(block), length) * block
+
+    # first pass: mean absolute value of the faded signal
+    _, chunks = read_chunks(infile, block_size)
+    total, offset = 0.0, 0
+    for block in chunks:
+        total += np.sum(np.abs(faded(block, offset)))
+        offset += len(block)
+    mean_abs = total / length
+
+    # second pass: scale and write
+    process_chunks(infile, outfile,
+                   lambda block, offset: faded(block, offset) / mean_abs,
+                   block_size)
+
+
+def normalize(infile, outfile, normalization_technique="peak", rms_level=0,
+              block_size=BLOCK_SIZE):
+    """
+    Normalize infile block by block given a certain technique (peak or rms).
+
+    Args:
+        infile                  (str) : input filename/path.
+        outfile                 (str) : output filename/path.
+        normalization_technique (str) : type of normalization technique to use. (default is peak)
+        rms_level               (int) : rms level in dB.
+        block_size              (int) : number of samples per block.
+    """
+    if normalization_technique not in ("peak", "rms"):
+        raise ValueError("ParameterError: Unknown normalization_technique variable.")
+
+    # first pass: peak or energy of the signal
+    _, chunks = read_chunks(infile, block_size)
+    peak, energy, n = -np.inf, 0.0, 0
+    for block in chunks:
+        peak = max(peak, np.max(block))
+        energy += np.sum(np.square(block, dtype=np.float64))
+        n += len(block)
+
+    if normalization_technique == "peak":
+        a = 1.0 / peak
+    else:
+        # linear rms level and scaling factor
+        r = 10**(rms_level / 10.0)
+        a = np.sqrt((n * r**2) / energy)
+
+    # second pass: scale and write
+    process_chunks(infile, outfile, lambda block, offset: block * a, block_size)
+
+
+def convolve(infile, outfile, ir_fname, level=0.5, partition_size=1024, block_size=BLOCK_SIZE):
+    """
+    Apply convolution to infile block by block using the given impulse response file.
+
+    Note:
+        The convolution is partitioned (see utils.convolution.PartitionedConvolver)
+        so neither the signal nor the output is held in memory, the first pass
+        computes the normalization and the second pass convolves again.
+
+    Args:
+        infile         (str) : input filename/path.
+        outfile        (str) : output filename/path.
+        ir_fname       (str) : name of impulse response file.
+        level        (float) : can be between 0 and 1, default value = 0.5
+        partition_size (int) : number of samples per impulse response partition.
+        block_size     (int) : number of samples per block.
+    """
+    _, ir = read_file(filename=ir_fname)
+
+    def mixed():
+        # the dry samples wait for the convolver output they are mixed with
+        state = {"dry": np.zeros(0)}
+        _, chunks = read_chunks(infile, block_size)
+
+        def recorded():
+            for block in chunks:
+                state["dry"] = np.concatenate([state["dry"], block])
+                yield block
+
+        for y in PartitionedConvolver(ir, partition_size).stream(recorded()):
+            dry, state["dry"] = state["dry"][:len(y)], state["dry"][len(y):]
+            yield y * level + dry * (1 - level)
+
+    # first pass: mean absolute value of the convolved signal
+    total, n = 0.0, 0
+    for block in mixed():
+        total += np.sum(np.abs(block))
+        n += len(block)
+    mean_abs = total / n
+
+    # second pass: convolve again, scale and write
+    fs, _ = read_info(infile)
+    write_chunks(outfile, fs, (block / mean_abs for block in mixed()))
+
+
+def apply_filter(infile, outfile, filter_type, low_cutoff_freq, high_cutoff_freq=None,
+                 order=5, block_size=BLOCK_SIZE):
+    """
+    Apply a certain type of Buttenworth filter on infile block by block.
+
+    Note:
+        The filter state is carried from one block to the next, so the output
+        is identical to filtering the whole signal at once.
+
+    Args:
+        infile             (str) : input filename/path.
+        outfile            (str) : output filename/path.
+        filter_type        (str) : type of the filter to apply.
+        low_cutoff_freq  (float) : the low cut-off frequency of the filter.
+        high_cutoff_freq (float) : the high cut-off frequency of the filter.
+        order              (int) : filter order to define its accuracy.
+        block_size         (int) : number of samples per block.
+    """
+    fs, _ = read_info(infile)
+    block_filter = BlockFilter.from_parameters(filter_type, fs, low_cutoff_freq,
+                                               high_cutoff_freq, order)
+    process_chunks(infile, outfile, lambda block, offset: block_filter.process(block),
+                   block_size)
@@ -0,0 +1,225 @@
+"""
+- Description: parallel dataset level augmentation.
+    Applies a recipe of in-memory augmentations to every wave file of a
+    directory tree with a pool of processes or threads. Every input file is
+    read once, outputs mirror the source tree with deterministic names and
+    errors are captured per task instead of stopping the run. Random
+    augmentations are seeded per file and recipe entry from one root seed, so
+    a run can be reproduced whatever the number of workers.
+"""
+import os
+import concurrent.futures
+import numpy as np
+from .pipeline import Pipeline, add_seed, get_operation, get_stage_name
+from .utils.io import read_file, write_file, get_writer, set_writer
+from .utils.rng import derive_seed
+
+
+class TaskResult:
+    """
+    Result of augmenting one input file.
+
+    Args:
+        infile   (str) : input filename/path.
+        outputs (list) : written output filenames/paths.
+        errors  (list) : (recipe entry name, error message) tuples of the failed entries.
+    """
+    def __init__(self, infile, outputs, errors):
+        self.infile = infile
+        self.outputs = outputs
+        self.errors = errors
+        self.pending = []
+
+    def __repr__(self):
+        return "TaskResult(%r, %d outputs, %d errors)" % (self.infile, len(self.outputs),
+                                                          len(self.errors))
+
+
+def get_name_attribute(operation, kwargs):
+    """
+    Build the deterministic output file name attribute of a recipe entry.
+
+    Args:
+        operation (callable/Pipeline) : augmentation of the entry.
+        kwargs                 (dict) : parameters of the augmentation.
+
+    Returns:
+        str of the name attribute, the operation name followed by name=value for
+        every parameter (see pipeline.get_stage_name), for every stage of a pipeline.
+    """
+    if isinstance(operation, Pipeline):
+        return operation.get_name_attribute()
+    return "_augmented_%s.wav" % get_stage_name(operation, kwargs)
+
+
+class OutputCollector:
+    """
+    Writer of the process workers when the parent has a writer set.
+
+    Note:
+        A forked worker inherits a copy of the parent writer, which would write
+        to its own copy of a shard or wait on a queue with no writer thread. The
+        outputs are instead kept and sent back with the TaskResult, so that the
+        parent hands them over to its writer.
+    """
+    def __init__(self):
+        self.items = []
+
+    def submit(self, fpath, sig, fs, sample_format=None, full_scale=None, dither=False,
+               params=None):
+        """
+        Keep an output to send it back to the parent, see AsyncWriter.submit.
+        """
+        self.items.append((fpath, sig, fs, sample_format, full_scale, dither, params))
+
+
+def init_worker(collect):
+    """
+    Set the writer of a process worker, never the inherited one of the parent.
+
+    Args:
+        collect (bool) : send the outputs back to the parent writer (see
+                         OutputCollector) instead of writing them.
+    """
+    set_writer(OutputCollector() if collect else None)
+
+
+def get_params(operation, kwargs):
+    """
+    Describe a recipe entry, stored with the output by writers keeping metadata
+    (see utils.shards.ShardWriter).
+
+    Args:
+        operation (callable/Pipeline) : augmentation of the entry.
+        kwargs                 (dict) : parameters of the augmentation.
+
+    Returns:
+        dict of the operation name and its parameters, the stages of a pipeline.
+    """
+    if isinstance(operation, Pipeline):
+        return {"operation": "pipeline", "stages": operation.get_params()}
+    return {"operation": operation.__name__, "params": dict(kwargs)}
+
+
+def get_recipe(recipe):
+    """
+    Resolve the operations of a recipe.
+
+    Args:
+        recipe (list) : list of (operation, parameters dict) tuples, operations are
+                        ops, auga, augf or augt functions, their names or pipelines.
+
+    Returns:
+        list of (operation, parameters dict) tuples with ops functions or pipelines.
+    """
+    return [(operation if isinstance(operation, Pipeline) else get_operation(operation), kwargs)
+            for operation, kwargs in recipe]
+
+
+def augment_task(task):
+    """
+    Read one file and write the output of every recipe entry.
+
+    Args:
+        task (tuple) : input filename/path, output directory, resolved recipe
+                       and seed of the file (see utils.rng.derive_seed).
+
+    Returns:
+        TaskResult of the file.
+    """
+    infile, output_file_path, recipe, seed = task
+    outputs, errors = [], []
+    try:
+        fs, sig = read_file(filename=infile)
+    except Exception as e:
+        return TaskResult(infile, outputs, [("read_file", "%s: %s" % (type(e).__name__, e))])
+
+    for entry, (operation, kwargs) in enumerate(recipe):
+        name_attribute = get_name_attribute(operation, kwargs)
+        try:
+            # independent stream per file, recipe entry and pipeline stage
+            if isinstance(operation, Pipeline):
+                y = operation.run(sig, fs, derive_seed(seed, entry))
+            else:
+                y = operation(sig, fs, **add_seed(operation, kwargs, derive_seed(seed, entry)))
+            if y is None:
+                raise ValueError("no output for this input")
+            write_file(output_file_path=output_file_path,
+                       input_file_name=infile,
+                       name_attribute=name_attribute,
+                       sig=y,
+                       fs=fs,
+                       params=get_params(operation, kwargs))
+            fname = os.path.basename(infile).split(".wav")[0] + name_attribute
+            outputs.append(os.path.join(output_file_path, fname))
+        except Exception as e:
+            errors.append((name_attribute, "%s: %s" % (type(e).__name__, e)))
+    result = TaskResult(infile, outputs, errors)
+
+    # outputs of a process worker waiting for the parent writer
+    writer = get_writer()
+    if isinstance(writer, OutputCollector):
+        result.pending, writer.items = writer.items, []
+    return result
+
+
+def augment_directory(src, dst, recipe, workers=None, backend="process", chunksize=16,
+                      seed=None):
+    """
+    Augment every wave file of a directory tree in parallel.
+
+    Note:
+        The thread backend avoids pickling signals and suits recipes dominated
+        by numpy operations that release the GIL, the process backend suits
+        recipes with a lot of Python level work. Inside a writer block (like
+        AsyncWriter or ShardWriter) the outputs of the process workers are sent
+        back and handed over to the writer by this process.
+
+    Args:
+        src        (str) : source directory of the wave files.
+        dst        (str) : destination directory, the source tree is mirrored in it.
+        recipe    (list) : list of (operation, parameters dict) tuples, operations are
+                           ops, auga, augf or augt functions, their names or pipelines.
+        workers    (int) : number of workers, by default the number of CPUs.
+        backend    (str) : "process" or "thread".
+        chunksize  (int) : number of files submitted to a process at once.
+        seed       (int) : root seed of the random augmentations, the streams are
+                           derived from it and the file index in sorted walk order.
+                           By default a fresh root seed, the file seeds are always
+                           derived here so workers never share a stream.
+
+    Returns:
+        list of TaskResult, one per input file in sorted walk order.
+    """
+    executors = {"process": concurrent.futures.ProcessPoolExecutor,
+                 "thread": concurrent.futures.ThreadPoolExecutor}
+    if backend not in executors:
+        raise ValueError("ParameterError: Unknown backend %s." % backend)
+
+    # collect the input files and create the output directories
+    recipe = get_recipe(recipe)
+    root_seed = np.random.SeedSequence(seed)
+    tasks = []
+    for root, dirs, files in os.walk(src):
+        dirs.sort()
+        output_file_path = os.path.join(dst, os.path.relpath(root, src))
+        for fname in sorted(files):
+            if fname.lower().endswith(".wav"):
+                os.makedirs(output_file_path, exist_ok=True)
+                tasks.append((os.path.join(root, fname), output_file_path, recipe,
+                              derive_seed(root_seed, len(tasks))))
+
+    if backend == "thread":
+        with executors[backend](max_workers=workers) as pool:
+            return list(pool.map(augment_task, tasks, chunksize=chunksize))
+
+    writer = get_writer()
+    results = []
+    with executors[backend](max_workers=workers, initializer=init_worker,
+                            initargs=(writer is not None,)) as pool:
+        for result in pool.map(augment_task, tasks, chunksize=chunksize):
+            for item in result.pending:
+                writer.submit(*item)
+            result.pending = []
+            results.append(result)
+    return results
@@ -0,0 +1,207 @@
+"""
+- Description: lazy fused evaluation of the amplitude augmentations.
+    Gain, fade and normalization are recorded as element-wise steps and
+    reductions, then evaluated block by block in as few sweeps as possible.
+    Reductions are computed in the same sweep as the steps before them and the
+    scaling they define is deferred, only clipping a signal with an unknown
+    scale forces an extra sweep. The output is written once, to an array or a file.
+"""
+import numpy as np
+from .chunked import hamming_block
+from .utils.io import BLOCK_SIZE, read_info, read_chunks, convert_samples, ChunkedWriter
+
+
+class LazySignal:
+    """
+    Lazy signal recording amplitude augmentations for a fused evaluation.
+
+    Args:
+        sig      (array) : signal/audio array.
+        fs         (int) : sampling rate.
+        block_size (int) : number of samples per evaluated block.
+    """
+    def __init__(self, sig, fs, block_size=BLOCK_SIZE):
+        self.fs = fs
+        self.length = len(sig)
+        self.block_size = block_size
+        self.steps = []
+        self.sweeps = 0
+        self._source = lambda: (sig[i:i + block_size] for i in range(0, len(sig), block_size))
+
+    @classmethod
+    def from_file(cls, infile, block_size=BLOCK_SIZE):
+        """
+        Create a lazy signal streaming its blocks from a wave file.
+
+        Args:
+            infile     (str) : input filename/path.
+            block_size (int) : number of samples per evaluated block.
+
+        Returns:
+            the lazy signal.
+        """
+        fs, length = read_info(infile)
+        lazy = cls(np.zeros(0), fs, block_size)
+        lazy.length = length
+        lazy._source = lambda: read_chunks(infile, block_size)[1]
+        return lazy
+
+    def _add(self, kind, arg):
+        # a reduction holds its resolved scale factor once it is computed
+        self.steps.append([kind, arg, None])
+        return self
+
+    def apply_gain(self, gain):
+        """
+        Record a gain, see ops.apply_gain.
+
+        Args:
+            gain (float) : gain in dB (both positive and negative).
+
+        Returns:
+            the lazy signal itself, so calls can be chained.
+        """
+        factor = 10**(gain / 10.0)
+        self._add("mul", lambda offset, size: factor)
+        self._add("clip", (-1.0, 1.0))
+        return self._add("reduce", ("mean_abs",))
+
+    def fade_in_and_out(self):
+        """
+        Record a fade in and out effect, see ops.fade_in_and_out.
+
+        Returns:
+            the lazy signal itself, so calls can be chained.
+        """
+        self._add("mul", lambda offset, size: hamming_block(offset, size, self.length))
+        return self._add("reduce", ("mean_abs",))
+
+    def normalize(self, normalization_technique="peak", rms_level=0):
+        """
+        Record a normalization, see ops.normalize.
+
+        Args:
+            normalization_technique (str) : type of normalization technique to use. (default is peak)
+            rms_level               (int) : rms level in dB.
+
+        Returns:
+            the lazy signal itself, so calls can be chained.
+        """
+        if normalization_technique == "peak":
+            return self._add("reduce", ("peak",))
+        if normalization_technique == "rms":
+            return self._add("reduce", ("rms", rms_level))
+        raise ValueError("ParameterError: Unknown normalization_technique variable.")
+
+    def _sweep(self, stop, out=None):
+        """
+        Evaluate the steps before stop over all blocks.
+
+        Reductions without a scale accumulate their statistic and are skipped,
+        so the statistics of later ones miss the factors of the earlier ones.
+
+        Returns:
+            list of (step, statistic) tuples of the unresolved reductions.
+        """
+        self.sweeps += 1
+        targets = [step for step in self.steps[:stop] if step[0] == "reduce" and step[2] is None]
+        stats = {id(step): [0.0, -np.inf] for step in targets}
+        offset = 0
+        for block in self._source():
+            y = np.array(block, dtype=np.float64)
+            for step in self.steps[:stop]:
+                kind, arg, scale = step
+                if kind == "mul":
+                    y *= arg(offset, len(y))
+                elif kind == "clip":
+                    np.clip(y, arg[0], arg[1], out=y)
+                elif scale is not None:
+                    y *= scale
+                elif arg[0] == "peak":
+                    stats[id(step)][1] = max(stats[id(step)][1], np.max(y))
+                elif arg[0] == "mean_abs":
+                    stats[id(step)][0] += np.sum(np.abs(y))
+                else:
+                    stats[id(step)][0] += np.dot(y, y)
+            if out is not None:
+                out(y)
+            offset += len(y)
+        return [(step, stats[id(step)]) for step in targets]
+
+    def _resolve(self):
+        """
+        Compute the scale factors of all reductions.
+        """
+        while any(step[0] == "reduce" and step[2] is None for step in self.steps):
+            # sweep until a clip follows an unresolved reduction
+            first = next(i for i, step in enumerate(self.steps)
+                         if step[0] == "reduce" and step[2] is None)
+            stop = next((i for i in range(first, len(self.steps))
+                         if self.steps[i][0] == "clip"), len(self.steps))
+
+            # resolve in order, correcting for the factors deferred before each one
+            deferred = 1.0
+            for step, (total, peak) in self._sweep(stop):
+                name = step[1][0]
+                if name == "peak":
+                    step[2] = 1.0 / (peak * deferred)
+                elif name == "mean_abs":
+                    step[2] = self.length / (total * deferred)
+                else:
+                    r = 10**(step[1][1] / 10.0)
+                    step[2] = np.sqrt((self.length * r**2) / (total * deferred**2))
+                deferred *= step[2]
+
+    def evaluate(self):
+        """
+        Evaluate the recorded augmentations.
+
+        Returns:
+            array of the augmented signal.
+        """
+        self._resolve()
+        y = np.empty(self.length)
+        position = [0]
+
+        def store(block):
+            y[position[0]:position[0] + len(block)] = block
+            position[0] += len(block)
+
+        self._sweep(len(self.steps), store)
+        return y
+
+    def write(self, outfile, sample_format=None, full_scale=None):
+        """
+        Evaluate the recorded augmentations block by block into a wave file.
+
+        Note:
+            Without an explicit numeric full_scale the peak of the output is
+            needed before converting the first block, which costs one more sweep.
+
+        Args:
+            outfile              (str) : output filename/path.
+            sample_format        (str) : output format (see convert_samples), by default
+                                         float64 samples written as they are.
+            full_scale     (float/str) : signal level mapped to the output full scale
+                                         (see get_full_scale), by default the peak of
+                                         outputs beyond [-1, 1].
+        """
+        self._resolve()
+        if sample_format is None:
+            sample_format, full_scale = "float64", 1.0
+
+        if full_scale is None or full_scale == "peak":
+            peak = [0.0]
+
+            def track(block):
+                if len(block):
+                    peak[0] = max(peak[0], float(np.max(np.abs(block))))
+
+            self._sweep(len(self.steps), track)
+            full_scale = (peak[0] or 1.0) if full_scale == "peak" else max(peak[0], 1.0)
+
+        with ChunkedWriter(outfile, self.fs, sample_format) as writer:
+            self._sweep(len(self.steps),
+                        lambda block: writer.write(convert_samples(block, sample_format,
+                                                                   full_scale)))
+        print("Writing data to " + outfile + ".")
@@ -0,0 +1,292 @@
+"""
+- Description: array based (in-memory) augmentation techniques/manipulations for audio data.
+    Every function takes the signal array and its sampling rate and returns the
+    augmented signal array, the file based functions in auga, augf and augt are
+    thin wrappers around these.
+"""
+import math
+import warnings
+import numpy as np
+from .utils.filters import butter_filter
+from .utils.rng import get_generator, get_noise
+from .utils.stretch import time_stretch, pitch_shift
+from .utils.silence import remove_silence
+from .utils import convolution
+
+
+def apply_gain(sig, fs, gain):
+    """
+    Apply gain to a signal.
+
+    Args:
+        sig  (array) : signal/audio array.
+        fs     (int) : sampling rate.
+        gain (float) : gain in dB (both positive and negative).
+
+    Returns:
+        array of the augmented signal.
+    """
+    # apply gain
+    y = sig * (10**(gain / 10.0))
+    y = np.minimum(np.maximum(-1.0, y), 1.0)
+    y /= np.mean(np.abs(y))
+    return y
+
+
+def add_noise(sig, fs, snr, seed=None, dtype=None):
+    """
+    Augment a signal using noise injection.
+
+    Note:
+        It simply add some random values to the signal based on the snr.
+        The same seed gives the same output, see utils.rng.get_generator.
+
+    Args:
+        sig                       (array) : signal/audio array.
+        fs                          (int) : sampling rate.
+        snr                         (int) : signal to noise ratio in dB.
+        seed (int/SeedSequence/Generator) : seed or generator of the noise.
+        dtype                     (dtype) : noise and output type, float32 (faster)
+                                             or float64 (default).
+
+    Returns:
+        array of the augmented signal.
+    """
+    # compute and apply noise
+    noise = get_noise(len(sig), seed, dtype)
+
+    # compute powers
+    noise_power = np.mean(np.square(noise), dtype=np.float64)
+    sig_power = np.mean(np.square(sig, dtype=np.float64))
+
+    # compute snr and scaling factor
+    snr_linear = 10**(snr / 10.0)
+    noise_factor = (sig_power / noise_power) * (1 / snr_linear)
+
+    # add noise
+    noise *= noise.dtype.type(np.sqrt(noise_factor))
+    noise += sig
+    return noise
+
+
+def fade_in_and_out(sig, fs):
+    """
+    Add a fade in and out effect to a signal.
+
+    Args:
+        sig (array) : signal/audio array.
+        fs    (int) : sampling rate.
+
+    Returns:
+        array of the augmented signal.
+    """
+    # fade in and out
+    window = np.hamming(len(sig))
+    y = window * sig
+    y /= np.mean(np.abs(y))
+    return y
+
+
+def normalize(sig, fs, normalization_technique="peak", rms_level=0):
+    """
+    Normalize a signal given a certain technique (peak or rms).
+
+    Args:
+        sig                   (array) : signal/audio array.
+        fs                      (int) : sampling rate.
+        normalization_technique (str) : type of normalization technique to use. (default is peak)
+        rms_level               (int) : rms level in dB.
+
+    Returns:
+        array of the normalized signal.
+    """
+    # normalize signal
+    if normalization_technique == "peak" :
+        y = sig / np.max(sig)
+
+    elif normalization_technique == "rms":
+        # linear rms level and scaling factor
+        r = 10**(rms_level / 10.0)
+        a = np.sqrt( (len(sig) * r**2) / np.sum(sig**2) )
+
+        # normalize
+        y = sig * a
+
+    else :
+        raise ValueError("ParameterError: Unknown normalization_technique variable.")
+    return y
+
+
+def convolve(sig, fs, ir, level=0.5, method="auto", dtype=None):
+    """
+    Apply convolution to a signal using the given impulse response.
+
+    Args:
+        sig   (array) : signal/audio array.
+        fs      (int) : sampling rate.
+        ir    (array) : impulse response array.
+        level (float) : can be between 0 and 1, default value = 0.5
+        method  (str) : "direct", "fft" or "auto", see utils.convolution.convolve.
+        dtype (dtype) : computation and output type, float32 or float64 (default).
+
+    Returns:
+        array of the augmented signal.
+    """
+    # apply convolution, only the first len(sig) samples are computed
+    x = np.asarray(sig, dtype=dtype or np.float64)
+    y = convolution.convolve(x, ir, len(x), method, x.dtype) * level + x * (1 - level)
+
+    # normalize
+    y /= np.mean(np.abs(y))
+    return y
+
+
+def change_tone(sig, fs, tone, quality="medium", preserve_duration=True):
+    """
+    Change the tone of a signal.
+
+    Args:
+        sig               (array) : signal/audio array.
+        fs                  (int) : sampling rate.
+        tone              (float) : tone to change.
+        quality             (str) : "fast", "medium" or "high", see utils.stretch.time_stretch.
+        preserve_duration  (bool) : keep the duration of the signal, see utils.stretch.pitch_shift.
+
+    Returns:
+        array of the augmented signal.
+    """
+    return pitch_shift(sig, fs, tone, quality, preserve_duration)
+
+
+def apply_filter(sig, fs, filter_type, low_cutoff_freq, high_cutoff_freq=None, order=5):
+    """
+    Apply a certain type of Buttenworth filter on a signal.
+
+    Args:
+        sig              (array) : signal/audio array.
+        fs                 (int) : sampling rate.
+        filter_type        (str) : type of the filter to apply.
+        low_cutoff_freq  (float) : the low cut-off frequency of the filter.
+        high_cutoff_freq (float) : the high cut-off frequency of the filter.
+        order              (int) : filter order to define its accuracy.
+
+    Returns:
+        array of the filtered signal.
+    """
+    return butter_filter(sig=sig, fs=fs, ftype=filter_type,
+                         low_cut=low_cutoff_freq,
+                         high_cut=high_cutoff_freq,
+                         order=order)
+
+
+def random_cropping(sig, fs, min_len=1, seed=None):
+    """
+    Crop a signal with an input minimum duration.
+
+    Args:
+        sig                       (array) : signal/audio array.
+        fs                          (int) : sampling rate.
+        min_len                   (float) : Minimum duration for randomly cropped excerpt
+        seed (int/SeedSequence/Generator) : seed or generator of the crop bounds.
+
+    Returns:
+        array of the cropped signal or None if the signal is shorter than min_len.
+    """
+    t_end = sig.size / fs
+    if (t_end > min_len):
+        # get start and end time
+        rng = get_generator(seed)
+        start = rng.uniform(0.0, t_end - min_len)
+        end = rng.uniform(start + min_len, t_end)
+
+        # crop data
+        return sig[int(math.floor(start * fs)):int(math.ceil(end * fs))]
+
+    else:
+        warning_msg = """
+                      min_len provided is greater than the duration of the song.
+                      """
+        warnings.warn(warning_msg)
+
+
+def slow_down(sig, fs, coefficient=0.8, quality="medium"):
+    """
+    Slow or stretch a signal without changing its pitch.
+
+    Args:
+        sig         (array) : signal/audio array.
+        fs            (int) : sampling rate.
+        coefficient (float) : coefficient caracterising the slowing degree.
+        quality       (str) : "fast", "medium" or "high", see utils.stretch.time_stretch.
+
+    Returns:
+        array of the slowed signal.
+    """
+    return time_stretch(sig, fs, coefficient, quality)
+
+
+def speed(sig, fs, coefficient=1.25, quality="medium"):
+    """
+    Speed or shrink a signal without changing its pitch.
+
+    Args:
+        sig         (array) : signal/audio array.
+        fs            (int) : sampling rate.
+        coefficient (float) : coefficient caracterising the speeding degree.
+        quality       (str) : "fast", "medium" or "high", see utils.stretch.time_stretch.
+
+    Returns:
+        array of the speeded signal.
+    """
+    return time_stretch(sig, fs, coefficient, quality)
+
+
+def eliminate_silence(sig, fs, threshold=-36, stop_duration=0.25, hangover=0.0):
+    """
+    Eliminate the silences of a signal.
+
+    Args:
+        sig           (array) : signal/audio array.
+        fs              (int) : sampling rate.
+        threshold     (float) : silence threshold in dB relative to the full scale.
+        stop_duration (float) : minimum duration in seconds of the removed silences.
+        hangover      (float) : duration in seconds kept at the start of every removed silence.
+
+    Returns:
+        array of the signal without silence.
+    """
+    return remove_silence(sig, fs, threshold, stop_duration, hangover)[0]
+
+
+def shift_time(sig, fs, tshift, direction):
+    """
+    Augment a signal by shifting it in time to the left or right.
+
+    Args:
+        sig     (array) : signal/audio array.
+        fs        (int) : sampling rate.
+        tshift    (int) : Signal time shift in seconds.
+        direction (str) : shift direction (to the left or right).
+
+    Returns:
+        array of the shifted signal.
+    """
+    shift = int(tshift * fs) * int(direction == "left") - \
+            int(tshift * fs) * int(direction == "right")
+
+    # shift time
+    return np.roll(sig, shift)
+
+
+def reverse(sig, fs):
+    """
+    Inverse a signal to play from the end to the beginning.
+
+    Args:
+        sig (array) : signal/audio array.
+        fs    (int) : sampling rate.
+
+    Returns:
+        array of the reversed signal.
+    """
+    return sig[::-1]
@@ -0,0 +1,209 @@
+"""
+- Description: composable augmentation pipelines.
+    A pipeline chains the in-memory operations of pydiogment.ops, so a file is
+    read once, every stage runs on the buffer and only the final result is
+    written, with the time spent in every stage recorded.
+"""
+import os
+import re
+import time
+import hashlib
+import inspect
+import numpy as np
+from . import ops
+from .utils.io import read_file, write_file
+from .utils.rng import derive_seed
+
+
+def get_operation(func):
+    """
+    Get the in-memory operation matching an augmentation.
+
+    Args:
+        func (callable/str) : function of ops, auga, augf or augt, or its name.
+
+    Returns:
+        the matching function of ops.
+    """
+    name = func if isinstance(func, str) else func.__name__
+    if not hasattr(ops, name):
+        raise ValueError("ParameterError: No in-memory operation named %s." % name)
+    return getattr(ops, name)
+
+
+def get_value_name(value):
+    """
+    Format a parameter value for a file name.
+
+    Note:
+        Numbers and file name safe strings are kept as they are. Other values,
+        like arrays or paths, are replaced by a digest of their content, so two
+        different values never share a name.
+
+    Args:
+        value (object) : parameter value.
+
+    Returns:
+        str of the value in the file name.
+    """
+    if value is None or isinstance(value, (bool, int, float, np.number)):
+        return str(value)
+    if isinstance(value, str) and re.match(r"^[\w.+-]*$", value):
+        return value
+
+    if callable(value):
+        value = "%s.%s" % (value.__module__, getattr(value, "__qualname__", value.__name__))
+    data = np.asarray(value)
+    content = repr(value).encode("utf-8") if data.dtype.kind in "OU" else data.tobytes()
+    digest = hashlib.sha1(repr((data.dtype.str, data.shape)).encode("utf-8") + content)
+    return digest.hexdigest()[:12]
+
+
+def get_stage_name(func, kwargs):
+    """
+    Build the name of a stage from its operation and parameters.
+
+    Args:
+        func (callable) : in-memory operation.
+        kwargs   (dict) : parameters of the operation.
+
+    Returns:
+        str of the operation name followed by name=value for every parameter,
+        in the order of the sorted names (see get_value_name).
+    """
+    return func.__name__ + "".join("_%s=%s" % (key, get_value_name(kwargs[key]))
+                                   for key in sorted(kwargs))
+
+
+def add_seed(func, kwargs, seed):
+    """
+    Add a seed to the parameters of an operation drawing random values.
+
+    Args:
+        func     (callable) : in-memory operation.
+        kwargs       (dict) : parameters of the operation.
+        seed (SeedSequence) : seed to add, None adds nothing.
+
+    Returns:
+        dict of the parameters, with the seed if func takes one and none is set.
+    """
+    if seed is None or "seed" in kwargs or "seed" not in inspect.signature(func).parameters:
+        return kwargs
+    return dict(kwargs, seed=seed)
+
+
+class Pipeline:
+    """
+    Chain augmentations and run them on an in-memory buffer.
+
+    Note:
+        Stage parameters are those of the ops functions, without sig and fs.
+        After every run the timings attribute holds (stage name, seconds) tuples.
+        A run seed is derived per stage for the stages drawing random values.
+
+    Args:
+        stages (list) : list of (function, parameters dict) tuples, functions can
+                        be given as ops, auga, augf or augt functions or by name.
+    """
+    def __init__(self, stages=()):
+        self.stages = []
+        self.timings = []
+        for func, kwargs in stages:
+            self.add(func, **kwargs)
+
+    def add(self, func, **kwargs):
+        """
+        Append a stage to the pipeline.
+
+        Args:
+            func (callable/str) : augmentation function or name.
+            kwargs              : parameters of the augmentation.
+
+        Returns:
+            the pipeline itself, so calls can be chained.
+        """
+        self.stages.append((get_operation(func), kwargs))
+        return self
+
+    def run(self, sig, fs, seed=None):
+        """
+        Run all stages on a signal.
+
+        Args:
+            sig             (array) : signal/audio array.
+            fs                (int) : sampling rate.
+            seed (int/SeedSequence) : seed of the random stages, see utils.rng.derive_seed.
+
+        Returns:
+            array of the augmented signal, None if a stage returned None.
+        """
+        self.timings = []
+        return self._run(sig, fs, seed)
+
+    __call__ = run
+
+    def _run(self, sig, fs, seed=None):
+        for stage, (func, kwargs) in enumerate(self.stages):
+            t0 = time.perf_counter()
+            sig = func(sig, fs, **add_seed(func, kwargs, derive_seed(seed, stage)))
+            self.timings.append((func.__name__, time.perf_counter() - t0))
+            if sig is None:
+                return None
+        return sig
+
+    def get_name_attribute(self):
+        """
+        Build the default output file name attribute from the stage names and
+        parameters, so pipelines differing only in parameters do not collide.
+
+        Returns:
+            str of the name attribute.
+        """
+        return "_augmented_%s.wav" % "_".join(get_stage_name(func, kwargs)
+                                              for func, kwargs in self.stages)
+
+    def get_params(self):
+        """
+        Describe the stages and their parameters, for metadata sidecars.
+
+        Returns:
+            list of {"operation": name, "params": parameters dict} dicts, one per stage.
+        """
+        return [{"operation": func.__name__, "params": dict(kwargs)} for func, kwargs in self.stages]
+
+    def run_file(self, infile, name_attribute=None, output_file_path=None, seed=None):
+        """
+        Read infile once, run all stages and write only the final result.
+
+        Args:
+            infile            (str) : input filename/path.
+            name_attribute    (str) : attribute to add to output file name, by
+                                      default built from the stages.
+            output_file_path  (str) : path to save the resulting file to, by
+                                      default the directory of infile.
+            seed (int/SeedSequence) : seed of the random stages, see utils.rng.derive_seed.
+
+        Returns:
+            array of the augmented signal, None if a stage returned None.
+        """
+        self.timings = []
+
+        # read input file
+        t0 = time.perf_counter()
+        fs, sig = read_file(filename=infile)
+        self.timings.append(("read_file", time.perf_counter() - t0))
+
+        # run the stages
+        y = self._run(sig, fs, seed)
+        if y is None:
+            return None
+
+        # export data to file
+        t0 = time.perf_counter()
+        write_file(output_file_path=output_file_path or os.path.dirname(infile),
+                   input_file_name=infile,
+                   name_attribute=name_attribute or self.get_name_attribute(),
+                   sig=y,
+                   fs=fs)
+        self.timings.append(("write_file", time.perf_counter() - t0))
+        return y
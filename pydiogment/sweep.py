@@ -0,0 +1,175 @@
+"""
+- Description: parameter sweeps producing many variants of one signal in one call.
+    Quantities that do not depend on the swept parameter, like the signal power
+    for noise injection, are computed once and all variants are returned as a
+    stacked array of shape (n_values, n_samples) or written to one file each.
+"""
+import os
+import numpy as np
+from . import batch
+from .utils.rng import get_noise
+from .utils.stretch import pitch_shift
+from .utils.io import read_file, write_file
+
+
+# swept parameter and output file name attribute of every operation
+name_attributes = {"apply_gain": ("gain", "_augmented_with_{gain}_gain.wav"),
+                   "add_noise": ("snr", "_augmented_{snr}_noisy.wav"),
+                   "normalize": ("rms_level", "_augmented_rms_{rms_level}_normalized.wav"),
+                   "shift_time": ("tshift", "_augmented_{direction}_{tshift}_shifted.wav"),
+                   "change_tone": ("tone", "_augmented_{tone}_toned.wav")}
+
+
+def apply_gain(sig, fs, gain):
+    """
+    Apply several gains to a signal, see ops.apply_gain.
+
+    Note:
+        Gains that do not clip the signal all give the signal divided by its
+        mean absolute value, which is computed once and shared.
+
+    Args:
+        sig (array) : signal/audio array.
+        fs    (int) : sampling rate.
+        gain (list) : gains in dB.
+
+    Returns:
+        array of shape (n_gains, n_samples) of the augmented signals.
+    """
+    gain = np.asarray(gain, dtype=np.float64)
+    factors = 10**(gain / 10.0)
+    y = np.empty((len(factors), len(sig)))
+
+    # variants without clipping are the normalized signal
+    unclipped = factors * np.max(np.abs(sig)) <= 1.0
+    if np.any(unclipped):
+        y[unclipped] = sig / np.mean(np.abs(sig))
+    if not np.all(unclipped):
+        sigs = np.broadcast_to(sig, (np.count_nonzero(~unclipped), len(sig)))
+        y[~unclipped] = batch.apply_gain(sigs, fs, gain[~unclipped])
+    return y
+
+
+def add_noise(sig, fs, snr, seed=None, dtype=None):
+    """
+    Inject noise at several signal to noise ratios, see ops.add_noise.
+
+    Note:
+        The signal power is computed once, every variant gets its own noise.
+
+    Args:
+        sig                       (array) : signal/audio array.
+        fs                          (int) : sampling rate.
+        snr                        (list) : signal to noise ratios in dB.
+        seed (int/SeedSequence/Generator) : seed or generator of the noise.
+        dtype                     (dtype) : noise and output type, float32 (faster)
+                                             or float64 (default).
+
+    Returns:
+        array of shape (n_snrs, n_samples) of the augmented signals.
+    """
+    snr_linear = 10**(np.asarray(snr, dtype=np.float64).reshape(-1, 1) / 10.0)
+    sig_power = np.mean(np.square(sig, dtype=np.float64))
+
+    # compute noise powers and scaling factors
+    noise = get_noise((len(snr_linear), len(sig)), seed, dtype)
+    noise_power = np.mean(np.square(noise), axis=1, keepdims=True, dtype=np.float64)
+    noise *= np.sqrt((sig_power / noise_power) * (1 / snr_linear)).astype(noise.dtype)
+
+    # add noise
+    noise += sig
+    return noise
+
+
+def normalize(sig, fs, rms_level):
+    """
+    Normalize a signal to several rms levels, see ops.normalize.
+
+    Note:
+        The signal energy is computed once.
+
+    Args:
+        sig      (array) : signal/audio array.
+        fs         (int) : sampling rate.
+        rms_level (list) : rms levels in dB.
+
+    Returns:
+        array of shape (n_levels, n_samples) of the normalized signals.
+    """
+    energy = np.sum(np.square(sig, dtype=np.float64))
+
+    # linear rms levels and scaling factors
+    r = 10**(np.asarray(rms_level, dtype=np.float64).reshape(-1, 1) / 10.0)
+    a = np.sqrt((len(sig) * r**2) / energy)
+    return sig * a
+
+
+def shift_time(sig, fs, tshift, direction):
+    """
+    Shift a signal in time by several durations, see ops.shift_time.
+
+    Args:
+        sig     (array) : signal/audio array.
+        fs        (int) : sampling rate.
+        tshift   (list) : time shifts in seconds.
+        direction (str) : shift direction (to the left or right).
+
+    Returns:
+        array of shape (n_shifts, n_samples) of the shifted signals.
+    """
+    sigs = np.broadcast_to(sig, (len(tshift), len(sig)))
+    return batch.shift_time(sigs, fs, np.asarray(tshift), direction)
+
+
+def change_tone(sig, fs, tone, quality="medium"):
+    """
+    Change the tone of a signal by several factors, see ops.change_tone.
+
+    Note:
+        The resampling filter of every tone is designed once and cached, so
+        sweeping the same tones over many files reuses the filter designs.
+
+    Args:
+        sig     (array) : signal/audio array.
+        fs        (int) : sampling rate.
+        tone     (list) : tone factors.
+        quality   (str) : "fast", "medium" or "high", see utils.stretch.time_stretch.
+
+    Returns:
+        array of shape (n_tones, n_samples) of the augmented signals.
+    """
+    return np.stack([pitch_shift(sig, fs, t, quality) for t in tone])
+
+
+def sweep_file(infile, operation, values, **kwargs):
+    """
+    Read infile once and write one augmented file per parameter value.
+
+    Args:
+        infile    (str) : input filename/path.
+        operation (str) : one of "apply_gain", "add_noise", "normalize", "shift_time" or "change_tone".
+        values   (list) : values of the swept parameter (gain, snr, rms_level, tshift or tone).
+        kwargs          : other parameters of the operation (direction for shift_time).
+
+    Returns:
+        array of shape (n_values, n_samples) of the augmented signals.
+    """
+    if operation not in name_attributes:
+        raise ValueError("ParameterError: Unknown sweep operation %s." % operation)
+    parameter, name_attribute = name_attributes[operation]
+
+    # read input file
+    fs, sig = read_file(filename=infile)
+
+    # compute all variants
+    ys = globals()[operation](sig, fs, values, **kwargs)
+
+    # export data to files
+    output_file_path = os.path.dirname(infile)
+    for value, y in zip(values, ys):
+        write_file(output_file_path=output_file_path,
+                   input_file_name=infile,
+                   name_attribute=name_attribute.format(**dict(kwargs, **{parameter: value})),
+                   sig=y,
+                   fs=fs)
+    return ys
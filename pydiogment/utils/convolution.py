@@ -0,0 +1,344 @@
+"""
+- Description: implements direct and FFT (overlap-add) convolutions truncated to
+    the needed output length. The method is selected from the sizes, short
+    impulse responses use the direct convolution and longer ones the
+    overlap-add convolution whose cost grows with the log of the IR length.
+    An IR bank convolves a signal with many impulse responses from one forward
+    FFT of the signal and cached IR spectra, and a partitioned convolver
+    convolves streams block by block with a long impulse response.
+"""
+import os
+import threading
+import collections
+import numpy as np
+import scipy.fft
+from .io import read_file
+
+
+# longest impulse response convolved directly by the "auto" method
+direct_max_length = 256
+
+# smallest FFT size of the overlap-add blocks
+min_fft_size = 1024
+
+
+def get_fft_size(ir_length, n_out):
+    """
+    Choose the FFT size of an overlap-add convolution.
+
+    Args:
+        ir_length (int) : number of samples of the impulse response.
+        n_out     (int) : number of output samples.
+
+    Returns:
+        int of the FFT size, at least 2 * ir_length - 1.
+    """
+    # blocks about 3 times the IR length, one FFT for short signals
+    size = scipy.fft.next_fast_len(max(4 * ir_length, min_fft_size), real=True)
+    full = scipy.fft.next_fast_len(n_out + ir_length - 1, real=True)
+    return min(size, full)
+
+
+def fft_convolve(sig, ir, n_out=None, dtype=None):
+    """
+    Convolve a signal with an impulse response using overlap-add FFT convolution.
+
+    Args:
+        sig    (array) : signal/audio array.
+        ir     (array) : impulse response array.
+        n_out    (int) : number of output samples, by default the full length.
+        dtype  (dtype) : computation and output type, float32 or float64 (default).
+
+    Returns:
+        array of the first n_out samples of the full convolution.
+    """
+    dtype = np.dtype(dtype or np.float64)
+    n_full = len(sig) + len(ir) - 1
+    n_out = n_full if n_out is None else min(n_out, n_full)
+
+    # samples beyond n_out do not contribute to the output
+    x = np.asarray(sig[:n_out], dtype=dtype)
+    h = np.asarray(ir[:n_out], dtype=dtype)
+    if len(x) == 0 or len(h) == 0:
+        return np.zeros(max(n_out, 0), dtype=dtype)
+
+    # split the signal in blocks whose convolutions fit in one FFT each
+    nfft = get_fft_size(len(h), n_out)
+    block_size = nfft - len(h) + 1
+    spectrum = _get_block_spectra(x, block_size, nfft)
+
+    # convolve all blocks at once
+    spectrum *= scipy.fft.rfft(h, nfft)
+    return _overlap_add(scipy.fft.irfft(spectrum, nfft, axis=-1), block_size, n_out)
+
+
+def _get_block_spectra(x, block_size, nfft):
+    # spectra of the consecutive blocks of x, zero padded to nfft
+    n_blocks = -(-len(x) // block_size)
+    blocks = np.zeros((n_blocks, block_size), dtype=x.dtype)
+    blocks.ravel()[:len(x)] = x
+    return scipy.fft.rfft(blocks, nfft, axis=1)
+
+
+def _overlap_add(y_blocks, block_size, n_out):
+    # every block tail overlaps the next block only, y_blocks can be stacked
+    n_blocks, nfft = y_blocks.shape[-2:]
+    y = np.zeros(y_blocks.shape[:-2] + ((n_blocks + 1) * block_size,), dtype=y_blocks.dtype)
+    y[..., :n_blocks * block_size] = y_blocks[..., :block_size].reshape(y.shape[:-1] + (-1,))
+    tails = y[..., block_size:].reshape(y.shape[:-1] + (n_blocks, block_size))
+    tails[..., :nfft - block_size] += y_blocks[..., block_size:]
+    return y[..., :n_out]
+
+
+def convolve(sig, ir, n_out=None, method="auto", dtype=None):
+    """
+    Convolve a signal with an impulse response.
+
+    Args:
+        sig    (array) : signal/audio array.
+        ir     (array) : impulse response array.
+        n_out    (int) : number of output samples, by default the full length.
+        method   (str) : "direct", "fft" or "auto" to use the direct method for
+                         impulse responses of at most direct_max_length samples.
+        dtype  (dtype) : computation and output type, float32 or float64 (default).
+
+    Returns:
+        array of the first n_out samples of the full convolution.
+    """
+    if method not in ("auto", "direct", "fft"):
+        raise ValueError("ParameterError: Unknown convolution method %s." % method)
+
+    n_full = len(sig) + len(ir) - 1
+    n_out = n_full if n_out is None else min(n_out, n_full)
+    if method == "auto":
+        method = "direct" if min(len(ir), n_out) <= direct_max_length else "fft"
+
+    if method == "direct":
+        dtype = np.dtype(dtype or np.float64)
+        x = np.asarray(sig[:n_out], dtype=dtype)
+        h = np.asarray(ir[:n_out], dtype=dtype)
+        return np.convolve(x, h, "full")[:n_out]
+    return fft_convolve(sig, ir, n_out, dtype)
+
+
+class IRBank:
+    """
+    Impulse responses loaded once and convolved with signals together.
+
+    Note:
+        The spectra of the impulse responses are cached per FFT size in a least
+        recently used cache bounded in bytes. The signal is transformed once
+        and multiplied by every IR spectrum.
+
+    Args:
+        irs       (list) : impulse response arrays or wave file names/paths.
+        max_bytes  (int) : maximum total size of the cached spectra.
+    """
+    def __init__(self, irs, max_bytes=2**28):
+        self.irs, self.names = [], []
+        for i, ir in enumerate(irs):
+            if isinstance(ir, str):
+                _, ir_sig = read_file(filename=ir)
+                self.names.append(os.path.basename(ir.split(".wav")[0]))
+                ir = ir_sig
+            else:
+                self.names.append("ir%d" % i)
+            ir = np.array(ir, dtype=np.float64)
+            ir.flags.writeable = False
+            self.irs.append(ir)
+        if not self.irs:
+            raise ValueError("ParameterError: At least one impulse response is needed.")
+
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._spectra = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.irs)
+
+    def get_spectra(self, nfft, ir_length, dtype=np.float64):
+        """
+        Get the spectra of the impulse responses truncated to ir_length samples.
+
+        Args:
+            nfft       (int) : FFT size.
+            ir_length  (int) : number of kept samples of every impulse response.
+            dtype    (dtype) : float32 or float64 computation type.
+
+        Returns:
+            read-only complex array of shape (n_irs, nfft // 2 + 1).
+        """
+        key = (nfft, ir_length, np.dtype(dtype).str)
+        with self._lock:
+            if key in self._spectra:
+                self.hits += 1
+                self._spectra.move_to_end(key)
+                return self._spectra[key]
+            self.misses += 1
+
+        h = np.zeros((len(self.irs), ir_length), dtype=dtype)
+        for i, ir in enumerate(self.irs):
+            h[i, :min(len(ir), ir_length)] = ir[:ir_length]
+        spectra = scipy.fft.rfft(h, nfft, axis=1)
+        spectra.flags.writeable = False
+        if spectra.nbytes > self.max_bytes:
+            return spectra
+
+        with self._lock:
+            if key not in self._spectra:
+                self._spectra[key] = spectra
+                self.nbytes += spectra.nbytes
+
+            # evict least recently used entries
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._spectra.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+        return spectra
+
+    def convolve(self, sig, n_out=None, dtype=None):
+        """
+        Convolve a signal with every impulse response.
+
+        Args:
+            sig   (array) : signal/audio array.
+            n_out   (int) : number of output samples, by default the full length
+                            with the longest impulse response.
+            dtype (dtype) : computation and output type, float32 or float64 (default).
+
+        Returns:
+            array of shape (n_irs, n_out) of the convolved signals.
+        """
+        dtype = np.dtype(dtype or np.float64)
+        ir_length = max(len(ir) for ir in self.irs)
+        n_full = len(sig) + ir_length - 1
+        n_out = n_full if n_out is None else min(n_out, n_full)
+        ir_length = min(ir_length, n_out)
+
+        # one forward FFT of the signal blocks shared by all impulse responses
+        x = np.asarray(sig[:n_out], dtype=dtype)
+        nfft = get_fft_size(ir_length, n_out)
+        block_size = nfft - ir_length + 1
+        spectrum = _get_block_spectra(x, block_size, nfft)
+        spectra = self.get_spectra(nfft, ir_length, dtype)
+
+        y = np.empty((len(self.irs), n_out), dtype=dtype)
+        for i in range(len(self.irs)):
+            y_blocks = scipy.fft.irfft(spectrum * spectra[i], nfft, axis=-1)
+            y[i] = _overlap_add(y_blocks, block_size, n_out)
+        return y
+
+    def clear(self):
+        """
+        Remove all cached spectra.
+        """
+        with self._lock:
+            self._spectra.clear()
+            self.nbytes = 0
+
+
+class PartitionedConvolver:
+    """
+    Convolve a stream with an impulse response block by block.
+
+    Note:
+        Uniformly partitioned overlap-save convolution: the impulse response is
+        split in partitions of partition_size samples whose spectra are
+        multiplied with a delay line of the input partition spectra, so every
+        partition costs one FFT pair whatever the IR length. The latency is
+        below partition_size samples.
+
+    Args:
+        ir            (array) : impulse response array.
+        partition_size  (int) : number of samples per partition.
+        dtype         (dtype) : computation and output type, float32 or float64 (default).
+    """
+    def __init__(self, ir, partition_size=1024, dtype=None):
+        self.dtype = np.dtype(dtype or np.float64)
+        self.partition_size = partition_size
+        self.ir_length = len(ir)
+        self.n_in = 0
+        self.n_out = 0
+
+        # spectra of the impulse response partitions
+        n_partitions = max(-(-len(ir) // partition_size), 1)
+        h = np.zeros(n_partitions * partition_size, dtype=self.dtype)
+        h[:len(ir)] = ir
+        self._spectra = scipy.fft.rfft(h.reshape(n_partitions, partition_size),
+                                       2 * partition_size, axis=1)
+
+        # delay line of the input partition spectra, newest at _position
+        self._delay_line = np.zeros_like(self._spectra)
+        self._position = 0
+        self._previous = np.zeros(partition_size, dtype=self.dtype)
+        self._buffer = np.zeros(0, dtype=self.dtype)
+
+    def _process_partition(self, x):
+        n_partitions = len(self._spectra)
+        self._position = (self._position + 1) % n_partitions
+        self._delay_line[self._position] = scipy.fft.rfft(np.concatenate([self._previous, x]))
+        self._previous = x
+
+        # the k-th IR partition applies to the input partition k steps back
+        order = (self._position - np.arange(n_partitions)) % n_partitions
+        spectrum = np.einsum("kf,kf->f", self._delay_line[order], self._spectra)
+        return scipy.fft.irfft(spectrum, 2 * self.partition_size)[self.partition_size:]
+
+    def process(self, block):
+        """
+        Process a block of samples.
+
+        Args:
+            block (array) : signal/audio block.
+
+        Returns:
+            array of the output samples of the complete partitions received so far.
+        """
+        self.n_in += len(block)
+        x = np.concatenate([self._buffer, np.asarray(block, dtype=self.dtype)])
+        n = len(x) - len(x) % self.partition_size
+        self._buffer = x[n:]
+
+        outputs = [self._process_partition(x[i:i + self.partition_size])
+                   for i in range(0, n, self.partition_size)]
+        y = np.concatenate(outputs) if outputs else np.zeros(0, dtype=self.dtype)
+        self.n_out += len(y)
+        return y
+
+    def flush(self, tail=False):
+        """
+        Process the end of the stream.
+
+        Args:
+            tail (bool) : also return the ir_length - 1 samples of the tail.
+
+        Returns:
+            array of the remaining output samples.
+        """
+        n_remaining = self.n_in - self.n_out + (self.ir_length - 1 if tail else 0)
+        outputs = []
+        while sum(len(y) for y in outputs) < n_remaining:
+            padded = np.zeros(self.partition_size, dtype=self.dtype)
+            padded[:len(self._buffer)] = self._buffer
+            self._buffer = self._buffer[:0]
+            outputs.append(self._process_partition(padded))
+        y = np.concatenate(outputs)[:n_remaining] if outputs else np.zeros(0, dtype=self.dtype)
+        self.n_out += len(y)
+        return y
+
+    def stream(self, chunks, tail=False):
+        """
+        Convolve an iterable of blocks.
+
+        Args:
+            chunks (iter.) : iterable of signal/audio blocks.
+            tail    (bool) : also yield the ir_length - 1 samples of the tail.
+
+        Returns:
+            generator of the output blocks, flushed at the end.
+        """
+        for block in chunks:
+            yield self.process(block)
+        yield self.flush(tail)
@@ -0,0 +1,376 @@
+"""
+- Description: bounded concurrency scheduler for ffmpeg/ffprobe commands.
+    Commands run as asyncio subprocesses on an event loop owned by a background
+    thread, at most max_jobs at a time. Every command returns a future that
+    can be waited on or awaited, the return code is checked and timeouts or
+    cancellations kill the process. Filter fan-outs decode raw PCM once and
+    return the outputs of several filter branches as numpy arrays. The shared
+    runner finishes its pending commands when the interpreter exits.
+"""
+import os
+import atexit
+import asyncio
+import warnings
+import threading
+import subprocess
+import numpy as np
+
+
+class FFmpegError(RuntimeError):
+    """
+    Error raised when a command exits with a non zero return code.
+
+    Args:
+        args       (list) : the command.
+        returncode  (int) : the return code of the process.
+        stderr      (str) : the error output of the process.
+    """
+    def __init__(self, args, returncode, stderr):
+        self.args_list = args
+        self.returncode = returncode
+        self.stderr = stderr
+        super().__init__("Command %s exited with code %d: %s"
+                         % (" ".join(args), returncode, stderr.strip()[-1000:]))
+
+
+class FFmpegRunner:
+    """
+    Run commands asynchronously with a bounded number of processes.
+
+    Note:
+        submit and spawn return concurrent.futures.Future objects, call result()
+        to wait for them or asyncio.wrap_future() to await them from another
+        event loop. Cancelling a future kills its process. Filter fan-outs
+        (see execute_split) pass pipe file descriptors to ffmpeg, which only
+        POSIX systems support, split_supported tells if they can run.
+
+    Args:
+        max_jobs  (int) : maximum number of processes running at once, by default the number of CPUs.
+        timeout (float) : default time limit of a command in seconds, None for no limit.
+    """
+    split_supported = (os.name == "posix")
+
+    def __init__(self, max_jobs=None, timeout=None):
+        self.max_jobs = max_jobs or os.cpu_count() or 1
+        self.timeout = timeout
+        # the default loop of Python 3.8+ runs subprocesses on every platform
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        self._semaphore = self.spawn(self._make_semaphore()).result()
+
+    async def _make_semaphore(self):
+        # the semaphore is created on the loop that uses it
+        return asyncio.Semaphore(self.max_jobs)
+
+    async def execute(self, args, timeout=None):
+        """
+        Run a command on the runner loop, to be awaited from coroutines passed to spawn.
+
+        Args:
+            args     (list) : the command.
+            timeout (float) : time limit in seconds, by default the runner timeout.
+
+        Returns:
+            subprocess.CompletedProcess of the command.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        async with self._semaphore:
+            process = await asyncio.create_subprocess_exec(*args,
+                                                           stdin=subprocess.DEVNULL,
+                                                           stdout=subprocess.PIPE,
+                                                           stderr=subprocess.PIPE)
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+            except BaseException:
+                # timed out or cancelled, do not leave the process behind
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+                raise
+
+        if process.returncode != 0:
+            raise FFmpegError(list(args), process.returncode, stderr.decode("utf-8", "replace"))
+        return subprocess.CompletedProcess(list(args), process.returncode, stdout, stderr)
+
+    async def execute_split(self, sig, fs, filters, timeout=None):
+        """
+        Filter a signal through several filter chains in one ffmpeg process.
+
+        Note:
+            The signal is sent as raw float32 PCM on stdin and split with asplit,
+            every branch is read back as raw float32 PCM from its own pipe. The
+            pipes are passed with pass_fds, so this only runs on POSIX systems.
+
+        Args:
+            sig      (array) : signal/audio array.
+            fs         (int) : sampling rate.
+            filters   (list) : ffmpeg filter chains, one per output.
+            timeout  (float) : time limit in seconds, by default the runner timeout.
+
+        Returns:
+            list of float32 arrays, one per filter chain.
+        """
+        if not self.split_supported:
+            raise NotImplementedError("Filter fan-outs need POSIX pipes, "
+                                      "run one command per filter chain instead.")
+        timeout = self.timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        data = np.ascontiguousarray(sig, dtype="<f4").tobytes()
+
+        async with self._semaphore:
+            # one pipe per output, the write ends are inherited by ffmpeg
+            pipes = [os.pipe() for _ in filters]
+            files = [os.fdopen(r, "rb", 0) for r, _ in pipes]
+            args = get_split_command(fs, filters, [w for _, w in pipes])
+            try:
+                try:
+                    process = await asyncio.create_subprocess_exec(*args,
+                                                                   stdin=subprocess.PIPE,
+                                                                   stdout=subprocess.DEVNULL,
+                                                                   stderr=subprocess.PIPE,
+                                                                   pass_fds=[w for _, w in pipes])
+                finally:
+                    for _, w in pipes:
+                        os.close(w)
+
+                async def read_pipe(f):
+                    reader = asyncio.StreamReader()
+                    transport, _ = await loop.connect_read_pipe(
+                        lambda: asyncio.StreamReaderProtocol(reader), f)
+                    try:
+                        return await reader.read()
+                    finally:
+                        transport.close()
+
+                async def write_input():
+                    try:
+                        process.stdin.write(data)
+                        await process.stdin.drain()
+                    except (BrokenPipeError, ConnectionResetError):
+                        # ffmpeg failed, its return code tells why
+                        pass
+                    finally:
+                        process.stdin.close()
+
+                async def communicate():
+                    results = await asyncio.gather(write_input(), process.stderr.read(),
+                                                   process.wait(), *[read_pipe(f) for f in files])
+                    return results[1], results[3:]
+
+                try:
+                    stderr, outputs = await asyncio.wait_for(communicate(), timeout)
+                except BaseException:
+                    # timed out or cancelled, do not leave the process behind
+                    if process.returncode is None:
+                        process.kill()
+                        await process.wait()
+                    raise
+            finally:
+                for f in files:
+                    f.close()
+
+        if process.returncode != 0:
+            raise FFmpegError(args, process.returncode, stderr.decode("utf-8", "replace"))
+        return [np.frombuffer(output, dtype="<f4") for output in outputs]
+
+    def spawn(self, coroutine):
+        """
+        Schedule a coroutine on the runner loop.
+
+        Args:
+            coroutine (coroutine) : coroutine to run, it can await execute.
+
+        Returns:
+            concurrent.futures.Future of the coroutine result.
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    def submit(self, args, timeout=None):
+        """
+        Schedule a command.
+
+        Args:
+            args     (list) : the command.
+            timeout (float) : time limit in seconds, by default the runner timeout.
+
+        Returns:
+            concurrent.futures.Future of the subprocess.CompletedProcess, it
+            raises FFmpegError on failure and asyncio.TimeoutError on timeout.
+        """
+        return self.spawn(self.execute(args, timeout))
+
+    def submit_split(self, sig, fs, filters, timeout=None):
+        """
+        Schedule the filtering of a signal through several filter chains, see execute_split.
+
+        Args:
+            sig      (array) : signal/audio array.
+            fs         (int) : sampling rate.
+            filters   (list) : ffmpeg filter chains, one per output.
+            timeout  (float) : time limit in seconds, by default the runner timeout.
+
+        Returns:
+            concurrent.futures.Future of the list of float32 arrays.
+        """
+        return self.spawn(self.execute_split(sig, fs, filters, timeout))
+
+    async def run(self, args, timeout=None):
+        """
+        Run a command and await it from any event loop.
+
+        Args:
+            args     (list) : the command.
+            timeout (float) : time limit in seconds, by default the runner timeout.
+
+        Returns:
+            subprocess.CompletedProcess of the command.
+        """
+        return await asyncio.wrap_future(self.submit(args, timeout))
+
+    def close(self, wait=False):
+        """
+        Stop the runner loop.
+
+        Args:
+            wait (bool) : wait for the pending commands instead of cancelling them.
+        """
+        if not self._loop.is_running():
+            return
+
+        async def finish_all():
+            tasks = [task for task in asyncio.all_tasks()
+                     if task is not asyncio.current_task()]
+            if not wait:
+                for task in tasks:
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        self.spawn(finish_all()).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def get_filter_graph(filters):
+    """
+    Build a filter graph splitting the input into several filter chains.
+
+    Args:
+        filters (list) : ffmpeg filter chains, one per output.
+
+    Returns:
+        str of the filter graph with the outputs labelled o0, o1, ...
+    """
+    n = len(filters)
+    if n == 0:
+        raise ValueError("ParameterError: At least one filter chain is needed.")
+    split = "[0:a]asplit=%d%s" % (n, "".join("[s%d]" % i for i in range(n)))
+    chains = ["[s%d]%s[o%d]" % (i, chain or "anull", i) for i, chain in enumerate(filters)]
+    return ";".join([split] + chains)
+
+
+def get_split_command(fs, filters, fds):
+    """
+    Build the ffmpeg command reading raw float32 PCM on stdin and writing every
+    filter chain output as raw float32 PCM to a file descriptor.
+
+    Args:
+        fs        (int) : sampling rate.
+        filters  (list) : ffmpeg filter chains, one per output.
+        fds      (list) : output file descriptors, one per filter chain.
+
+    Returns:
+        list of the command arguments.
+    """
+    args = ["ffmpeg", "-y", "-v", "error", "-f", "f32le", "-ar", str(fs), "-ac", "1",
+            "-i", "pipe:0", "-filter_complex", get_filter_graph(filters)]
+    for i, fd in enumerate(fds):
+        args += ["-map", "[o%d]" % i, "-f", "f32le", "-ac", "1", "pipe:%d" % fd]
+    return args
+
+
+def get_tempo_filter(coefficient):
+    """
+    Get the filter chain changing the tempo like augt.slow_down and augt.speed.
+
+    Args:
+        coefficient (float) : tempo factor.
+
+    Returns:
+        str of the filter chain.
+    """
+    return "atempo=%s" % coefficient
+
+
+def get_tone_filter(fs, tone):
+    """
+    Get the filter chain changing the tone like augf.change_tone.
+
+    Args:
+        fs     (int) : sampling rate.
+        tone (float) : tone factor.
+
+    Returns:
+        str of the filter chain.
+    """
+    return "asetrate=%s*%s,aresample=%s" % (fs, tone, fs)
+
+
+# runner shared by the ffmpeg based augmentations
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_runner():
+    """
+    Get the runner shared by the ffmpeg based augmentations, created on first use.
+
+    Note:
+        The pending commands of the shared runner are waited for at exit, so
+        augmentations whose futures are never read still write their outputs.
+
+    Returns:
+        the shared FFmpegRunner.
+    """
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = FFmpegRunner()
+            atexit.register(_runner.close, wait=True)
+        return _runner
+
+
+def report(future, output_file):
+    """
+    Report the output of a scheduled command when it completes.
+
+    Note:
+        The output file is printed once written, a failure is raised as a
+        warning so it is not lost when the future is never read. The future
+        still raises the error on result().
+
+    Args:
+        future      (Future) : future of the command writing output_file.
+        output_file    (str) : output filename/path.
+
+    Returns:
+        the future itself.
+    """
+    def done(future):
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is None:
+            print("Writing data to " + output_file + ".")
+        else:
+            warnings.warn("Cannot write %s: %s" % (output_file, error), RuntimeWarning)
+
+    future.add_done_callback(done)
+    return future
@@ -1,12 +1,15 @@
 """
-- Description: implements the scipybased Butterworth filters.
+- Description: implements the scipybased Butterworth filters, block filters and filter banks.
     - bandpas: https://stackoverflow.com/questions/12093594/how-to-implement-band-pass-butterworth-filter-with-scipy-signal-butter
     - highpass: https://stackoverflow.com/questions/39032325/python-high-pass-filter
 """
-from scipy.signal import butter, lfilter
+import functools
+import numpy as np
+from scipy.signal import butter, sosfilt, lfilter
+from .convolution import IRBank
 
 
-def butter_lowpass(cutoff, fs, order=5):
+def butter_lowpass(cutoff, fs, order=5, output="ba"):
     """
     Design lowpass filter.
 
@@ -14,19 +17,19 @@ def butter_lowpass(cutoff, fs, order=5):
         cutoff (float) : the cutoff frequency of the filter.
         fs     (float) : the sampling rate.
         order    (int) : order of the filter, by default defined to 5.
+        output   (str) : "ba" for the numerator and denominator or "sos" for second-order sections.
     """
     # calculate the Nyquist frequency
     nyq = 0.5 * fs
 
-    # design filter
+    # normalized cutoff
     low = cutoff / nyq
-    b, a = butter(order, low, btype='low', analog=False)
 
-    # returns the filter coefficients: numerator and denominator
-    return b, a
+    # design filter and return its coefficients: numerator and denominator or sections
+    return butter(order, low, btype='low', analog=False, output=output)
 
 
-def butter_highpass(cutoff, fs, order=5):
+def butter_highpass(cutoff, fs, order=5, output="ba"):
     """
     Design a highpass filter.
 
@@ -34,19 +37,19 @@ def butter_highpass(cutoff, fs, order=5):
         cutoff (float) : the cutoff frequency of the filter.
         fs     (float) : the sampling rate.
         order    (int) : order of the filter, by default defined to 5.
+        output   (str) : "ba" for the numerator and denominator or "sos" for second-order sections.
     """
     # calculate the Nyquist frequency
     nyq = 0.5 * fs
 
-    # design filter
+    # normalized cutoff
     high = cutoff / nyq
-    b, a = butter(order, high, btype='high', analog=False)
 
-    # returns the filter coefficients: numerator and denominator
-    return b, a
+    # design filter and return its coefficients: numerator and denominator or sections
+    return butter(order, high, btype='high', analog=False, output=output)
 
 
-def butter_bandpass(low_cut, high_cut, fs, order=5):
+def butter_bandpass(low_cut, high_cut, fs, order=5, output="ba"):
     """
     Design band pass filter.
 
@@ -55,38 +58,303 @@ def butter_bandpass(low_cut, high_cut, fs, order=5):
         high_cut (float) : the high cutoff frequency of the filter.
         fs       (float) : the sampling rate.
         order      (int) : order of the filter, by default defined to 5.
+        output     (str) : "ba" for the numerator and denominator or "sos" for second-order sections.
     """
     # calculate the Nyquist frequency
     nyq = 0.5 * fs
 
-    # design filter
+    # normalized cutoffs
     low = low_cut / nyq
     high = high_cut / nyq
-    b, a = butter(order, [low, high], btype='band')
 
-    # returns the filter coefficients: numerator and denominator
-    return b, a
+    # design filter and return its coefficients: numerator and denominator or sections
+    return butter(order, [low, high], btype='band', output=output)
 
 
-def butter_filter(sig, fs, ftype="low", low_cut=50, high_cut=2000, order=5):
+def get_cutoffs(ftype, low_cut, high_cut):
+    """
+    Get the cutoff frequencies used by a filter type.
+
+    Args:
+        ftype      (str) : the filter type, "low", "high" or "band".
+        low_cut  (float) : the low cutoff frequency.
+        high_cut (float) : the high cutoff frequency.
+
+    Returns:
+        tuple of the cutoff frequencies.
+    """
+    if   ftype == "band" : return (low_cut, high_cut)
+    elif ftype == "high" : return (high_cut,)
+    else                 : return (low_cut,)
+
+
+@functools.lru_cache(maxsize=256)
+def get_sos(ftype, cutoffs, fs, order=5):
+    """
+    Design a Butterworth filter as second-order sections, once per parameters.
+
+    Args:
+        ftype      (str) : the filter type, "low", "high" or "band".
+        cutoffs  (tuple) : the cutoff frequencies, see get_cutoffs.
+        fs       (float) : the sampling rate.
+        order      (int) : order of the filter.
+
+    Returns:
+        read-only array of shape (n_sections, 6) of the second-order sections,
+        shared by all callers. sosfilt needs a writable copy of it.
+    """
+    if   ftype == "band" : sos = butter_bandpass(cutoffs[0], cutoffs[1], fs, order, output="sos")
+    elif ftype == "high" : sos = butter_highpass(cutoffs[0], fs, order, output="sos")
+    else                 : sos = butter_lowpass(cutoffs[0],  fs, order, output="sos")
+    sos.flags.writeable = False
+    return sos
+
+
+def butter_filter(sig, fs, ftype="low", low_cut=50, high_cut=2000, order=5, axis=-1):
     """
     Apply filter to signal.
 
+    Note:
+        The filter is designed once per parameters (see get_sos) and applied as
+        cascaded second-order sections, which stay stable at high orders and
+        low cutoffs.
+
     Args:
-        sig      (array) : the signal array to filter.
+        sig      (array) : the signal array to filter, or clips array of shape (n_clips, n_samples).
         fs       (float) : the sampling rate.
         ftype      (str) : the filter type, by default defined to a low pass filter
         low_cut  (float) : the low cutoff frequency, by default defined to  50Hz
         high_cut (float) : the high cutoff frequency, by default defined to 2000Hz.
         order      (int) : order of the filter, by default defined to 5.
+        axis       (int) : axis of the samples.
 
     Returns:
         array of the filtered signal.
     """
-    if   ftype == "band" : b, a = butter_bandpass(low_cut, high_cut, fs, order)
-    elif ftype == "high" : b, a = butter_highpass(high_cut, fs, order)
-    else                 : b, a = butter_lowpass(low_cut,  fs, order)
+    sos = np.array(get_sos(ftype, get_cutoffs(ftype, low_cut, high_cut), fs, order))
 
     # filter signal
-    y = lfilter(b, a, sig)
+    y = sosfilt(sos, sig, axis=axis)
     return y
+
+
+class BlockFilter:
+    """
+    Filter a signal given block by block, carrying the filter state.
+
+    Note:
+        The state starts at zero like a one-shot lfilter or sosfilt call and is
+        carried from one block to the next, so the concatenated output is
+        identical to filtering the whole signal at once.
+
+    Args:
+        coefficients (array/tuple) : second-order sections array of shape (n_sections, 6)
+                                     or (b, a) tuple of numerator and denominator.
+        axis                 (int) : axis of the samples in the blocks.
+    """
+    def __init__(self, coefficients, axis=-1):
+        if isinstance(coefficients, tuple):
+            self.b, self.a = coefficients
+            self.sos = None
+        else:
+            # writable copy, the cached designs are read-only
+            self.sos = np.array(coefficients)
+        self.axis = axis
+        self.zi = None
+
+    @classmethod
+    def from_parameters(cls, ftype, fs, low_cut=50, high_cut=2000, order=5, axis=-1):
+        """
+        Build the block filter of a Butterworth filter, see butter_filter.
+
+        Args:
+            ftype      (str) : the filter type, "low", "high" or "band".
+            fs       (float) : the sampling rate.
+            low_cut  (float) : the low cutoff frequency.
+            high_cut (float) : the high cutoff frequency.
+            order      (int) : order of the filter.
+            axis       (int) : axis of the samples in the blocks.
+
+        Returns:
+            BlockFilter of the cached second-order sections design.
+        """
+        return cls(get_sos(ftype, get_cutoffs(ftype, low_cut, high_cut), fs, order), axis)
+
+    def _initial_state(self, block):
+        # zero state with the shape of the block, the samples axis holding the
+        # delays of a section or of the filter
+        shape = list(np.shape(block))
+        if self.sos is not None:
+            shape[self.axis] = 2
+            return np.zeros([len(self.sos)] + shape)
+        shape[self.axis] = max(len(self.a), len(self.b)) - 1
+        return np.zeros(shape)
+
+    def process(self, block):
+        """
+        Filter a block of samples.
+
+        Args:
+            block (array) : signal/audio block.
+
+        Returns:
+            array of the filtered block.
+        """
+        if self.zi is None:
+            self.zi = self._initial_state(block)
+        if self.sos is not None:
+            y, self.zi = sosfilt(self.sos, block, axis=self.axis, zi=self.zi)
+        else:
+            y, self.zi = lfilter(self.b, self.a, block, axis=self.axis, zi=self.zi)
+        return y
+
+    def stream(self, chunks):
+        """
+        Filter an iterable of blocks.
+
+        Args:
+            chunks (iter.) : iterable of signal/audio blocks.
+
+        Returns:
+            generator of the filtered blocks.
+        """
+        for block in chunks:
+            yield self.process(block)
+
+    def reset(self):
+        """
+        Reset the filter state to zero, to filter another signal.
+        """
+        self.zi = None
+
+
+def get_impulse_response(sos, tolerance=1e-10, max_length=2**20):
+    """
+    Compute the impulse response of a filter until it has decayed.
+
+    Args:
+        sos       (array) : second-order sections of the filter.
+        tolerance (float) : energy of the truncated tail relative to the total energy.
+        max_length  (int) : maximum number of samples.
+
+    Returns:
+        array of the truncated impulse response.
+    """
+    sos = np.array(sos)
+    length = 1024
+    while True:
+        impulse = np.zeros(length)
+        impulse[0] = 1.0
+        h = sosfilt(sos, impulse)
+
+        # samples after the tolerance is reached are dropped
+        tail = np.cumsum(np.square(h[::-1]))[::-1]
+        n = np.count_nonzero(tail > tolerance * tail[0])
+        if n < length // 2 or length >= max_length:
+            return h[:max(n, 1)]
+        length *= 2
+
+
+class FilterBank:
+    """
+    Several Butterworth filters applied to a signal at once.
+
+    Note:
+        With the "iir" method every band runs its cascaded second-order
+        sections. With the "fft" method the bands are applied as their decayed
+        impulse responses (see get_impulse_response) with an IRBank, so the
+        signal is transformed once and multiplied by every band response. The
+        "auto" method uses the FFT for bands of many sections whose impulse
+        responses are short enough.
+        Designs are shared through get_sos and the banks are kept per sampling rate.
+
+    Args:
+        bands  (list) : (filter_type, low_cutoff_freq, high_cutoff_freq) tuples, like
+                        the arguments of ops.apply_filter.
+        order   (int) : filter order to define its accuracy.
+        method  (str) : "iir", "fft" or "auto".
+    """
+    # fewest sections per band and longest impulse response filtered in the
+    # frequency domain by "auto". Heuristic defaults: benchmarks/bench_filters.py
+    # puts the break-even of the two methods around 6 to 8 sections, the length
+    # bound only keeps the cached band spectra small.
+    fft_min_sections = 6
+    fft_max_length = 16384
+
+    def __init__(self, bands, order=5, method="auto"):
+        if method not in ("auto", "iir", "fft"):
+            raise ValueError("ParameterError: Unknown filter bank method %s." % method)
+        if not bands:
+            raise ValueError("ParameterError: At least one band is needed.")
+        self.bands = [(ftype, low_cut, high_cut) for ftype, low_cut, high_cut in bands]
+        self.order = order
+        self.method = method
+        self._ir_banks = {}
+
+    def __len__(self):
+        return len(self.bands)
+
+    def get_names(self):
+        """
+        Get the output file name attributes of the bands.
+
+        Returns:
+            list of str, one per band.
+        """
+        names = []
+        for ftype, low_cut, high_cut in self.bands:
+            cutoffs = "_".join(str(cutoff) for cutoff in get_cutoffs(ftype, low_cut, high_cut))
+            names.append("_augmented_%s_pass_filtered_%s.wav" % (ftype, cutoffs))
+        return names
+
+    def get_sos(self, fs):
+        """
+        Get the second-order sections of the bands.
+
+        Args:
+            fs (float) : the sampling rate.
+
+        Returns:
+            list of arrays of second-order sections, one per band.
+        """
+        return [get_sos(ftype, get_cutoffs(ftype, low_cut, high_cut), fs, self.order)
+                for ftype, low_cut, high_cut in self.bands]
+
+    def get_ir_bank(self, fs):
+        """
+        Get the bank of the impulse responses of the bands.
+
+        Args:
+            fs (float) : the sampling rate.
+
+        Returns:
+            IRBank of the band impulse responses.
+        """
+        if fs not in self._ir_banks:
+            self._ir_banks[fs] = IRBank([get_impulse_response(sos) for sos in self.get_sos(fs)])
+        return self._ir_banks[fs]
+
+    def apply(self, sig, fs):
+        """
+        Filter a signal with every band.
+
+        Args:
+            sig (array) : signal/audio array.
+            fs  (float) : the sampling rate.
+
+        Returns:
+            array of shape (n_bands, n_samples) of the filtered signals.
+        """
+        method = self.method
+        if method == "auto":
+            method = "iir"
+            if np.mean([len(sos) for sos in self.get_sos(fs)]) >= self.fft_min_sections:
+                ir_length = max(len(ir) for ir in self.get_ir_bank(fs).irs)
+                method = "fft" if ir_length <= self.fft_max_length else "iir"
+
+        if method == "fft":
+            return self.get_ir_bank(fs).convolve(sig, len(sig))
+
+        # one pass of the sections per band, the signal is converted once
+        x = np.asarray(sig, dtype=np.float64)
+        return np.stack([sosfilt(np.array(sos), x) for sos in self.get_sos(fs)])
@@ -2,30 +2,406 @@
 - Description: write and read module for wave data.
 """
 import os
+import queue
+import struct
+import threading
+import collections
+import numpy as np
 from scipy.io.wavfile import read, write
+from .rng import get_generator
 
 
-def read_file(filename):
+# default number of samples per block for the chunked reader and writer
+BLOCK_SIZE = 65536
+
+# background writer used by write_file when one is active
+_writer = None
+
+# decoded audio cache used by read_file when one is active
+_cache = None
+
+# output sample format used by write_file when none is given
+_output_format = {"sample_format": None, "full_scale": None, "dither": False}
+
+# bit depths of the integer wave sample formats
+_int_formats = {"uint8": 8, "int16": 16, "int24": 24, "int32": 32}
+
+
+def read_file(filename, mmap=False, start=0, stop=None):
     """
     Read wave file as mono.
 
+    Note:
+        With mmap=True the samples are returned as a read-only view on a memory
+        map of the file, so pages are only loaded from disk when accessed.
+        A frame range [start, stop) can be given to only read part of the file,
+        without mmap the range is copied into memory and the rest is never read.
+        24-bit files cannot be memory mapped, only their range is decoded, as
+        int32 samples like a full read.
+
     Args:
         filename (str) : wave file / path.
+        mmap    (bool) : return a lazily paged read-only view, default False.
+        start    (int) : index of the first frame to read.
+        stop     (int) : index after the last frame to read, None reads to the end.
 
     Returns:
         tuple of sampling rate and audio data.
     """
-    fs, sig = read(filename=filename)
-    if (sig.ndim == 1):
-        samples = sig
+    if not mmap and start == 0 and stop is None:
+        if _cache is not None and isinstance(filename, str):
+            return _cache.read(filename)
+        return _read(filename)
+
+    try:
+        fs, sig = read(filename=filename, mmap=True)
+    except ValueError:
+        header = _read_header(filename)
+        if header["sample_width"] != 3:
+            raise
+        samples = _read_frames(filename, header, start, stop)
+        samples.flags.writeable = not mmap
+        return header["fs"], samples
+    sig = sig[start:stop]
+    samples = sig if sig.ndim == 1 else sig[:, 0]
+
+    # either expose the mapped frames read-only or copy the range to memory
+    if mmap:
+        samples.flags.writeable = False
     else:
-        samples = sig[:, 0]
+        samples = np.array(samples)
     return fs, samples
 
 
-def write_file(output_file_path, input_file_name, name_attribute, sig, fs):
+def read_info(filename):
     """
-    Read wave file as mono.
+    Read the sampling rate and length of a wave file from its header.
+
+    Args:
+        filename (str) : wave file / path.
+
+    Returns:
+        tuple of sampling rate and number of frames.
+    """
+    header = _read_header(filename)
+    return header["fs"], header["n_frames"]
+
+
+def _read_header(filename):
+    # parse the chunks up to the data chunk, RF64 sizes are in the ds64 chunk
+    with open(filename, "rb") as fid:
+        riff = fid.read(12)
+        if riff[:4] not in (b"RIFF", b"RF64") or riff[8:12] != b"WAVE":
+            raise ValueError("File format %r not understood." % riff[:4])
+        header, data_size = {}, None
+        while True:
+            chunk = fid.read(8)
+            if len(chunk) < 8:
+                raise ValueError("No data chunk found.")
+            chunk_id, size = chunk[:4], struct.unpack("<I", chunk[4:])[0]
+            if chunk_id == b"data":
+                if riff[:4] == b"RF64" and size == 0xFFFFFFFF:
+                    size = data_size
+                frame_size = header["n_channels"] * header["sample_width"]
+                header.update(offset=fid.tell(), n_frames=size // frame_size)
+                return header
+            body = fid.read(size + size % 2)
+            if chunk_id == b"fmt ":
+                n_channels, fs = struct.unpack("<HI", body[2:8])
+                header.update(fs=fs, n_channels=n_channels,
+                              sample_width=struct.unpack("<H", body[14:16])[0] // 8)
+            elif chunk_id == b"ds64":
+                data_size = struct.unpack("<Q", body[8:16])[0]
+
+
+def _read_frames(filename, header, start=0, stop=None):
+    # decode the first channel of a frame range of 24-bit samples, into the
+    # most significant bytes of int32 samples like scipy
+    start, stop, _ = slice(start, stop).indices(header["n_frames"])
+    n_frames = max(stop - start, 0)
+    frame_size = header["n_channels"] * 3
+    with open(filename, "rb") as fid:
+        fid.seek(header["offset"] + start * frame_size)
+        data = np.frombuffer(fid.read(n_frames * frame_size), dtype=np.uint8)
+    samples = np.zeros((n_frames, 4), dtype=np.uint8)
+    samples[:, 1:] = data.reshape(n_frames, frame_size)[:, :3]
+    return samples.view("<i4")[:, 0].astype(np.int32)
+
+
+def _read(filename):
+    fs, sig = read(filename=filename)
+
+    # keep a contiguous copy of the first channel only
+    samples = sig if sig.ndim == 1 else np.ascontiguousarray(sig[:, 0])
+    return fs, samples
+
+
+def set_cache(cache):
+    """
+    Set the decoded audio cache used by read_file.
+
+    Args:
+        cache (AudioCache) : cache to use, None decodes every read.
+
+    Returns:
+        the previously set cache.
+    """
+    global _cache
+    previous, _cache = _cache, cache
+    return previous
+
+
+class AudioCache:
+    """
+    Least recently used cache of decoded wave files, bounded in bytes.
+
+    Used as a context manager it becomes the cache of read_file, so several
+    augmentations of the same file decode it only once. Entries are keyed by
+    path, modification time and size so changed files are decoded again, and
+    the cached arrays are read-only so they cannot be corrupted by a caller.
+
+    Args:
+        max_bytes (int) : maximum total size of the cached arrays.
+    """
+    def __init__(self, max_bytes=2**30):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._previous = None
+        self._lock = threading.Lock()
+
+    def read(self, filename):
+        """
+        Read wave file as mono through the cache.
+
+        Args:
+            filename (str) : wave file / path.
+
+        Returns:
+            tuple of sampling rate and read-only audio data.
+        """
+        stat = os.stat(filename)
+        key = (os.path.abspath(filename), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            self.misses += 1
+
+        fs, sig = _read(filename)
+        sig.flags.writeable = False
+        if sig.nbytes > self.max_bytes:
+            return fs, sig
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (fs, sig)
+                self.nbytes += sig.nbytes
+
+            # evict least recently used entries
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+        return fs, sig
+
+    def clear(self):
+        """
+        Remove all cached entries.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __enter__(self):
+        self._previous = set_cache(self)
+        return self
+
+    def __exit__(self, *args):
+        set_cache(self._previous)
+
+
+def _centered(sig):
+    # unsigned 8 bit samples are offset by 128
+    return sig.astype(np.float64) - 128 if sig.dtype.kind == "u" else sig
+
+
+def get_full_scale(sig, full_scale=None):
+    """
+    Get the signal level that is mapped to the full scale of the output format.
+
+    Args:
+        sig            (array) : signal/audio array.
+        full_scale (float/str) : level to use, "peak" for the largest absolute
+                                 value of the signal, by default the integer range
+                                 for integer signals, 1.0 for float signals within
+                                 [-1, 1] and their peak otherwise.
+
+    Returns:
+        float of the full scale level.
+    """
+    if full_scale is None:
+        if sig.dtype.kind != "f":
+            return 2.0**(8 * sig.dtype.itemsize - 1)
+
+        # augmented integer samples are floats beyond [-1, 1], scale them to
+        # their peak instead of clipping them
+        return max(get_full_scale(sig, "peak"), 1.0)
+
+    if full_scale == "peak":
+        # block-wise reduction over all the samples to avoid a full-size temporary
+        x = np.reshape(sig, -1)
+        peak = 0.0
+        for i in range(0, len(x), BLOCK_SIZE):
+            peak = max(peak, float(np.max(np.abs(_centered(x[i:i + BLOCK_SIZE])))))
+        return peak or 1.0
+    return float(full_scale)
+
+
+def cast_samples(sig, dtype):
+    """
+    Cast a processed signal back to the sample type of its input.
+
+    Note:
+        Integer types are rounded and clipped to their range, like ffmpeg
+        writing the same processing to pcm samples.
+
+    Args:
+        sig   (array) : signal/audio array.
+        dtype (dtype) : sample type of the input signal.
+
+    Returns:
+        array of the samples in the given type.
+    """
+    dtype = np.dtype(dtype)
+    if dtype.kind not in "iu":
+        return np.asarray(sig, dtype=dtype)
+    info = np.iinfo(dtype)
+    return np.clip(np.rint(sig), info.min, info.max).astype(dtype)
+
+
+def convert_samples(sig, sample_format, full_scale=None, dither=False):
+    """
+    Convert a signal to a wave sample format.
+
+    Note:
+        Integer outputs are scaled so that full_scale maps to the integer range,
+        rounded and clipped. Dithering adds triangular noise of one least
+        significant bit before rounding, drawn from fresh entropy with
+        dither=True or reproducibly from a seed (int, SeedSequence or Generator,
+        see utils.rng.get_generator).
+
+    Args:
+        sig            (array) : signal/audio array.
+        sample_format    (str) : "uint8", "int16", "int24", "int32", "float32" or "float64".
+        full_scale (float/str) : signal level mapped to the output full scale (see get_full_scale).
+        dither     (bool/seed) : add triangular dither before rounding to integers.
+
+    Returns:
+        array of the converted samples, int24 samples are returned as int32.
+    """
+    full_scale = get_full_scale(sig, full_scale)
+    x = _centered(sig)
+    if sample_format in ("float32", "float64"):
+        return (x / full_scale).astype(sample_format)
+
+    if sample_format not in _int_formats:
+        raise ValueError("Unsupported sample format '%s'." % sample_format)
+
+    # scale, dither, round and clip in float64, float32 cannot hold 2**31 - 1
+    max_int = 2**(_int_formats[sample_format] - 1)
+    y = x.astype(np.float64) * (max_int / full_scale)
+    if dither is not None and dither is not False:
+        rng = get_generator(None if dither is True else dither)
+        y += rng.random(y.shape) - rng.random(y.shape)
+    np.rint(y, out=y)
+    np.clip(y, -max_int, max_int - 1, out=y)
+
+    if sample_format == "uint8":
+        return (y + 128).astype(np.uint8)
+    return y.astype(np.int32 if sample_format == "int24" else sample_format)
+
+
+def set_output_format(sample_format=None, full_scale=None, dither=False):
+    """
+    Set the default output sample format of write_file, and so of all augmentations.
+
+    Args:
+        sample_format    (str) : output format (see convert_samples), None keeps the signal type.
+        full_scale (float/str) : signal level mapped to the output full scale (see get_full_scale).
+        dither     (bool/seed) : add triangular dither before rounding to integers.
+    """
+    _output_format.update(sample_format=sample_format, full_scale=full_scale, dither=dither)
+
+
+def write_wav(fid, sig, fs, sample_format=None, full_scale=None, dither=False):
+    """
+    Write a signal to a wave file or file object in a given sample format.
+
+    Args:
+        fid         (str/file) : wave file / path or binary file object.
+        sig            (array) : signal/audio array.
+        fs               (int) : sampling rate.
+        sample_format    (str) : output format (see convert_samples), None keeps the signal type.
+        full_scale (float/str) : signal level mapped to the output full scale (see get_full_scale).
+        dither     (bool/seed) : add triangular dither before rounding to integers.
+    """
+    if sample_format is None:
+        write(filename=fid, rate=fs, data=sig)
+    else:
+        # convert block by block to avoid a full-size converted copy
+        full_scale = get_full_scale(sig, full_scale)
+        with ChunkedWriter(fid, fs, sample_format) as writer:
+            for i in range(0, len(sig), BLOCK_SIZE):
+                writer.write(convert_samples(sig[i:i + BLOCK_SIZE], sample_format,
+                                             full_scale, dither))
+
+
+def _write(fpath, sig, fs, sample_format=None, full_scale=None, dither=False):
+    write_wav(fpath, sig, fs, sample_format, full_scale, dither)
+    print("Writing data to " + fpath + ".")
+
+
+def set_writer(writer):
+    """
+    Set the writer that write_file hands its files over to.
+
+    Args:
+        writer (object) : object with a submit(fpath, sig, fs, sample_format,
+                          full_scale, dither, params) method like AsyncWriter
+                          or ShardWriter, None writes the files directly.
+
+    Returns:
+        the previously set writer.
+    """
+    global _writer
+    previous, _writer = _writer, writer
+    return previous
+
+
+def get_writer():
+    """
+    Get the writer that write_file hands its files over to.
+
+    Returns:
+        the set writer, None if the files are written directly.
+    """
+    return _writer
+
+
+def write_file(output_file_path, input_file_name, name_attribute, sig, fs,
+               sample_format=None, full_scale=None, dither=False, params=None):
+    """
+    Write wave file.
+
+    Note:
+        Inside a ``with AsyncWriter():`` block the file is queued and written by
+        a background thread instead, see also set_writer.
 
     Args:
         output_file_path (str) : path to save resulting wave file to.
@@ -33,12 +409,374 @@ def write_file(output_file_path, input_file_name, name_attribute, sig, fs):
         name_attribute   (str) : attribute to add to output file name.
         sig            (array) : signal/audio array.
         fs               (int) : sampling rate.
+        sample_format    (str) : output format (see convert_samples), by default
+                                 the one set with set_output_format.
+        full_scale (float/str) : signal level mapped to the output full scale (see get_full_scale).
+        dither     (bool/seed) : add triangular dither before rounding to integers.
+        params          (dict) : parameters of the output, stored by writers keeping
+                                 metadata (see utils.shards.ShardWriter).
+    """
+    if sample_format is None:
+        sample_format = _output_format["sample_format"]
+        full_scale = _output_format["full_scale"]
+        dither = _output_format["dither"]
 
-    Returns:
-        tuple of sampling rate and audio data.
+    # set-up the output file name
+    fname = os.path.basename(input_file_name).split(".wav")[0] + name_attribute
+    fpath = os.path.join(output_file_path, fname)
+    if _writer is not None:
+        _writer.submit(fpath, sig, fs, sample_format, full_scale, dither, params)
+    else:
+        _write(fpath, sig, fs, sample_format, full_scale, dither)
+
+
+def write_file_chunks(output_file_path, input_file_name, name_attribute, chunks, fs,
+                      sample_format=None, full_scale=None, dither=False):
     """
+    Write wave file from blocks of samples, with the same writer and output
+    format as write_file.
+
+    Note:
+        The blocks are converted and written one by one. A full scale that
+        depends on the signal (integer range, float peak) needs one more pass
+        over the blocks first. When a writer is set (see set_writer) the blocks
+        are gathered and handed over as one signal.
+
+    Args:
+        output_file_path (str) : path to save resulting wave file to.
+        input_file_name  (str) : name of processed wave file,
+        name_attribute   (str) : attribute to add to output file name.
+        chunks      (callable) : returns a new iterable of the signal/audio blocks on every call.
+        fs               (int) : sampling rate.
+        sample_format    (str) : output format (see convert_samples), by default
+                                 the one set with set_output_format.
+        full_scale (float/str) : signal level mapped to the output full scale (see get_full_scale).
+        dither     (bool/seed) : add triangular dither before rounding to integers.
+    """
+    if sample_format is None:
+        sample_format = _output_format["sample_format"]
+        full_scale = _output_format["full_scale"]
+        dither = _output_format["dither"]
+
     # set-up the output file name
     fname = os.path.basename(input_file_name).split(".wav")[0] + name_attribute
     fpath = os.path.join(output_file_path, fname)
-    write(filename=fpath, rate=fs, data=sig)
+    if _writer is not None:
+        blocks = list(chunks())
+        sig = np.concatenate(blocks) if blocks else np.zeros(0)
+        _writer.submit(fpath, sig, fs, sample_format, full_scale, dither)
+        return
+    if sample_format is None:
+        write_chunks(fpath, fs, chunks())
+        return
+
+    if dither is not None and dither is not False and dither is not True:
+        # one dither stream over all the blocks
+        dither = get_generator(dither)
+    if full_scale is None or full_scale == "peak":
+        # the extremes of every block have the full scale of the whole signal
+        extremes = [np.array([np.min(block), np.max(block)]) for block in chunks() if len(block)]
+        full_scale = get_full_scale(np.concatenate(extremes) if extremes else np.zeros(0),
+                                    full_scale)
+    with ChunkedWriter(fpath, fs, sample_format) as writer:
+        for block in chunks():
+            writer.write(convert_samples(block, sample_format, full_scale, dither))
     print("Writing data to " + fpath + ".")
+
+
+class AsyncWriter:
+    """
+    Write wave files from a bounded queue drained by background threads.
+
+    Used as a context manager it becomes the writer of write_file, so the
+    augmentations hand their output over and go on with the next computation.
+    Leaving the block waits for all pending files. An error raised while
+    writing is re-raised by the next call to submit, flush or close, or when
+    leaving the block. If the block itself raised, its error goes on with the
+    write error as context.
+
+    Args:
+        workers   (int) : number of writer threads.
+        max_queue (int) : maximum number of pending files, submit blocks when full.
+    """
+    def __init__(self, workers=1, max_queue=16):
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._errors = []
+        self._previous = None
+        self._threads = [threading.Thread(target=self._work, daemon=True)
+                         for _ in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                _write(*item)
+            except Exception as e:
+                self._errors.append(e)
+            finally:
+                self._queue.task_done()
+
+    def _raise_errors(self):
+        if self._errors:
+            error, self._errors = self._errors[0], []
+            raise error
+
+    def submit(self, fpath, sig, fs, sample_format=None, full_scale=None, dither=False,
+               params=None):
+        """
+        Queue a signal to be written to a wave file.
+
+        Note:
+            The array is written as it is when dequeued, it should not be
+            modified after submitting it. Wave files keep no parameters.
+
+        Args:
+            fpath            (str) : output wave file / path.
+            sig            (array) : signal/audio array.
+            fs               (int) : sampling rate.
+            sample_format    (str) : output format (see convert_samples), None keeps the signal type.
+            full_scale (float/str) : signal level mapped to the output full scale (see get_full_scale).
+            dither     (bool/seed) : add triangular dither before rounding to integers.
+            params          (dict) : parameters of the output, not used.
+        """
+        self._raise_errors()
+        self._queue.put((fpath, sig, fs, sample_format, full_scale, dither))
+
+    def flush(self):
+        """
+        Wait until all queued files are written.
+        """
+        self._queue.join()
+        self._raise_errors()
+
+    def close(self):
+        """
+        Write the pending files and stop the writer threads.
+        """
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self._raise_errors()
+
+    def __enter__(self):
+        self._previous = set_writer(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        set_writer(self._previous)
+        try:
+            self.close()
+        except Exception as error:
+            if exc_type is None:
+                raise
+            # do not hide the error of the block behind the write error
+            if exc_value.__context__ is None:
+                exc_value.__context__ = error
+
+
+def read_chunks(filename, block_size=BLOCK_SIZE, start=0, stop=None):
+    """
+    Read wave file as mono blocks of samples.
+
+    Note:
+        The file is memory mapped and every block is copied out of the map
+        only when it is requested, so the memory used is bounded by block_size.
+        Blocks of 24-bit files are decoded from the file one by one instead.
+
+    Args:
+        filename   (str) : wave file / path.
+        block_size (int) : number of samples per block.
+        start      (int) : index of the first frame to read.
+        stop       (int) : index after the last frame to read, None reads to the end.
+
+    Returns:
+        tuple of sampling rate and a generator of audio data blocks.
+    """
+    header = _read_header(filename)
+    if header["sample_width"] == 3:
+        start, stop, _ = slice(start, stop).indices(header["n_frames"])
+
+        def chunks():
+            for i in range(start, stop, block_size):
+                yield _read_frames(filename, header, i, min(i + block_size, stop))
+
+        return header["fs"], chunks()
+
+    fs, sig = read_file(filename=filename, mmap=True, start=start, stop=stop)
+
+    def chunks():
+        for i in range(0, len(sig), block_size):
+            yield np.array(sig[i:i + block_size])
+
+    return fs, chunks()
+
+
+class ChunkedWriter:
+    """
+    Write a mono wave file block by block.
+
+    The header is written with placeholder sizes that are patched when the
+    writer is closed. A JUNK chunk is reserved after the RIFF header and turned
+    into an RF64 ds64 chunk if the data grows beyond the 4 GB RIFF limit.
+
+    Args:
+        filename (str) : wave file / path or seekable binary file object.
+        fs       (int) : sampling rate.
+        dtype  (dtype) : sample type, one of ChunkedWriter.dtypes, by default the
+                         type of the first block. "int24" blocks are given as int32.
+    """
+    dtypes = ("uint8", "int16", "int24", "int32", "float32", "float64")
+    riff_limit = 0xFFFFFFFF
+
+    def __init__(self, filename, fs, dtype=None):
+        self.filename = filename
+        self.fs = int(fs)
+        self.dtype = None
+        self.sample_width = None
+        self.n_frames = 0
+        self._owned = not hasattr(filename, "write")
+        self._fid = open(filename, "wb") if self._owned else filename
+        self._start = self._fid.tell()
+        self._closed = False
+        if dtype is not None:
+            self._write_header(dtype)
+
+    def _write_header(self, dtype):
+        name = dtype if dtype == "int24" else np.dtype(dtype).name
+        if name not in self.dtypes:
+            if self._owned:
+                self._fid.close()
+            raise ValueError("Unsupported data type '%s'." % name)
+
+        # 24 bit samples are stored in the 3 low bytes of little endian int32
+        self.dtype = np.dtype("<i4") if name == "int24" else np.dtype(name).newbyteorder("<")
+        self.sample_width = 3 if name == "int24" else self.dtype.itemsize
+
+        # fmt chunk, non-PCM files get a cbSize field
+        is_float = (self.dtype.kind == "f")
+        bit_depth = self.sample_width * 8
+        fmt_chunk_data = struct.pack("<HHIIHH", 3 if is_float else 1, 1, self.fs,
+                                     self.fs * self.sample_width, self.sample_width, bit_depth)
+        if is_float:
+            fmt_chunk_data += b"\x00\x00"
+
+        header_data = b"RIFF" + b"\x00\x00\x00\x00" + b"WAVE"
+        header_data += b"JUNK" + struct.pack("<I", 28) + bytes(28)
+        header_data += b"fmt " + struct.pack("<I", len(fmt_chunk_data)) + fmt_chunk_data
+
+        # fact chunk (non-PCM files)
+        self._fact_pos = None
+        if is_float:
+            self._fact_pos = len(header_data) + 8
+            header_data += b"fact" + struct.pack("<II", 4, 0)
+
+        self._data_pos = len(header_data) + 4
+        header_data += b"data" + b"\x00\x00\x00\x00"
+        self._fid.write(header_data)
+
+    def write(self, block):
+        """
+        Append a block of samples to the file.
+
+        Args:
+            block (array) : signal/audio block.
+        """
+        block = np.asarray(block)
+        if self.dtype is None:
+            self._write_header(block.dtype)
+        data = np.ascontiguousarray(block, dtype=self.dtype)
+        if self.sample_width == 3:
+            data = np.ascontiguousarray(data.view(np.uint8).reshape(-1, 4)[:, :3])
+        data.tofile(self._fid)
+        self.n_frames += len(block)
+
+    def close(self):
+        """
+        Patch the header sizes and close the file.
+        """
+        if self._closed:
+            return
+        if self.dtype is None:
+            self._write_header("float64")
+
+        # pad data chunk to an even size
+        data_size = self.n_frames * self.sample_width
+        if data_size % 2:
+            self._fid.write(b"\x00")
+        end = self._fid.tell()
+        file_size = end - self._start
+
+        if file_size - 8 > self.riff_limit:
+            # switch to RF64 and store the real sizes in the ds64 chunk
+            self._fid.seek(self._start)
+            self._fid.write(b"RF64" + b"\xff\xff\xff\xff" + b"WAVE")
+            self._fid.write(b"ds64" + struct.pack("<IQQQI", 28, file_size - 8,
+                                                  data_size, self.n_frames, 0))
+            self._fid.seek(self._start + self._data_pos)
+            self._fid.write(b"\xff\xff\xff\xff")
+        else:
+            self._fid.seek(self._start + 4)
+            self._fid.write(struct.pack("<I", file_size - 8))
+            self._fid.seek(self._start + self._data_pos)
+            self._fid.write(struct.pack("<I", data_size))
+
+        if self._fact_pos is not None:
+            self._fid.seek(self._start + self._fact_pos)
+            self._fid.write(struct.pack("<I", min(self.n_frames, 0xFFFFFFFF)))
+
+        self._closed = True
+        if self._owned:
+            self._fid.close()
+        else:
+            self._fid.seek(end)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def write_chunks(filename, fs, chunks, dtype=None):
+    """
+    Write an iterable of signal blocks to a mono wave file.
+
+    Args:
+        filename (str) : wave file / path.
+        fs       (int) : sampling rate.
+        chunks (iter.) : iterable of signal/audio blocks.
+        dtype  (dtype) : sample type, by default the type of the first block.
+    """
+    with ChunkedWriter(filename, fs, dtype) as writer:
+        for block in chunks:
+            writer.write(block)
+    print("Writing data to " + filename + ".")
+
+
+def process_chunks(infile, outfile, func, block_size=BLOCK_SIZE, dtype=None):
+    """
+    Stream a wave file through a block-wise function into another wave file.
+
+    Args:
+        infile     (str) : input filename/path.
+        outfile    (str) : output filename/path.
+        func  (callable) : called as func(block, offset) with offset the index
+                           of the first sample of the block, returns the output block.
+        block_size (int) : number of samples per block.
+        dtype    (dtype) : output sample type, by default the type of the first output block.
+    """
+    fs, chunks = read_chunks(infile, block_size)
+
+    def processed():
+        offset = 0
+        for block in chunks:
+            yield func(block, offset)
+            offset += len(block)
+
+    write_chunks(outfile, fs, processed(), dtype)
@@ -0,0 +1,88 @@
+"""
+- Description: implements rational polyphase resampling with cached anti-aliasing filters.
+    The low-pass filter of every (fs_in, fs_out, quality) combination is
+    designed once and kept in an LRU cache, so resampling many files between
+    the same sampling rates only pays for the filtering itself.
+"""
+import functools
+from fractions import Fraction
+import numpy as np
+from scipy.signal import firwin, resample_poly
+
+
+# largest denominator of the approximated resampling ratios
+max_denominator = 1000
+
+# zero crossings of the windowed sinc on each side, kaiser window beta and
+# cutoff relative to the lowest nyquist frequency for every quality preset
+quality_presets = {"fast": (8, 5.0, 0.90),
+                   "medium": (16, 8.0, 0.95),
+                   "high": (32, 10.0, 0.97)}
+
+
+def get_ratio(fs_in, fs_out):
+    """
+    Get the up and down factors resampling from fs_in to fs_out.
+
+    Args:
+        fs_in  (float) : input sampling rate.
+        fs_out (float) : output sampling rate.
+
+    Returns:
+        tuple of the up and down integer factors.
+    """
+    if fs_in <= 0 or fs_out <= 0:
+        raise ValueError("ParameterError: Sampling rates must be positive.")
+    ratio = Fraction(int(round(fs_out)), int(round(fs_in))).limit_denominator(max_denominator)
+    return ratio.numerator, ratio.denominator
+
+
+@functools.lru_cache(maxsize=128)
+def get_filter(fs_in, fs_out, quality="medium"):
+    """
+    Design the anti-aliasing low-pass filter resampling from fs_in to fs_out.
+
+    Args:
+        fs_in  (float) : input sampling rate.
+        fs_out (float) : output sampling rate.
+        quality  (str) : "fast", "medium" or "high", trades filter length for attenuation.
+
+    Returns:
+        tuple of the up and down factors and the read-only array of the filter coefficients.
+    """
+    if quality not in quality_presets:
+        raise ValueError("ParameterError: Unknown quality %s." % quality)
+    zero_crossings, beta, rolloff = quality_presets[quality]
+
+    up, down = get_ratio(fs_in, fs_out)
+    max_rate = max(up, down)
+    h = firwin(2 * zero_crossings * max_rate + 1, rolloff / max_rate, window=("kaiser", beta))
+    h.flags.writeable = False
+    return up, down, h
+
+
+def resample(sig, fs_in, fs_out, quality="medium"):
+    """
+    Resample a signal from fs_in to fs_out.
+
+    Note:
+        Float32 inputs are filtered in float32, other inputs in float64. The
+        rows of a 2-D batch are resampled together.
+
+    Args:
+        sig    (array) : signal/audio array, or clips array of shape (n_clips, n_samples).
+        fs_in  (float) : input sampling rate.
+        fs_out (float) : output sampling rate.
+        quality  (str) : "fast", "medium" or "high", see quality_presets.
+
+    Returns:
+        array of the resampled signal(s), with ceil(n_samples * up / down) samples.
+    """
+    x = np.asarray(sig)
+    if x.dtype != np.float32:
+        x = x.astype(np.float64)
+
+    up, down, h = get_filter(fs_in, fs_out, quality)
+    if up == down:
+        return x.copy()
+    return resample_poly(x, up, down, axis=-1, window=h.astype(x.dtype, copy=False))
@@ -0,0 +1,92 @@
+"""
+- Description: implements reproducible random number generation.
+    Augmentations drawing random values take a seed or a numpy Generator. Seeds
+    of parallel runs are derived from a root seed and counters (file index,
+    recipe entry index), so the outputs do not depend on how the work is split
+    between workers. Float32 noise is drawn with the faster SFC64 bit generator.
+"""
+import numpy as np
+
+
+# bit generators by name, sfc64 is the fastest and philox is counter-based
+bit_generators = {"pcg64": np.random.PCG64,
+                  "sfc64": np.random.SFC64,
+                  "philox": np.random.Philox}
+
+
+def get_generator(seed=None, bit_generator="pcg64"):
+    """
+    Get a random generator from a seed.
+
+    Args:
+        seed           (int/SeedSequence/Generator) : seed, or generator returned as is. By
+                                                      default fresh entropy from the operating
+                                                      system, so forked workers do not share
+                                                      their streams.
+        bit_generator                         (str) : "pcg64", "sfc64" or "philox".
+
+    Returns:
+        numpy Generator.
+    """
+    if isinstance(seed, np.random.Generator):
+        return seed
+    if bit_generator not in bit_generators:
+        raise ValueError("ParameterError: Unknown bit generator %s." % bit_generator)
+    if seed is None:
+        seed = np.random.SeedSequence()
+    return np.random.Generator(bit_generators[bit_generator](seed))
+
+
+def derive_seed(seed, *counters):
+    """
+    Derive an independent seed from a root seed and counters.
+
+    Note:
+        Deriving in steps gives the same seed as deriving at once, so
+        derive_seed(derive_seed(seed, i), j) equals derive_seed(seed, i, j).
+
+    Args:
+        seed (int/SeedSequence) : root seed, None for a non reproducible run.
+        counters          (int) : non negative counters identifying the stream, for
+                                  instance a file index and a recipe entry index.
+
+    Returns:
+        SeedSequence of the stream, None if seed is None.
+    """
+    if seed is None:
+        return None
+    if isinstance(seed, np.random.SeedSequence):
+        return np.random.SeedSequence(seed.entropy, spawn_key=seed.spawn_key + counters)
+    return np.random.SeedSequence(seed, spawn_key=counters)
+
+
+def get_noise_generator(seed=None, dtype=None):
+    """
+    Get the random generator drawing noise of a given type.
+
+    Args:
+        seed  (int/SeedSequence/Generator) : seed or generator, see get_generator.
+        dtype                      (dtype) : float32 or float64 (default), float32
+                                            noise uses the sfc64 bit generator.
+
+    Returns:
+        numpy Generator.
+    """
+    fast = np.dtype(dtype or np.float64) == np.float32
+    return get_generator(seed, "sfc64" if fast else "pcg64")
+
+
+def get_noise(shape, seed=None, dtype=None):
+    """
+    Draw white gaussian noise.
+
+    Args:
+        shape                  (int/tuple) : shape of the noise array.
+        seed  (int/SeedSequence/Generator) : seed or generator, see get_generator.
+        dtype                      (dtype) : float32 or float64 (default).
+
+    Returns:
+        array of standard normal samples.
+    """
+    dtype = np.dtype(dtype or np.float64)
+    return get_noise_generator(seed, dtype).standard_normal(shape, dtype=dtype)
@@ -0,0 +1,190 @@
+"""
+- Description: sequential tar shard output and input for augmented corpora.
+    Clips are stored WebDataset style: every clip is a <key>.wav member followed
+    by a <key>.json member holding its parameters, and shards are closed once
+    they reach a maximum size so that training reads a few large files.
+"""
+import io
+import os
+import glob
+import json
+import time
+import tarfile
+import threading
+from .io import read_file, write_wav, set_writer
+
+
+def get_key(name, root=None):
+    """
+    Turn an output file name into a shard key.
+
+    Note:
+        WebDataset readers split member names at the first dot, so the
+        extension is dropped and the remaining dots are replaced. Directories
+        are kept with / separators.
+
+    Args:
+        name (str) : output file name / path.
+        root (str) : directory the key is relative to, None keeps the file name only.
+
+    Returns:
+        str of the sample key.
+    """
+    name = os.path.basename(name) if root is None else os.path.relpath(name, root)
+    return name.replace(os.sep, "/").split(".wav")[0].replace(".", "_")
+
+
+class ShardWriter:
+    """
+    Pack wave clips and JSON parameter sidecars into fixed-size tar shards.
+
+    Used as a context manager it becomes the writer of write_file, so every
+    augmentation output is added to the current shard instead of written to
+    its own file. Keys are unique, a repeated key gets a counter suffix.
+
+    Args:
+        pattern    (str) : shard file name pattern with a %d field for the shard index.
+        max_size   (int) : maximum shard size in bytes, a new shard is started
+                           when the next clip does not fit.
+        max_count  (int) : maximum number of clips per shard, None for no limit.
+        root       (str) : output root directory, for instance the dst of
+                           augment_directory. The keys of write_file outputs keep
+                           their path relative to it, by default only their name.
+    """
+    def __init__(self, pattern="shard-%06d.tar", max_size=10**9, max_count=None, root=None):
+        self.pattern = pattern
+        self.max_size = max_size
+        self.max_count = max_count
+        self.root = root
+        self.shards = []
+        self._keys = set()
+        self._tar = None
+        self._size = 0
+        self._count = 0
+        self._previous = None
+        self._lock = threading.Lock()
+
+    def _next_shard(self):
+        self._close_shard()
+        fname = self.pattern % len(self.shards)
+        self._tar = tarfile.open(fname, "w")
+        self._size = 0
+        self._count = 0
+        self.shards.append(fname)
+
+    def _close_shard(self):
+        if self._tar is not None:
+            self._tar.close()
+            self._tar = None
+
+    def _add_member(self, name, data):
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = time.time()
+        self._tar.addfile(info, io.BytesIO(data))
+
+    def write(self, key, sig, fs, params=None, sample_format=None, full_scale=None, dither=False):
+        """
+        Add a clip and its parameter sidecar to the current shard.
+
+        Args:
+            key              (str) : sample key, must not contain dots. A counter
+                                     is added to a key already written.
+            sig            (array) : signal/audio array.
+            fs               (int) : sampling rate.
+            params          (dict) : JSON serializable parameters of the clip.
+            sample_format    (str) : output format (see convert_samples), None keeps the signal type.
+            full_scale (float/str) : signal level mapped to the output full scale (see get_full_scale).
+            dither     (bool/seed) : add triangular dither before rounding to integers.
+        """
+        # encode the clip and its sidecar in memory
+        wav = io.BytesIO()
+        write_wav(wav, sig, fs, sample_format, full_scale, dither)
+        wav = wav.getvalue()
+        meta = dict(params or {}, fs=int(fs), n_samples=len(sig))
+        # parameters without a JSON type, like numpy scalars, are stored as text
+        meta = json.dumps(meta, default=str).encode("utf-8")
+
+        # tar members take a 512 bytes header and are padded to 512 bytes
+        size = sum(512 + -(-len(data) // 512) * 512 for data in (wav, meta))
+        with self._lock:
+            # a repeated key gets the first free counter suffix
+            unique, count = key, 0
+            while unique in self._keys:
+                count += 1
+                unique = "%s_%d" % (key, count)
+            key = unique
+            self._keys.add(key)
+            if (self._tar is None
+                    or (self._count and self._size + size > self.max_size)
+                    or (self.max_count is not None and self._count >= self.max_count)):
+                self._next_shard()
+            self._add_member(key + ".wav", wav)
+            self._add_member(key + ".json", meta)
+            self._size += size
+            self._count += 1
+
+    def submit(self, fpath, sig, fs, sample_format=None, full_scale=None, dither=False,
+               params=None):
+        """
+        Add a write_file output and its parameters to the current shard.
+
+        Args:
+            fpath            (str) : output wave file / path, used for the key.
+            sig            (array) : signal/audio array.
+            fs               (int) : sampling rate.
+            sample_format    (str) : output format (see convert_samples), None keeps the signal type.
+            full_scale (float/str) : signal level mapped to the output full scale (see get_full_scale).
+            dither     (bool/seed) : add triangular dither before rounding to integers.
+            params          (dict) : parameters of the output, for instance the
+                                     operation and its parameters (see executor).
+        """
+        path = fpath if self.root is None else os.path.relpath(fpath, self.root)
+        params = dict(params or {}, name=os.path.basename(fpath), path=path.replace(os.sep, "/"))
+        self.write(get_key(fpath, self.root), sig, fs, params, sample_format, full_scale, dither)
+
+    def close(self):
+        """
+        Close the current shard.
+        """
+        with self._lock:
+            self._close_shard()
+
+    def __enter__(self):
+        self._previous = set_writer(self)
+        return self
+
+    def __exit__(self, *args):
+        set_writer(self._previous)
+        self.close()
+
+
+def iter_shards(shards):
+    """
+    Iterate sequentially over the clips stored in tar shards.
+
+    Args:
+        shards (str/list) : glob pattern or list of shard file names / paths.
+
+    Returns:
+        generator of (key, sampling rate, audio data, parameters) tuples.
+    """
+    if isinstance(shards, str):
+        shards = sorted(glob.glob(shards))
+
+    for shard in shards:
+        # stream the members in order, a sample is complete with its sidecar
+        with tarfile.open(shard, "r|") as tar:
+            sample = {}
+            for member in tar:
+                if not member.isfile():
+                    continue
+                key, ext = member.name.split(".", 1)
+                if sample and sample["key"] != key:
+                    sample = {}
+                sample["key"] = key
+                sample[ext] = tar.extractfile(member).read()
+                if "wav" in sample and "json" in sample:
+                    fs, sig = read_file(io.BytesIO(sample["wav"]))
+                    yield key, fs, sig, json.loads(sample["json"].decode("utf-8"))
+                    sample = {}
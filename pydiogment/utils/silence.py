@@ -0,0 +1,279 @@
+"""
+- Description: implements a numpy based silence removal.
+    Like the ffmpeg silenceremove filter, the signal is cut in frames, frames
+    with an rms level below a threshold are silent and silent runs lasting at
+    least stop_duration are removed, except for their first hangover seconds.
+    Silent runs are found with array operations on the frame levels, on whole
+    signals, on batches of clips or block by block on streams.
+"""
+import numpy as np
+from .io import BLOCK_SIZE, _centered, get_full_scale, read_chunks, write_chunks
+
+
+def get_reference(sig, full_scale=None):
+    """
+    Get the level of 0 dB of the silence threshold.
+
+    Note:
+        The level does not depend on the samples, so a whole signal, the clips
+        of a batch and the blocks of a stream are compared to the same level.
+
+    Args:
+        sig         (array) : signal/audio array.
+        full_scale  (float) : level of 0 dB, by default the integer range for
+                              integer signals and 1.0 for float signals.
+
+    Returns:
+        float of the 0 dB level.
+    """
+    if full_scale is None:
+        return 1.0 if sig.dtype.kind == "f" else get_full_scale(sig)
+    if isinstance(full_scale, str):
+        raise ValueError("ParameterError: The silence full scale must be a level.")
+    return float(full_scale)
+
+
+def get_silent_frames(sig, fs, threshold=-36, window=0.02, full_scale=None):
+    """
+    Find the silent frames of a signal.
+
+    Args:
+        sig         (array) : signal/audio array, or clips array of shape (n_clips, n_samples).
+        fs            (int) : sampling rate.
+        threshold   (float) : silence threshold in dB relative to the full scale.
+        window      (float) : frame duration in seconds.
+        full_scale  (float) : level of 0 dB, see get_reference.
+
+    Returns:
+        boolean array of shape (n_clips, n_frames), True for the silent frames.
+        The last frame can be shorter than window.
+    """
+    x = np.atleast_2d(sig)
+    frame_length = max(int(window * fs), 1)
+    n_frames = -(-x.shape[1] // frame_length)
+
+    # mean square of every frame, the last one on its actual length
+    squares = np.zeros((x.shape[0], n_frames * frame_length))
+    squares[:, :x.shape[1]] = np.square(_centered(x), dtype=np.float64)
+    energy = squares.reshape(x.shape[0], n_frames, frame_length).sum(axis=2)
+    counts = np.full(n_frames, frame_length)
+    counts[-1:] = x.shape[1] - (n_frames - 1) * frame_length
+
+    level = 10**(threshold / 20.0) * get_reference(x, full_scale)
+    return energy / counts < level**2
+
+
+def get_kept_frames(silent, stop_frames, hangover_frames, offset=0):
+    """
+    Decide which frames to keep given the silent ones.
+
+    Args:
+        silent        (array) : boolean array of shape (n_clips, n_frames) of the silent frames.
+        stop_frames     (int) : minimum number of frames of the removed silent runs.
+        hangover_frames (int) : number of frames kept at the start of the removed runs.
+        offset          (int) : number of frames of the first run of every clip
+                                that precede the array (used when streaming).
+
+    Returns:
+        boolean array of shape (n_clips, n_frames), True for the kept frames.
+    """
+    n_clips, n_frames = silent.shape
+    if silent.size == 0:
+        return np.ones(silent.shape, dtype=bool)
+
+    # label the runs of equal frames
+    starts = np.ones(silent.shape, dtype=bool)
+    starts[:, 1:] = silent[:, 1:] != silent[:, :-1]
+    starts = starts.ravel()
+    run_start = np.flatnonzero(starts)
+    run_id = np.cumsum(starts) - 1
+    run_length = np.diff(np.append(run_start, starts.size))
+    position = np.arange(starts.size) - run_start[run_id]
+
+    # the first run of every clip continues a run started before
+    first = np.zeros(len(run_start), dtype=np.int64)
+    first[run_id[::n_frames]] = offset
+    run_length += first
+    position += first[run_id]
+
+    keep = ~silent.ravel() | (run_length[run_id] < stop_frames) | (position < hangover_frames)
+    return keep.reshape(silent.shape)
+
+
+def remove_silence(sig, fs, threshold=-36, stop_duration=0.25, hangover=0.0, window=0.02):
+    """
+    Remove the silences of a signal.
+
+    Args:
+        sig            (array) : signal/audio array, or clips array of shape (n_clips, n_samples).
+        fs               (int) : sampling rate.
+        threshold      (float) : silence threshold in dB relative to the full scale.
+        stop_duration  (float) : minimum duration in seconds of the removed silences.
+        hangover       (float) : duration in seconds kept at the start of every removed silence.
+        window         (float) : frame duration in seconds.
+
+    Returns:
+        tuple of the signal without silence and the durations in seconds with
+        and without silence. For a batch, a list of signals and two arrays of
+        durations.
+    """
+    x = np.atleast_2d(sig)
+    frame_length = max(int(window * fs), 1)
+    silent = get_silent_frames(x, fs, threshold, window)
+    keep = get_kept_frames(silent, int(round(stop_duration / window)),
+                           int(round(hangover / window)))
+
+    # expand the frame decisions to the samples
+    keep = np.repeat(keep, frame_length, axis=1)[:, :x.shape[1]]
+    ys = [row[mask] for row, mask in zip(x, keep)]
+    with_silence_duration = np.full(x.shape[0], x.shape[1] / fs)
+    no_silence_duration = keep.sum(axis=1) / fs
+
+    if np.ndim(sig) == 2:
+        return ys, with_silence_duration, no_silence_duration
+    return ys[0], with_silence_duration[0], no_silence_duration[0]
+
+
+class SilenceRemover:
+    """
+    Remove the silences of a signal given block by block.
+
+    Note:
+        Frames are aligned on the start of the stream whatever the block sizes,
+        so the output is the same as remove_silence on the whole signal. The
+        samples held back are bounded by stop_duration.
+
+    Args:
+        fs               (int) : sampling rate.
+        threshold      (float) : silence threshold in dB relative to the full scale.
+        stop_duration  (float) : minimum duration in seconds of the removed silences.
+        hangover       (float) : duration in seconds kept at the start of every removed silence.
+        window         (float) : frame duration in seconds.
+        full_scale     (float) : level of 0 dB, by default derived from the block type
+                                 (see get_reference).
+    """
+    def __init__(self, fs, threshold=-36, stop_duration=0.25, hangover=0.0, window=0.02,
+                 full_scale=None):
+        self.fs = fs
+        self.threshold = threshold
+        self.window = window
+        self.full_scale = full_scale
+        self.frame_length = max(int(window * fs), 1)
+        self.stop_frames = int(round(stop_duration / window))
+        self.hangover_frames = int(round(hangover / window))
+        self.n_in = 0
+        self.n_out = 0
+
+        # samples of the incomplete frame, frames of the unresolved silent run
+        # and frames of the removed silent run already processed
+        self._carry = None
+        self._pending = None
+        self._removed = 0
+
+    @property
+    def with_silence_duration(self):
+        return self.n_in / self.fs
+
+    @property
+    def no_silence_duration(self):
+        return self.n_out / self.fs
+
+    def _process(self, frames, silent, final):
+        if len(silent) == 0 and not final:
+            return frames[:0]
+
+        # frames of the unresolved run come first and are silent
+        frames = np.concatenate([self._pending, frames])
+        silent = np.concatenate([np.ones(len(self._pending) // self.frame_length, dtype=bool),
+                                 silent])
+        keep = get_kept_frames(silent[None, :], self.stop_frames, self.hangover_frames,
+                               self._removed)[0]
+
+        # hold back a trailing silent run shorter than stop_frames
+        n_frames = len(silent)
+        n_trailing = n_frames - (np.flatnonzero(~silent)[-1] + 1 if np.any(~silent) else 0)
+        run = n_trailing + (self._removed if n_trailing == n_frames else 0)
+        self._pending = frames[:0]
+        self._removed = 0
+        if n_trailing and not final:
+            if run < self.stop_frames:
+                self._pending = frames[(n_frames - n_trailing) * self.frame_length:]
+                keep = keep[:n_frames - n_trailing]
+            else:
+                self._removed = run
+
+        y = frames[:len(keep) * self.frame_length][np.repeat(keep, self.frame_length)[:len(frames)]]
+        self.n_out += len(y)
+        return y
+
+    def process(self, block):
+        """
+        Process a block of samples.
+
+        Args:
+            block (array) : signal/audio block.
+
+        Returns:
+            array of the kept samples that can be released.
+        """
+        if self._carry is None:
+            self._carry, self._pending = block[:0], block[:0]
+        self.n_in += len(block)
+        x = np.concatenate([self._carry, block])
+        n = len(x) - len(x) % self.frame_length
+        self._carry = x[n:]
+
+        silent = get_silent_frames(x[:n], self.fs, self.threshold, self.window, self.full_scale)[0]
+        return self._process(x[:n], silent, final=False)
+
+    def flush(self):
+        """
+        Process the end of the stream.
+
+        Returns:
+            array of the remaining kept samples.
+        """
+        if self._carry is None:
+            return np.zeros(0)
+        silent = get_silent_frames(self._carry, self.fs, self.threshold, self.window,
+                                   self.full_scale)[0]
+        y = self._process(self._carry, silent, final=True)
+        self._carry = self._carry[:0]
+        return y
+
+    def stream(self, chunks):
+        """
+        Remove the silences of an iterable of blocks.
+
+        Args:
+            chunks (iter.) : iterable of signal/audio blocks.
+
+        Returns:
+            generator of the kept samples blocks, flushed at the end.
+        """
+        for block in chunks:
+            yield self.process(block)
+        yield self.flush()
+
+
+def remove_silence_file(infile, outfile, threshold=-36, stop_duration=0.25, hangover=0.0,
+                        window=0.02, block_size=BLOCK_SIZE):
+    """
+    Stream a wave file without its silences into another wave file.
+
+    Args:
+        infile           (str) : input filename/path.
+        outfile          (str) : output filename/path.
+        threshold      (float) : silence threshold in dB relative to the full scale.
+        stop_duration  (float) : minimum duration in seconds of the removed silences.
+        hangover       (float) : duration in seconds kept at the start of every removed silence.
+        window         (float) : frame duration in seconds.
+        block_size       (int) : number of samples per block.
+
+    Returns:
+        tuple of the durations in seconds with and without silence.
+    """
+    fs, chunks = read_chunks(infile, block_size)
+    remover = SilenceRemover(fs, threshold, stop_duration, hangover, window)
+    write_chunks(outfile, fs, remover.stream(chunks))
+    return remover.with_silence_duration, remover.no_silence_duration
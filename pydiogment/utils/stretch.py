@@ -0,0 +1,119 @@
+"""
+- Description: implements a numpy based time stretching (WSOLA) and pitch shifting.
+    - WSOLA: W. Verhelst and M. Roelands, "An overlap-add technique based on waveform
+      similarity (WSOLA) for high quality time-scale modification of speech", ICASSP 1993.
+"""
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+from .resample import resample
+
+
+# frame duration in seconds, search tolerance as a fraction of the hop and
+# stride between the tested offsets for every quality preset
+quality_presets = {"fast": (0.030, 0.25, 4),
+                   "medium": (0.040, 0.5, 2),
+                   "high": (0.050, 0.5, 1)}
+
+
+def time_stretch(sig, fs, rate, quality="medium"):
+    """
+    Change the tempo of a signal without changing its pitch.
+
+    Note:
+        Frames are overlap-added with a periodic Hann window at half a frame
+        hop, every frame being taken at the offset around its nominal position
+        that best continues the previous frame. The frames of all the rows of
+        a 2-D batch are processed together.
+
+    Args:
+        sig   (array) : signal/audio array, or clips array of shape (n_clips, n_samples).
+        fs      (int) : sampling rate.
+        rate  (float) : tempo factor, above 1 speeds up and shortens the signal,
+                        below 1 slows it down, like the ffmpeg atempo filter.
+        quality (str) : "fast", "medium" or "high", trades search effort for quality.
+
+    Returns:
+        array of the stretched signal(s), with round(n_samples / rate) samples.
+    """
+    if quality not in quality_presets:
+        raise ValueError("ParameterError: Unknown quality %s." % quality)
+    frame_duration, tolerance, step = quality_presets[quality]
+
+    x = np.atleast_2d(np.asarray(sig, dtype=np.float64))
+    n_clips, n_samples = x.shape
+    n_out = int(round(n_samples / rate))
+
+    # frame, hops and search range in samples
+    frame_length = max(2 * int(frame_duration * fs / 2), 4)
+    hop = frame_length // 2
+    analysis_hop = hop * rate
+    delta = int(tolerance * hop)
+    window = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(frame_length) / frame_length)
+
+    # pad so every frame and search region lies inside the signal, the hop of
+    # leading zeros avoids a fade in of the first frame
+    n_frames = n_out // hop + 2
+    lead = hop + delta
+    total = lead + int(n_frames * analysis_hop) + 2 * frame_length + 2 * delta
+    xp = np.zeros((n_clips, max(total, lead + n_samples)))
+    xp[:, lead:lead + n_samples] = x
+
+    y = np.zeros((n_clips, n_frames * hop + frame_length))
+    rows = np.arange(n_clips)[:, None]
+    span = np.arange(frame_length)
+    position = np.full(n_clips, delta)
+    for k in range(n_frames):
+        nominal = delta + int(round(k * analysis_hop))
+        if k > 0:
+            # natural continuation of the previous frame
+            template = xp[rows, position[:, None] + hop + span]
+
+            # correlate it with the candidate frames around the nominal position
+            region = xp[:, nominal - delta:nominal + delta + frame_length]
+            n_candidates = (2 * delta) // step + 1
+            candidates = as_strided(region, shape=(n_clips, n_candidates, frame_length),
+                                    strides=(region.strides[0], region.strides[1] * step,
+                                             region.strides[1]))
+            correlation = np.einsum("rcl,rl->rc", candidates, template)
+            position = nominal - delta + step * np.argmax(correlation, axis=1)
+        else:
+            position = np.full(n_clips, nominal)
+
+        # overlap-add the chosen frames
+        y[:, k * hop:k * hop + frame_length] += window * xp[rows, position[:, None] + span]
+
+    y = y[:, hop:hop + n_out]
+    return y if np.ndim(sig) == 2 else y[0]
+
+
+def pitch_shift(sig, fs, tone, quality="medium", preserve_duration=True):
+    """
+    Change the pitch of a signal by a factor.
+
+    Note:
+        The signal is played at fs * tone and resampled to fs like the ffmpeg
+        asetrate and aresample filters, which also scales its duration by
+        1 / tone. With preserve_duration the signal is first time stretched by
+        tone to keep its duration.
+
+    Args:
+        sig               (array) : signal/audio array, or clips array of shape (n_clips, n_samples).
+        fs                  (int) : sampling rate.
+        tone              (float) : pitch factor, above 1 raises the pitch and below 1 lowers it.
+        quality             (str) : "fast", "medium" or "high", see time_stretch and resample.
+        preserve_duration  (bool) : keep the number of samples of the signal.
+
+    Returns:
+        array of the pitch shifted signal(s).
+    """
+    if tone <= 0:
+        raise ValueError("ParameterError: tone must be positive.")
+    if not preserve_duration:
+        return resample(sig, fs * tone, fs, quality)
+
+    # stretch to n_samples * tone and resample back to n_samples
+    n_samples = np.shape(sig)[-1]
+    y = resample(time_stretch(sig, fs, 1.0 / tone, quality), fs * tone, fs, quality)
+    if y.shape[-1] >= n_samples:
+        return y[..., :n_samples]
+    return np.pad(y, [(0, 0)] * (y.ndim - 1) + [(0, n_samples - y.shape[-1])])
@@ -8,7 +8,7 @@ path = pathlib.Path(__file__).parent
 # get readme text
 readme = (path / "README.md").read_text()
 # define requirements
-requires = ["numpy>=1.17.2", "scipy>=1.3.1"]
+requires = ["numpy>=1.17.2", "scipy>=1.6.0"]
 
 setup (
         name         = 'pydiogment',
@@ -35,5 +35,5 @@ setup (
         platforms            = 'any',
         include_package_data = True,
         install_requires     = requires,
-        python_requires      = '>=3.5',
+        python_requires      = '>=3.8',
      )
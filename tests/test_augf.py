@@ -3,9 +3,14 @@
 ################################################################################
 import os
 import time
+import shutil
 import pytest
-from tests.test_utils import assert_file_exists
+import concurrent.futures
+import numpy as np
+from tests.test_utils import assert_file_exists, requires_ffmpeg
+from pydiogment import augf
 from pydiogment.augf import convolve, change_tone, apply_filter
+from pydiogment.utils.io import read_file, set_output_format, AsyncWriter
 
 
 @pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
@@ -26,19 +31,46 @@ def test_convolve(test_file, ir_fname, level):
     assert_file_exists(fname)
 
 
+@requires_ffmpeg
 @pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
 @pytest.mark.parametrize('tone', [0.9, 1.1])
-def test_change_tone(test_file, tone):
+def test_change_tone(tmp_path, test_file, tone):
     """
     Test the tone changing function.
     """
     # change audio file tone
-    change_tone(infile=test_file, tone=tone)
+    infile = str(tmp_path / "test.wav")
+    shutil.copy(test_file, infile)
+    assert change_tone(infile=infile, tone=tone).result().returncode == 0
 
     # check result
-    fname = "%s_augmented_%s_toned.wav" % (test_file.split(".wav")[0], str(tone))
-    time.sleep(5)
-    assert_file_exists(fname)
+    assert_file_exists(str(tmp_path / ("test_augmented_%s_toned.wav" % str(tone))))
+
+
+
+def test_change_tone_reads_header_only(tmp_path, monkeypatch):
+    """
+    Test that the ffmpeg backend builds its command without decoding the file.
+    """
+    class Runner:
+        def submit(self, args, timeout=None):
+            self.args = args
+            future = concurrent.futures.Future()
+            future.set_result(None)
+            return future
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the samples are read")
+
+    infile = str(tmp_path / "test.wav")
+    shutil.copy("tests/testfiles/test.wav", infile)
+    monkeypatch.setattr(augf, "read_file", fail)
+    runner = Runner()
+    change_tone(infile=infile, tone=1.1, runner=runner).result()
+
+    # check result
+    assert runner.args == ["ffmpeg", "-y", "-i", infile, "-af", "asetrate=8000*1.1,aresample=8000",
+                           str(tmp_path / "test_augmented_1.1_toned.wav")]
 
 
 @pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
@@ -57,3 +89,51 @@ def test_apply_filter(test_file, filter_type, low_cutoff_freq, high_cutoff_freq,
     fname = "{0}_augmented_{1}_pass_filtered.wav".format(test_file.split(".wav")[0], filter_type)
     time.sleep(3)
     assert_file_exists(fname)
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+@pytest.mark.parametrize('filter_type', ["low", "high", "band"])
+def test_apply_filter_streamed(tmp_path, test_file, filter_type):
+    """
+    Test that streaming a file through the filter gives the one-shot output.
+    """
+    infile = str(tmp_path / "test.wav")
+    shutil.copy(test_file, infile)
+    fname = str(tmp_path / ("test_augmented_%s_pass_filtered.wav" % filter_type))
+
+    apply_filter(infile, filter_type, 100, 1500, 5)
+    _, expected = read_file(fname)
+    apply_filter(infile, filter_type, 100, 1500, 5, block_size=1000)
+
+    # check result
+    assert np.array_equal(read_file(fname)[1], expected)
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+@pytest.mark.parametrize('sample_format', ['int16', 'float32'])
+@pytest.mark.parametrize('full_scale', [None, "peak", 2.0**15])
+def test_apply_filter_streamed_hooks(tmp_path, test_file, sample_format, full_scale):
+    """
+    Test that the streamed filter output follows the output format and writer.
+    """
+    infile = str(tmp_path / "test.wav")
+    shutil.copy(test_file, infile)
+    fname = str(tmp_path / "test_augmented_band_pass_filtered.wav")
+
+    set_output_format(sample_format, full_scale)
+    try:
+        apply_filter(infile, "band", 100, 1500, 5)
+        fs, expected = read_file(fname)
+        os.remove(fname)
+        apply_filter(infile, "band", 100, 1500, 5, block_size=1000)
+        streamed = read_file(fname)[1]
+        os.remove(fname)
+        with AsyncWriter():
+            apply_filter(infile, "band", 100, 1500, 5, block_size=1000)
+    finally:
+        set_output_format()
+
+    # check result
+    assert expected.dtype == np.dtype(sample_format)
+    assert np.array_equal(streamed, expected)
+    assert np.array_equal(read_file(fname)[1], expected)
@@ -0,0 +1,74 @@
+################################################################################
+############################# tests for batch ##################################
+################################################################################
+import pytest
+import numpy as np
+from pydiogment import ops, batch
+from pydiogment.utils.io import read_file
+
+
+@pytest.fixture
+def sigs():
+    fs, sig = read_file('tests/testfiles/test.wav')
+    return fs, sig[:4 * 8000].reshape(4, 8000) / 2.0**15
+
+
+def test_batch_amplitude_ops(sigs):
+    """
+    Test the batched gain and fade against the per clip operations.
+    """
+    fs, x = sigs
+    gains = np.array([-50, -25, -3, 0])
+    y_gain = batch.apply_gain(x, fs, gains)
+    y_fade = batch.fade_in_and_out(x, fs)
+
+    # check result
+    for i in range(len(x)):
+        assert np.allclose(y_gain[i], ops.apply_gain(x[i], fs, gains[i]))
+        assert np.allclose(y_fade[i], ops.fade_in_and_out(x[i], fs))
+    with pytest.raises(ValueError):
+        batch.apply_gain(x, fs, gains[:2])
+
+
+@pytest.mark.parametrize('snr', [10, [0, 5, 10, 20]])
+def test_batch_add_noise(sigs, snr):
+    """
+    Test the batched noise injection reaches the per clip snr.
+    """
+    fs, x = sigs
+    y = batch.add_noise(x, fs, snr)
+
+    # check result
+    measured = 10 * np.log10(np.mean(x**2, axis=1) / np.mean((y - x)**2, axis=1))
+    assert np.allclose(measured, np.broadcast_to(snr, 4))
+
+
+def test_batch_time_ops(sigs):
+    """
+    Test the batched shifting and reversing against the per clip operations.
+    """
+    fs, x = sigs
+    tshifts = [0.1, 0.2, 0.1, 0.5]
+    directions = ["left", "right", "right", "left"]
+    y_shift = batch.shift_time(x, fs, tshifts, directions)
+    y_reverse = batch.reverse(x, fs)
+
+    # check result
+    for i in range(len(x)):
+        assert np.array_equal(y_shift[i], ops.shift_time(x[i], fs, tshifts[i], directions[i]))
+        assert np.array_equal(y_reverse[i], ops.reverse(x[i], fs))
+    assert np.array_equal(batch.shift_time(x, fs, 0.25, "right")[0],
+                          ops.shift_time(x[0], fs, 0.25, "right"))
+
+
+@pytest.mark.parametrize('filter_type', ["low", "high", "band"])
+def test_batch_apply_filter(sigs, filter_type):
+    """
+    Test the batched filter against the per clip filter.
+    """
+    fs, x = sigs
+    y = batch.apply_filter(x, fs, filter_type, 100, 1500, 5)
+
+    # check result
+    for i in range(len(x)):
+        assert np.allclose(y[i], ops.apply_filter(x[i], fs, filter_type, 100, 1500, 5))
@@ -0,0 +1,76 @@
+################################################################################
+########################### tests for chunked ##################################
+################################################################################
+import pytest
+import numpy as np
+from pydiogment import ops, chunked
+from pydiogment.utils.io import read_file
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+@pytest.mark.parametrize('block_size', [1000, 4096])
+def test_chunked_amplitude_ops(tmp_path, test_file, block_size):
+    """
+    Test that the block-wise gain, fade and normalization match the in-memory ops.
+    """
+    fs, sig = read_file(test_file)
+    outfile = str(tmp_path / "out.wav")
+
+    chunked.apply_gain(test_file, outfile, -25, block_size)
+    assert np.allclose(read_file(outfile)[1], ops.apply_gain(sig, fs, -25))
+
+    chunked.fade_in_and_out(test_file, outfile, block_size)
+    assert np.allclose(read_file(outfile)[1], ops.fade_in_and_out(sig, fs))
+
+    chunked.normalize(test_file, outfile, "peak", block_size=block_size)
+    assert np.allclose(read_file(outfile)[1], ops.normalize(sig, fs, "peak"))
+
+    chunked.normalize(test_file, outfile, "rms", 3, block_size=block_size)
+    assert np.allclose(read_file(outfile)[1],
+                       ops.normalize(sig.astype(np.float64), fs, "rms", 3))
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+@pytest.mark.parametrize('filter_type', ["low", "high", "band"])
+def test_chunked_apply_filter(tmp_path, test_file, filter_type):
+    """
+    Test that the block-wise filter matches filtering the whole signal.
+    """
+    fs, sig = read_file(test_file)
+    outfile = str(tmp_path / "out.wav")
+    chunked.apply_filter(test_file, outfile, filter_type, 100, 1500, 5, block_size=777)
+
+    # check result
+    expected = ops.apply_filter(sig, fs, filter_type, 100, 1500, 5)
+    assert np.allclose(read_file(outfile)[1], expected)
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+@pytest.mark.parametrize('snr', [0, 10])
+def test_chunked_add_noise(tmp_path, test_file, snr):
+    """
+    Test the block-wise noise injection reaches the requested snr.
+    """
+    fs, sig = read_file(test_file)
+    outfile = str(tmp_path / "out.wav")
+    chunked.add_noise(test_file, outfile, snr, block_size=1000)
+
+    # check result
+    noise = read_file(outfile)[1] - sig
+    measured = 10 * np.log10(np.mean(sig.astype(np.float64)**2) / np.mean(noise**2))
+    assert np.isclose(measured, snr)
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+@pytest.mark.parametrize('ir_fname', ['tests/testfiles/tel_noise.wav'])
+@pytest.mark.parametrize('partition_size', [256, 4096])
+def test_chunked_convolve(tmp_path, test_file, ir_fname, partition_size):
+    """
+    Test that the partitioned block-wise convolution matches the in-memory one.
+    """
+    fs, sig = read_file(test_file)
+    _, ir = read_file(ir_fname)
+    outfile = str(tmp_path / "out.wav")
+
+    chunked.convolve(test_file, outfile, ir_fname, 0.5, partition_size, block_size=10000)
+    assert np.allclose(read_file(outfile)[1], ops.convolve(sig, fs, ir, 0.5))
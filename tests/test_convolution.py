@@ -0,0 +1,112 @@
+################################################################################
+########################## tests for convolution ###############################
+################################################################################
+import shutil
+import pytest
+import numpy as np
+from tests.test_utils import assert_file_exists
+from pydiogment import ops
+from pydiogment.augf import convolve_bank
+from pydiogment.utils.io import read_file
+from pydiogment.utils.convolution import convolve, IRBank, PartitionedConvolver
+
+
+@pytest.mark.parametrize('method', ["direct", "fft", "auto"])
+@pytest.mark.parametrize('n_sig, n_ir', [(1000, 10), (1000, 3000), (50000, 4000), (7, 7)])
+def test_convolve(method, n_sig, n_ir):
+    """
+    Test the convolutions against the full numpy convolution.
+    """
+    sig, ir = np.random.randn(n_sig), np.random.randn(n_ir)
+    y_full = np.convolve(sig, ir, "full")
+
+    # check result
+    assert np.allclose(convolve(sig, ir, method=method), y_full)
+    assert np.allclose(convolve(sig, ir, n_sig, method), y_full[:n_sig])
+
+    y32 = convolve(sig, ir, n_sig, method, np.float32)
+    assert y32.dtype == np.float32
+    assert np.allclose(y32, y_full[:n_sig], atol=1e-4 * np.max(np.abs(y_full)))
+
+    with pytest.raises(ValueError):
+        convolve(sig, ir, method="overlap-save")
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+@pytest.mark.parametrize('ir_fname', ['tests/testfiles/tel_noise.wav'])
+def test_ops_convolve_methods(test_file, ir_fname):
+    """
+    Test that the methods of ops.convolve agree.
+    """
+    fs, sig = read_file(test_file)
+    _, ir = read_file(ir_fname)
+    y_direct = ops.convolve(sig, fs, ir[:5000], method="direct")
+    y_fft = ops.convolve(sig, fs, ir[:5000], method="fft")
+    y_fft32 = ops.convolve(sig, fs, ir[:5000], method="fft", dtype=np.float32)
+
+    # check result
+    assert np.allclose(y_direct, y_fft)
+    assert y_fft32.dtype == np.float32
+    assert np.allclose(y_fft32, y_fft, atol=1e-3 * np.max(np.abs(y_fft)))
+
+
+@pytest.mark.parametrize('n_sig', [500, 50000])
+def test_ir_bank(n_sig):
+    """
+    Test the bank convolutions against the single convolutions and the spectra cache.
+    """
+    sig = np.random.randn(n_sig)
+    irs = [np.random.randn(n_ir) for n_ir in [10, 700, 3000]]
+    bank = IRBank(irs)
+    y = bank.convolve(sig, n_sig)
+
+    # check result
+    assert y.shape == (3, n_sig)
+    for i, ir in enumerate(irs):
+        assert np.allclose(y[i], convolve(sig, ir, n_sig, "direct"))
+    assert bank.misses == 1
+
+    bank.convolve(sig, n_sig)
+    assert bank.hits == 1 and len(bank.convolve(sig, n_sig, np.float32)) == 3
+    assert bank.misses == 2
+
+    bank.max_bytes = 0
+    bank.clear()
+    bank.convolve(sig, n_sig)
+    assert bank.nbytes == 0
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+@pytest.mark.parametrize('ir_fname', ['tests/testfiles/tel_noise.wav'])
+def test_convolve_bank(tmp_path, test_file, ir_fname):
+    """
+    Test the file convolution with a bank against ops.convolve.
+    """
+    infile = str(tmp_path / "test.wav")
+    shutil.copy(test_file, infile)
+    bank = IRBank([ir_fname])
+    ys = convolve_bank(infile, bank, level=0.5)
+
+    # check result
+    fs, sig = read_file(test_file)
+    _, ir = read_file(ir_fname)
+    fname = str(tmp_path / "test_augmented_tel_noise_convolved_with_level_0.5.wav")
+    assert_file_exists(fname)
+    assert np.allclose(ys[0], ops.convolve(sig, fs, ir, 0.5))
+
+
+@pytest.mark.parametrize('partition_size', [16, 1024])
+@pytest.mark.parametrize('block_size', [1, 700, 5000])
+@pytest.mark.parametrize('tail', [False, True])
+def test_partitioned_convolver(partition_size, block_size, tail):
+    """
+    Test that the streamed convolution matches the full convolution whatever the block size.
+    """
+    sig, ir = np.random.randn(12000), np.random.randn(3000)
+    convolver = PartitionedConvolver(ir, partition_size)
+    y = np.concatenate(list(convolver.stream((sig[i:i + block_size]
+                                              for i in range(0, len(sig), block_size)), tail)))
+
+    # check result
+    y_full = np.convolve(sig, ir, "full")
+    assert np.allclose(y, y_full if tail else y_full[:len(sig)])
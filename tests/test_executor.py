@@ -0,0 +1,132 @@
+################################################################################
+########################### tests for executor #################################
+################################################################################
+import os
+import shutil
+import pytest
+import numpy as np
+from tests.test_utils import assert_file_exists
+from pydiogment import augment_directory, ops
+from pydiogment.auga import apply_gain
+from pydiogment.pipeline import Pipeline
+from pydiogment.utils.io import read_file, AsyncWriter
+from pydiogment.utils.shards import ShardWriter, iter_shards
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+@pytest.mark.parametrize('backend', ['process', 'thread'])
+def test_augment_directory(tmp_path, test_file, backend):
+    """
+    Test augmenting a directory tree with per task error capture.
+    """
+    src, dst = tmp_path / "src", tmp_path / "dst"
+    os.makedirs(str(src / "a"))
+    os.makedirs(str(src / "b"))
+    shutil.copy(test_file, str(src / "a" / "x.wav"))
+    shutil.copy(test_file, str(src / "b" / "y.wav"))
+    (src / "b" / "notes.txt").write_text("not audio")
+
+    recipe = [(apply_gain, {"gain": -50}),
+              ("reverse", {}),
+              (Pipeline().add("fade_in_and_out").add("shift_time", tshift=1, direction="left"), {}),
+              ("normalize", {"normalization_technique": "unknown"})]
+    results = augment_directory(str(src), str(dst), recipe, workers=2, backend=backend)
+
+    # check result
+    assert [os.path.basename(result.infile) for result in results] == ["x.wav", "y.wav"]
+    for result, folder, stem in zip(results, "ab", "xy"):
+        assert len(result.outputs) == 3 and len(result.errors) == 1
+        assert "ValueError" in result.errors[0][1]
+        for name in ["_augmented_apply_gain_gain=-50.wav", "_augmented_reverse.wav",
+                     "_augmented_fade_in_and_out_shift_time_direction=left_tshift=1.wav"]:
+            assert_file_exists(str(dst / folder / (stem + name)))
+
+    fs, sig = read_file(test_file)
+    assert np.array_equal(read_file(str(dst / "a" / "x_augmented_reverse.wav"))[1],
+                          ops.reverse(sig, fs))
+    with pytest.raises(ValueError):
+        augment_directory(str(src), str(dst), recipe, backend="unknown")
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+def test_augment_directory_seed(tmp_path, test_file):
+    """
+    Test that seeded runs are reproducible whatever the number of workers.
+    """
+    src = tmp_path / "src"
+    os.makedirs(str(src))
+    for stem in "xy":
+        shutil.copy(test_file, str(src / (stem + ".wav")))
+
+    recipe = [("add_noise", {"snr": 10}), ("add_noise", {"snr": 20}),
+              (Pipeline().add("add_noise", snr=0).add("fade_in_and_out"), {})]
+    for dst, workers in [("dst1", 1), ("dst2", 2)]:
+        augment_directory(str(src), str(tmp_path / dst), recipe, workers=workers,
+                          backend="thread", seed=42)
+
+    # check result
+    noises = []
+    for stem in "xy":
+        for snr in [10, 20]:
+            fname = "%s_augmented_add_noise_snr=%d.wav" % (stem, snr)
+            y = read_file(str(tmp_path / "dst1" / fname))[1]
+            assert np.array_equal(y, read_file(str(tmp_path / "dst2" / fname))[1])
+            noises.append(y / np.std(y))
+        fname = "%s_augmented_add_noise_snr=0_fade_in_and_out.wav" % stem
+        assert np.array_equal(read_file(str(tmp_path / "dst1" / fname))[1],
+                              read_file(str(tmp_path / "dst2" / fname))[1])
+    assert not np.allclose(noises[0], noises[2])
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+def test_augment_directory_unseeded(tmp_path, test_file):
+    """
+    Test that forked workers draw different noise for every file without a seed.
+    """
+    src, dst = tmp_path / "src", tmp_path / "dst"
+    os.makedirs(str(src))
+    for i in range(4):
+        shutil.copy(test_file, str(src / ("f%d.wav" % i)))
+    augment_directory(str(src), str(dst), [("add_noise", {"snr": 10})], workers=2,
+                      backend="process", chunksize=1)
+
+    # check result
+    ys = [read_file(str(dst / ("f%d_augmented_add_noise_snr=10.wav" % i)))[1] for i in range(4)]
+    for i in range(4):
+        for j in range(i + 1, 4):
+            assert not np.array_equal(ys[i], ys[j])
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+@pytest.mark.parametrize('backend', ['process', 'thread'])
+@pytest.mark.parametrize('writer_type', ['async', 'shards'])
+def test_augment_directory_writer(tmp_path, test_file, backend, writer_type):
+    """
+    Test that the outputs of the workers go to the writer of the caller.
+    """
+    src, dst = tmp_path / "src", tmp_path / "dst"
+    os.makedirs(str(src))
+    for i in range(4):
+        shutil.copy(test_file, str(src / ("f%d.wav" % i)))
+    recipe = [("apply_gain", {"gain": -6}), ("reverse", {})]
+
+    if writer_type == "async":
+        with AsyncWriter(max_queue=2):
+            results = augment_directory(str(src), str(dst), recipe, workers=2,
+                                        backend=backend, chunksize=1)
+    else:
+        with ShardWriter(str(tmp_path / "shard-%04d.tar")) as writer:
+            results = augment_directory(str(src), str(dst), recipe, workers=2,
+                                        backend=backend, chunksize=1)
+
+    # check result
+    assert all(not result.errors and not result.pending for result in results)
+    fs, sig = read_file(test_file)
+    if writer_type == "async":
+        for i in range(4):
+            assert np.array_equal(read_file(str(dst / ("f%d_augmented_reverse.wav" % i)))[1],
+                                  ops.reverse(sig, fs))
+    else:
+        samples = {key: y for key, _, y, _ in iter_shards(writer.shards)}
+        assert len(writer.shards) == 1 and len(samples) == 8
+        assert np.array_equal(samples["f1_augmented_reverse"], ops.reverse(sig, fs))
@@ -0,0 +1,218 @@
+################################################################################
+######################### tests for utils.ffmpeg ###############################
+################################################################################
+import os
+import sys
+import time
+import shutil
+import asyncio
+import concurrent.futures
+import pytest
+import numpy as np
+from tests.test_utils import assert_file_exists, requires_ffmpeg
+from pydiogment.augt import change_tempo_and_tone
+from pydiogment.utils import ffmpeg
+from pydiogment.utils.io import read_file
+from pydiogment.utils.ffmpeg import (FFmpegRunner, FFmpegError, get_filter_graph, get_tempo_filter,
+                                    get_tone_filter)
+
+
+def python_command(code):
+    """
+    Build a command running python code, used in place of ffmpeg.
+    """
+    return [sys.executable, "-c", code]
+
+
+def test_runner_results_and_errors():
+    """
+    Test command results, return code checking and timeouts.
+    """
+    with FFmpegRunner(max_jobs=2) as runner:
+        result = runner.submit(python_command("print('ok')")).result()
+        assert result.returncode == 0 and result.stdout.strip() == b"ok"
+
+        future = runner.submit(python_command("import sys; sys.stderr.write('bad'); sys.exit(3)"))
+        with pytest.raises(FFmpegError) as error:
+            future.result()
+        assert error.value.returncode == 3 and error.value.stderr == "bad"
+
+        with pytest.raises(asyncio.TimeoutError):
+            runner.submit(python_command("import time; time.sleep(10)"), timeout=0.2).result()
+
+
+def test_runner_concurrency_limit():
+    """
+    Test that at most max_jobs commands run at once and that results can be awaited.
+    """
+    with FFmpegRunner(max_jobs=2) as runner:
+        t0 = time.perf_counter()
+        futures = [runner.submit(python_command("import time; time.sleep(0.5)"))
+                   for _ in range(4)]
+        concurrent.futures.wait(futures)
+        assert time.perf_counter() - t0 >= 1.0
+
+        async def main():
+            results = await asyncio.gather(*[runner.run(python_command("print(%d)" % i))
+                                             for i in range(3)])
+            return [int(result.stdout) for result in results]
+
+        assert asyncio.run(main()) == [0, 1, 2]
+
+
+def test_runner_cancellation():
+    """
+    Test cancelling a pending command.
+    """
+    with FFmpegRunner(max_jobs=1) as runner:
+        first = runner.submit(python_command("import time; time.sleep(0.5)"))
+        second = runner.submit(python_command("import time; time.sleep(10)"))
+        time.sleep(0.1)
+        assert second.cancel()
+        t0 = time.perf_counter()
+        first.result()
+        assert time.perf_counter() - t0 < 5
+
+
+def test_runner_close_wait_and_report(tmp_path, capsys):
+    """
+    Test that closing with wait runs the pending commands and that their outputs
+    and failures are reported without reading the futures.
+    """
+    runner = FFmpegRunner(max_jobs=1)
+    fnames = [str(tmp_path / ("%d.txt" % i)) for i in range(3)]
+    futures = [ffmpeg.report(runner.submit(python_command(
+        "import time; time.sleep(0.1); open(%r, 'w').write('x')" % fname)), fname)
+        for fname in fnames]
+    failed = ffmpeg.report(runner.submit(python_command("import sys; sys.exit(2)")), "bad.wav")
+    with pytest.warns(RuntimeWarning, match="bad.wav"):
+        runner.close(wait=True)
+
+    # check result
+    out = capsys.readouterr().out
+    assert all(future.done() and not future.cancelled() for future in futures)
+    for fname in fnames:
+        assert_file_exists(fname)
+        assert "Writing data to " + fname in out
+    assert isinstance(failed.exception(), FFmpegError)
+
+
+# reads float32 samples on stdin and writes them times i + 1 to the i-th pipe
+fake_split = """
+import sys, os, array
+data = array.array("f", sys.stdin.buffer.read())
+fds = [int(arg[5:]) for arg in sys.argv[1:] if arg.startswith("pipe:")]
+if not fds:
+    sys.exit(1)
+for i, fd in enumerate(fds):
+    os.write(fd, array.array("f", [x * (i + 1) for x in data]).tobytes())
+"""
+
+
+def test_filter_graph():
+    """
+    Test the asplit filter graph.
+    """
+    assert get_filter_graph(["atempo=0.8", "asetrate=16000*1.1,aresample=16000"]) == \
+        "[0:a]asplit=2[s0][s1];[s0]atempo=0.8[o0];[s1]asetrate=16000*1.1,aresample=16000[o1]"
+    with pytest.raises(ValueError):
+        get_filter_graph([])
+
+
+def test_runner_split(monkeypatch):
+    """
+    Test that every output pipe is read back as an array and errors are reported.
+    """
+    monkeypatch.setattr(ffmpeg, "get_split_command",
+                        lambda fs, filters, fds: python_command(fake_split) +
+                        ["pipe:%d" % fd for fd in fds])
+    sig = np.random.uniform(-1, 1, 100000).astype(np.float32)
+    with FFmpegRunner(max_jobs=2) as runner:
+        outputs = runner.submit_split(sig, 16000, ["anull", "anull", "anull"]).result()
+        assert len(outputs) == 3
+        for i, y in enumerate(outputs):
+            assert np.allclose(y, sig * (i + 1))
+
+        monkeypatch.setattr(ffmpeg, "get_split_command",
+                            lambda fs, filters, fds: python_command(fake_split))
+        with pytest.raises(FFmpegError):
+            runner.submit_split(sig, 16000, ["anull"]).result()
+
+
+@requires_ffmpeg
+def test_runner_split_ffmpeg():
+    """
+    Test splitting a signal through real ffmpeg tempo and tone filter chains.
+    """
+    fs = 16000
+    sig = (0.5 * np.sin(2 * np.pi * 440 * np.arange(2 * fs) / fs)).astype(np.float32)
+    filters = ["anull", get_tempo_filter(0.5), get_tempo_filter(2), get_tone_filter(fs, 1.5)]
+    with FFmpegRunner(max_jobs=2) as runner:
+        futures = [runner.submit_split(sig, fs, filters) for _ in range(3)]
+        outputs = [future.result() for future in futures]
+
+        # check result
+        for y_null, y_slow, y_fast, y_tone in outputs:
+            assert y_null.dtype == np.float32 and np.allclose(y_null, sig, atol=1e-6)
+            assert abs(len(y_slow) - 2 * len(sig)) < 0.01 * len(sig)
+            assert abs(len(y_fast) - len(sig) / 2) < 0.01 * len(sig)
+            assert abs(len(y_tone) - len(sig) / 1.5) < 0.01 * len(sig)
+        for y, y_first in zip(outputs[1], outputs[0]):
+            assert np.array_equal(y, y_first)
+
+        with pytest.raises(FFmpegError):
+            runner.submit_split(sig, fs, ["anull", "not_a_filter"]).result()
+
+
+def test_change_tempo_and_tone(tmp_path, monkeypatch):
+    """
+    Test that the tempo and tone outputs are split from one read of the file.
+    """
+    monkeypatch.setattr(ffmpeg, "get_split_command",
+                        lambda fs, filters, fds: python_command(fake_split) +
+                        ["pipe:%d" % fd for fd in fds])
+    infile = str(tmp_path / "test.wav")
+    shutil.copy("tests/testfiles/test.wav", infile)
+    fs, sig = read_file(infile)
+    with FFmpegRunner(max_jobs=2) as runner:
+        outfiles = change_tempo_and_tone(infile, slow_coefficients=[0.8], speed_coefficients=[1.2],
+                                         tones=[1.1], runner=runner).result()
+
+    # check result
+    assert [os.path.basename(fname) for fname in outfiles] == ["test_augmented_slowed_0.8.wav",
+                                                               "test_augmented_speeded_1.2.wav",
+                                                               "test_augmented_1.1_toned.wav"]
+    for i, fname in enumerate(outfiles):
+        assert_file_exists(fname)
+        fs_out, y = read_file(fname)
+        assert fs_out == fs and y.dtype == sig.dtype
+        expected = np.clip(sig.astype(np.float64) * (i + 1), -2**15, 2**15 - 1)
+        assert np.max(np.abs(y - expected)) <= 1
+
+    with pytest.raises(ValueError):
+        change_tempo_and_tone(infile)
+
+
+def test_change_tempo_and_tone_without_split(tmp_path, monkeypatch):
+    """
+    Test that one command per output is run where the split is not supported.
+    """
+    commands = []
+
+    async def execute(args, timeout=None):
+        commands.append(args)
+
+    infile = str(tmp_path / "test.wav")
+    shutil.copy("tests/testfiles/test.wav", infile)
+    with FFmpegRunner(max_jobs=2) as runner:
+        runner.split_supported = False
+        monkeypatch.setattr(runner, "execute", execute)
+        outfiles = change_tempo_and_tone(infile, slow_coefficients=[0.8], tones=[1.1],
+                                         runner=runner).result()
+        with pytest.raises(NotImplementedError):
+            runner.submit_split(np.zeros(16, np.float32), 16000, ["anull"]).result()
+
+    # check result
+    assert sorted(args[-1] for args in commands) == sorted(outfiles)
+    assert sorted(args[-2] for args in commands) == sorted([get_tempo_filter(0.8),
+                                                            get_tone_filter(8000, 1.1)])
@@ -0,0 +1,263 @@
+################################################################################
+########################## tests for utils.io ##################################
+################################################################################
+import os
+import struct
+import glob
+import shutil
+import pytest
+import numpy as np
+from pydiogment import auga, augf, augt, chunked, ops
+from pydiogment.lazy import LazySignal
+from pydiogment.utils.io import (read_file, write_file, read_chunks, write_chunks, ChunkedWriter,
+                                 AsyncWriter, AudioCache, cast_samples, convert_samples,
+                                 get_full_scale, read_info, set_output_format, write_wav)
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+@pytest.mark.parametrize('start, stop', [(0, None), (100, 8100), (8000, None)])
+def test_read_file_mmap(test_file, start, stop):
+    """
+    Test reading memory mapped and ranged wave files.
+    """
+    fs, sig = read_file(test_file)
+    fs_map, sig_map = read_file(test_file, mmap=True, start=start, stop=stop)
+    fs_rng, sig_rng = read_file(test_file, start=start, stop=stop)
+
+    # check result
+    assert fs == fs_map == fs_rng
+    assert np.array_equal(sig[start:stop], sig_map)
+    assert np.array_equal(sig[start:stop], sig_rng)
+    assert not sig_map.flags.writeable
+    assert sig_rng.flags.writeable and not isinstance(sig_rng, np.memmap)
+
+
+def write_int24_stereo(fname, left, right, fs):
+    """
+    Write a stereo 24-bit wave file, which scipy cannot write.
+    """
+    frames = np.stack([left, right], axis=1).astype("<i4").view(np.uint8).reshape(-1, 2, 4)
+    data = np.ascontiguousarray(frames[:, :, :3]).tobytes()
+    with open(fname, "wb") as fid:
+        fid.write(b"RIFF" + struct.pack("<I", 36 + len(data)) + b"WAVE")
+        fid.write(b"fmt " + struct.pack("<IHHIIHH", 16, 1, 2, fs, fs * 6, 6, 24))
+        fid.write(b"data" + struct.pack("<I", len(data)) + data)
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+@pytest.mark.parametrize('channels', [1, 2])
+@pytest.mark.parametrize('start, stop', [(0, None), (100, 8100), (8000, None), (-500, -10)])
+def test_read_file_int24(tmp_path, test_file, channels, start, stop):
+    """
+    Test reading ranges and blocks of 24-bit wave files, which cannot be mapped.
+    """
+    fs, sig = read_file(test_file)
+    fname = str(tmp_path / "int24.wav")
+    if channels == 1:
+        write_wav(fname, sig, fs, "int24", full_scale=2.0**15)
+    else:
+        write_int24_stereo(fname, sig.astype(np.int32) * 256, -sig.astype(np.int32), fs)
+    _, full = read_file(fname)
+    assert np.array_equal(full, sig.astype(np.int32) * 2**16)
+    _, sig_map = read_file(fname, mmap=True, start=start, stop=stop)
+    _, sig_rng = read_file(fname, start=start, stop=stop)
+
+    # check result
+    assert read_info(fname) == (fs, len(sig))
+    assert np.array_equal(sig_map, full[start:stop]) and np.array_equal(sig_rng, full[start:stop])
+    assert not sig_map.flags.writeable and sig_rng.flags.writeable
+    fs_chunks, chunks = read_chunks(fname, 1000, start, stop)
+    blocks = list(chunks)
+    assert fs_chunks == fs and all(len(block) <= 1000 for block in blocks)
+    assert np.array_equal(np.concatenate(blocks), full[start:stop])
+
+    # the streamed augmentations read the file
+    outfile = str(tmp_path / "gain.wav")
+    chunked.apply_gain(fname, outfile, -6, block_size=1000)
+    expected = ops.apply_gain(full, fs, -6)
+    assert np.allclose(read_file(outfile)[1], expected)
+    assert np.allclose(LazySignal.from_file(fname, 1000).apply_gain(-6).evaluate(), expected)
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+@pytest.mark.parametrize('dtype', ['int16', 'float32', 'float64'])
+@pytest.mark.parametrize('block_size', [1000, 65536])
+def test_chunked_read_write(tmp_path, test_file, dtype, block_size):
+    """
+    Test the chunked wave reader and writer pair.
+    """
+    fs, sig = read_file(test_file)
+    outfile = str(tmp_path / "chunked.wav")
+    fs_chunks, chunks = read_chunks(test_file, block_size)
+    write_chunks(outfile, fs_chunks, (block.astype(dtype) for block in chunks))
+
+    # check result
+    fs_out, sig_out = read_file(outfile)
+    assert fs_out == fs
+    assert sig_out.dtype == np.dtype(dtype)
+    assert np.array_equal(sig_out, sig.astype(dtype))
+
+
+def test_chunked_writer_rf64(tmp_path):
+    """
+    Test that the chunked writer switches to RF64 past the RIFF size limit.
+    """
+    sig = np.arange(1001, dtype=np.float32)
+    outfile = str(tmp_path / "rf64.wav")
+    with ChunkedWriter(outfile, 8000) as writer:
+        writer.riff_limit = 0
+        writer.write(sig[:500])
+        writer.write(sig[500:])
+
+    # check result
+    fs, sig_out = read_file(outfile)
+    assert fs == 8000
+    assert open(outfile, "rb").read(4) == b"RF64"
+    assert np.array_equal(sig_out, sig)
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+@pytest.mark.parametrize('workers', [1, 4])
+def test_async_writer(tmp_path, test_file, workers):
+    """
+    Test writing files in the background and propagating write errors.
+    """
+    fs, sig = read_file(test_file)
+    with AsyncWriter(workers=workers, max_queue=2):
+        for i in range(8):
+            write_file(str(tmp_path), test_file, "_%d.wav" % i, sig * i, fs)
+
+    # check result
+    for i in range(8):
+        assert np.array_equal(read_file(str(tmp_path / ("test_%d.wav" % i)))[1], sig * i)
+
+    writer = AsyncWriter()
+    writer.submit(os.path.join(str(tmp_path), "missing", "test.wav"), sig, fs)
+    with pytest.raises(FileNotFoundError):
+        writer.flush()
+    writer.close()
+
+    # leaving the block raises the write error, or chains it to the error of the block
+    missing = os.path.join(str(tmp_path), "missing", "test.wav")
+    with pytest.raises(FileNotFoundError):
+        with AsyncWriter(workers=workers) as writer:
+            writer.submit(missing, sig, fs)
+    with pytest.raises(KeyError) as info:
+        with AsyncWriter(workers=workers) as writer:
+            writer.submit(missing, sig, fs)
+            raise KeyError("block")
+    assert isinstance(info.value.__context__, FileNotFoundError)
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+@pytest.mark.parametrize('augment', [lambda f: auga.add_noise(f, 10, seed=0),
+                                     lambda f: auga.apply_gain(f, -3),
+                                     lambda f: auga.fade_in_and_out(f),
+                                     lambda f: augf.convolve(f, "tests/testfiles/tel_noise.wav"),
+                                     lambda f: augf.apply_filter(f, "low", 1000),
+                                     lambda f: augt.speed(f, 1.25, backend="native")])
+@pytest.mark.parametrize('sample_format, bits', [('int16', 16), ('int24', 24), ('float32', 32)])
+@pytest.mark.parametrize('dither', [False, True])
+def test_write_file_sample_format(tmp_path, test_file, augment, sample_format, bits, dither):
+    """
+    Test writing augmented signals to compact sample formats without clipping.
+    """
+    outputs = []
+    for folder, output_format in [("default", None), ("compact", sample_format)]:
+        os.makedirs(str(tmp_path / folder))
+        infile = str(tmp_path / folder / "test.wav")
+        shutil.copy(test_file, infile)
+        set_output_format(output_format, dither=dither)
+        try:
+            augment(infile)
+        finally:
+            set_output_format()
+        fname = glob.glob(str(tmp_path / folder / "test_augmented_*.wav"))[0]
+        outputs.append((fname, read_file(fname)[1]))
+    (_, y), (fname, y_out) = outputs
+
+    # check result, integer samples are scaled to their range and floats beyond [-1, 1] to their peak
+    full_scale = 2.0**15 if y.dtype == np.int16 else max(np.max(np.abs(y)), 1.0)
+    assert os.path.getsize(fname) < len(y) * (bits // 8) + 100
+    if sample_format == "float32":
+        assert np.allclose(y_out * full_scale, y)
+    else:
+        # 24 bit samples are read left-justified in int32
+        lsb = full_scale / 2**(bits - 1)
+        decoded = y_out / 2.0**(31 if sample_format == "int24" else bits - 1) * full_scale
+        assert np.max(np.abs(decoded - y)) < lsb * (1.01 + int(dither))
+
+
+def test_cast_samples():
+    """
+    Test casting processed signals back to their input sample type.
+    """
+    x = np.array([-40000.0, -1.4, 0.5, 1.6, 40000.0])
+    assert np.array_equal(cast_samples(x, np.int16), [-32768, -1, 0, 2, 32767])
+    assert cast_samples(x, np.int16).dtype == np.int16
+    assert np.array_equal(cast_samples(x, np.uint8), [0, 0, 0, 2, 255])
+    assert cast_samples(x, np.float32).dtype == np.float32
+
+
+def test_convert_samples_clipping():
+    """
+    Test scaling and clipping when converting to integer formats.
+    """
+    x = np.array([-2.0, -1.0, -0.5, 0.0, 0.5, 1.0, 2.0])
+    assert np.array_equal(convert_samples(x, "int16", full_scale=1.0),
+                          [-32768, -32768, -16384, 0, 16384, 32767, 32767])
+    assert np.array_equal(convert_samples(x, "int16"), convert_samples(x, "int16", full_scale="peak"))
+    assert np.array_equal(convert_samples(x, "int16", full_scale="peak"),
+                          [-32768, -16384, -8192, 0, 8192, 16384, 32767])
+    assert np.array_equal(convert_samples(x, "uint8", full_scale=1.0), [0, 0, 64, 128, 192, 255, 255])
+    with pytest.raises(ValueError):
+        convert_samples(x, "int8")
+
+    # seeded dither is reproducible
+    x = np.random.uniform(-1, 1, 1000)
+    assert np.array_equal(convert_samples(x, "int16", 1.0, dither=3),
+                          convert_samples(x, "int16", 1.0, dither=np.random.default_rng(3)))
+    assert not np.array_equal(convert_samples(x, "int16", 1.0, dither=3),
+                              convert_samples(x, "int16", 1.0, dither=4))
+    assert np.abs(convert_samples(x, "int16", 1.0, dither=True).astype(int) -
+                  convert_samples(x, "int16", 1.0)).max() <= 1
+
+    # float32 signals are scaled in float64, so int32 does not wrap
+    assert np.array_equal(convert_samples(np.float32([1, -1, .5]), "int32", 1.0),
+                          [2**31 - 1, -2**31, 2**30])
+
+    # the peak is taken over all the samples, 1.0 without samples
+    assert get_full_scale(np.array([[0.5, -3.0], [2.0, 1.0]]), "peak") == 3.0
+    assert get_full_scale(np.zeros((1, 0)), "peak") == 1.0
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+def test_audio_cache(tmp_path, test_file):
+    """
+    Test caching decoded files, invalidation and size bounded eviction.
+    """
+    fs, sig = read_file(test_file)
+    fname = str(tmp_path / "test.wav")
+    other = str(tmp_path / "test_other.wav")
+    write_file(str(tmp_path), test_file, ".wav", sig, fs)
+    write_file(str(tmp_path), test_file, "_other.wav", sig, fs)
+
+    with AudioCache(max_bytes=int(1.5 * sig.nbytes)) as cache:
+        _, first = read_file(fname)
+        _, second = read_file(fname)
+        assert first is second and not first.flags.writeable
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        # the least recently used file is evicted
+        read_file(other)
+        assert len(cache) == 1 and cache.nbytes == sig.nbytes
+        read_file(fname)
+        assert (cache.hits, cache.misses) == (1, 3)
+
+        # a modified file is decoded again
+        write_file(str(tmp_path), test_file, ".wav", sig[:100], fs)
+        os.utime(fname, ns=(0, 0))
+        assert len(read_file(fname)[1]) == 100
+
+    # check the cache is no longer used
+    assert read_file(fname)[1].flags.writeable
@@ -0,0 +1,66 @@
+################################################################################
+############################# tests for lazy ###################################
+################################################################################
+import pytest
+import numpy as np
+from pydiogment import ops
+from pydiogment.lazy import LazySignal
+from pydiogment.utils.io import read_file
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+@pytest.mark.parametrize('block_size', [999, 65536])
+@pytest.mark.parametrize('normalization_technique', ['peak', 'rms'])
+def test_lazy_signal(test_file, block_size, normalization_technique):
+    """
+    Test that the fused evaluation matches chaining the in-memory operations.
+    """
+    fs, sig = read_file(test_file)
+    sig = sig / 2.0**15
+    lazy = LazySignal(sig, fs, block_size).fade_in_and_out().apply_gain(-3)
+    lazy.normalize(normalization_technique, 3)
+    y = lazy.evaluate()
+
+    # check result
+    expected = ops.apply_gain(ops.fade_in_and_out(sig, fs), fs, -3)
+    expected = ops.normalize(expected, fs, normalization_technique, 3)
+    assert np.allclose(y, expected)
+
+    # the clip of apply_gain needs the fade scale: two reduction sweeps and one output sweep
+    assert lazy.sweeps == 3
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+def test_lazy_signal_from_file(tmp_path, test_file):
+    """
+    Test streaming a fused evaluation from a file to a file.
+    """
+    fs, sig = read_file(test_file)
+    outfile = str(tmp_path / "lazy.wav")
+    lazy = LazySignal.from_file(test_file, 1000).apply_gain(-25).fade_in_and_out()
+    lazy.normalize("peak").write(outfile)
+
+    # check result
+    expected = ops.normalize(ops.fade_in_and_out(ops.apply_gain(sig, fs, -25), fs), fs, "peak")
+    assert np.allclose(read_file(outfile)[1], expected)
+    assert lazy.sweeps == 2
+    with pytest.raises(ValueError):
+        lazy.normalize("unknown")
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+def test_lazy_signal_write_int16(tmp_path, test_file):
+    """
+    Test that writing outputs beyond [-1, 1] to int16 scales them to their peak.
+    """
+    fs, sig = read_file(test_file)
+    outfile = str(tmp_path / "lazy.wav")
+    lazy = LazySignal(sig, fs, 1000).fade_in_and_out()
+    lazy.write(outfile, "int16")
+
+    # check result
+    y = lazy.evaluate()
+    y_out = read_file(outfile)[1]
+    peak = np.max(np.abs(y))
+    assert y_out.dtype == np.int16
+    assert np.max(np.abs(y_out / 2.0**15 * peak - y)) < 1.01 * peak / 2**15
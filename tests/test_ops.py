@@ -0,0 +1,106 @@
+################################################################################
+############################# tests for ops ####################################
+################################################################################
+import pytest
+import numpy as np
+from pydiogment import ops
+from pydiogment.utils.io import read_file
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+@pytest.mark.parametrize('gain', [-100, -50, -25])
+def test_apply_gain(test_file, gain):
+    """
+    Test the in-memory apply gain function.
+    """
+    fs, sig = read_file(test_file)
+    y = ops.apply_gain(sig, fs, gain)
+
+    # check result
+    assert y.shape == sig.shape
+    assert np.isclose(np.mean(np.abs(y)), 1.0)
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+@pytest.mark.parametrize('snr', [-3, -6, -20, -50, -100])
+def test_add_noise(test_file, snr):
+    """
+    Test the in-memory noise injection function.
+    """
+    fs, sig = read_file(test_file)
+    y = ops.add_noise(sig, fs, snr)
+
+    # check result
+    assert y.shape == sig.shape
+    assert not np.allclose(y, sig)
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+def test_fade_in_and_out(test_file):
+    """
+    Test the in-memory fade in and fade out function.
+    """
+    fs, sig = read_file(test_file)
+    y = ops.fade_in_and_out(sig, fs)
+
+    # check result
+    assert y.shape == sig.shape
+    assert np.isclose(np.mean(np.abs(y)), 1.0)
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+@pytest.mark.parametrize('normalization_technique', ['peak', 'rms'])
+def test_normalize(test_file, normalization_technique):
+    """
+    Test the in-memory normalization function.
+    """
+    fs, sig = read_file(test_file)
+    y = ops.normalize(sig, fs, normalization_technique)
+
+    # check result
+    assert y.shape == sig.shape
+    with pytest.raises(ValueError):
+        ops.normalize(sig, fs, "unknown")
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+@pytest.mark.parametrize('ir_fname', ['tests/testfiles/tel_noise.wav'])
+@pytest.mark.parametrize('level', [0.5, 0.01])
+def test_convolve(test_file, ir_fname, level):
+    """
+    Test the in-memory convolution function.
+    """
+    fs, sig = read_file(test_file)
+    _, ir = read_file(ir_fname)
+    y = ops.convolve(sig, fs, ir, level)
+
+    # check result
+    assert y.shape == sig.shape
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+@pytest.mark.parametrize('filter_type', ["low", "high", "band"])
+def test_apply_filter(test_file, filter_type):
+    """
+    Test the in-memory Buttenworth filters.
+    """
+    fs, sig = read_file(test_file)
+    y = ops.apply_filter(sig, fs, filter_type, 50, 1500, 5)
+
+    # check result
+    assert y.shape == sig.shape
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+def test_time_ops(test_file):
+    """
+    Test the in-memory cropping, shifting and reversing functions.
+    """
+    fs, sig = read_file(test_file)
+
+    # check results
+    assert ops.random_cropping(sig, fs, 1).size >= fs
+    assert np.array_equal(ops.shift_time(sig, fs, 1, "left")[fs:], sig[:-fs])
+    assert np.array_equal(ops.reverse(ops.reverse(sig, fs), fs), sig)
+    with pytest.warns(UserWarning):
+        assert ops.random_cropping(sig, fs, sig.size) is None
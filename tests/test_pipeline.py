@@ -0,0 +1,81 @@
+################################################################################
+########################### tests for pipeline #################################
+################################################################################
+import re
+import pytest
+import numpy as np
+from tests.test_utils import assert_file_exists
+from pydiogment import ops, auga, augt
+from pydiogment.pipeline import Pipeline
+from pydiogment.utils.io import read_file
+from pydiogment.utils.rng import derive_seed
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+def test_pipeline_run(test_file):
+    """
+    Test that a pipeline matches chaining the in-memory operations.
+    """
+    fs, sig = read_file(test_file)
+    pipeline = Pipeline([(ops.apply_filter, {"filter_type": "low", "low_cutoff_freq": 1500}),
+                         ("apply_gain", {"gain": -25})])
+    pipeline.add(augt.shift_time, tshift=1, direction="right")
+    y = pipeline(sig, fs)
+
+    # check result
+    expected = ops.apply_filter(sig, fs, "low", 1500)
+    expected = ops.shift_time(ops.apply_gain(expected, fs, -25), fs, 1, "right")
+    assert np.allclose(y, expected)
+    assert [name for name, _ in pipeline.timings] == ["apply_filter", "apply_gain", "shift_time"]
+    with pytest.raises(ValueError):
+        pipeline.add("unknown")
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+def test_pipeline_run_file(tmp_path, test_file):
+    """
+    Test running a pipeline with one read and one write.
+    """
+    pipeline = Pipeline().add(auga.fade_in_and_out).add(augt.reverse)
+    y = pipeline.run_file(test_file, output_file_path=str(tmp_path))
+
+    # check result
+    fname = str(tmp_path / "test_augmented_fade_in_and_out_reverse.wav")
+    assert_file_exists(fname)
+    assert np.array_equal(read_file(fname)[1], y)
+    assert [name for name, _ in pipeline.timings] == ["read_file", "fade_in_and_out",
+                                                      "reverse", "write_file"]
+
+    # pipelines differing only in parameters get different names
+    names = [Pipeline().add("apply_gain", gain=gain).add("reverse").get_name_attribute()
+             for gain in [-3, 3]]
+    assert names == ["_augmented_apply_gain_gain=-3_reverse.wav",
+                     "_augmented_apply_gain_gain=3_reverse.wav"]
+
+    # array parameters are named by a digest of their content
+    ir = np.random.uniform(-1, 1, 5000)
+    other = ir.copy()
+    other[2500] += 1
+    names = [Pipeline().add("convolve", ir=h, level=0.5).get_name_attribute() for h in [ir, other]]
+    assert names[0] != names[1]
+    assert names[0] == Pipeline().add("convolve", ir=ir.copy(), level=0.5).get_name_attribute()
+    assert all(re.match(r"^_augmented_convolve_ir=[0-9a-f]{12}_level=0.5.wav$", name)
+               for name in names)
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+def test_pipeline_seed(test_file):
+    """
+    Test that seeded pipelines are reproducible with one stream per stage.
+    """
+    fs, sig = read_file(test_file)
+    pipeline = Pipeline().add("add_noise", snr=10).add("random_cropping", min_len=1)
+    pipeline.add("add_noise", snr=20, seed=3)
+    y = pipeline.run(sig, fs, seed=7)
+
+    # check result
+    expected = ops.add_noise(sig, fs, 10, seed=derive_seed(7, 0))
+    expected = ops.random_cropping(expected, fs, 1, seed=derive_seed(7, 1))
+    assert np.array_equal(y, ops.add_noise(expected, fs, 20, seed=3))
+    assert np.array_equal(y, pipeline.run(sig, fs, seed=7))
+    assert not np.array_equal(y, pipeline.run(sig, fs, seed=8))
@@ -0,0 +1,67 @@
+################################################################################
+############################ tests for resample ################################
+################################################################################
+import shutil
+import pytest
+import numpy as np
+from tests.test_utils import assert_file_exists
+from pydiogment.augt import resample_audio
+from pydiogment.utils.io import read_file
+from pydiogment.utils.resample import get_ratio, get_filter, resample
+
+
+@pytest.mark.parametrize('quality', ["fast", "medium", "high"])
+@pytest.mark.parametrize('fs_in, fs_out', [(44100, 16000), (48000, 16000), (8000, 22050)])
+def test_resample(fs_in, fs_out, quality):
+    """
+    Test the resampled length, the kept tone and the filter cache.
+    """
+    sig = np.sin(2 * np.pi * 440 * np.arange(fs_in) / fs_in)
+    y = resample(sig, fs_in, fs_out, quality)
+    up, down = get_ratio(fs_in, fs_out)
+
+    # check result
+    assert len(y) == -(-fs_in * up // down)
+    assert np.allclose(y[100:-100], np.sin(2 * np.pi * 440 * np.arange(fs_out) / fs_out)[100:-100],
+                       atol=1e-2)
+    assert get_filter(fs_in, fs_out, quality) is get_filter(fs_in, fs_out, quality)
+
+
+def test_resample_batch():
+    """
+    Test that every row of a batch is resampled like a single signal and the
+    kept float32 precision.
+    """
+    sigs = np.random.randn(4, 4410)
+    y = resample(sigs, 44100, 16000)
+
+    # check result
+    assert y.shape == (4, 1600)
+    for i in range(4):
+        assert np.allclose(y[i], resample(sigs[i], 44100, 16000))
+    assert resample(sigs.astype(np.float32), 44100, 16000).dtype == np.float32
+
+    with pytest.raises(ValueError):
+        resample(sigs, 44100, 16000, quality="best")
+    with pytest.raises(ValueError):
+        resample(sigs, 0, 16000)
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+@pytest.mark.parametrize('sr', [8000, 22050])
+def test_resample_audio_native(tmp_path, test_file, sr):
+    """
+    Test the native resample_audio backend.
+    """
+    infile = str(tmp_path / "test.wav")
+    shutil.copy(test_file, infile)
+    resample_audio(infile, sr, backend="native")
+
+    # check result
+    fname = str(tmp_path / ("test_augmented_resampled_to_%s.wav" % sr))
+    assert_file_exists(fname)
+    fs, sig = read_file(test_file)
+    fs_out, y = read_file(fname)
+    assert fs_out == sr
+    assert abs(len(y) - len(sig) * sr / fs) <= 1
+    assert y.dtype == sig.dtype
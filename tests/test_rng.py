@@ -0,0 +1,77 @@
+################################################################################
+############################### tests for rng ##################################
+################################################################################
+import shutil
+import pytest
+import numpy as np
+from pydiogment import ops, batch, chunked
+from pydiogment.augt import random_cropping
+from pydiogment.utils.io import read_file
+from pydiogment.utils.rng import get_generator, derive_seed, get_noise
+
+
+def test_generators():
+    """
+    Test seeding, generator pass through and derived seeds.
+    """
+    rng = np.random.default_rng(0)
+    assert get_generator(rng) is rng
+    assert get_generator(3).random() == get_generator(3).random()
+    assert get_generator(3, "sfc64").random() != get_generator(3).random()
+
+    # the default seed is fresh entropy, not the inherited global numpy state
+    np.random.seed(1)
+    first = get_generator().random()
+    np.random.seed(1)
+    assert get_generator().random() != first
+
+    # derived streams are reproducible and independent
+    assert derive_seed(None, 1) is None
+    assert np.array_equal(get_noise(8, derive_seed(derive_seed(5, 1), 2)),
+                          get_noise(8, derive_seed(5, 1, 2)))
+    assert np.array_equal(get_noise(8, derive_seed(5, 1, 2)), get_noise(8, derive_seed(5, 1, 2)))
+    assert not np.array_equal(get_noise(8, derive_seed(5, 1, 2)), get_noise(8, derive_seed(5, 2, 1)))
+    with pytest.raises(ValueError):
+        get_generator(0, "unknown")
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+@pytest.mark.parametrize('dtype', [np.float32, np.float64])
+@pytest.mark.parametrize('snr', [0, 20])
+def test_seeded_add_noise(tmp_path, test_file, dtype, snr):
+    """
+    Test that seeded noise injections are bit identical across calls and paths.
+    """
+    fs, sig = read_file(test_file)
+    y = ops.add_noise(sig, fs, snr, seed=7, dtype=dtype)
+
+    # check result
+    assert y.dtype == dtype
+    assert np.array_equal(y, ops.add_noise(sig, fs, snr, seed=7, dtype=dtype))
+    assert not np.array_equal(y, ops.add_noise(sig, fs, snr, seed=8, dtype=dtype))
+    measured = 10 * np.log10(np.mean(sig.astype(np.float64)**2) / np.mean((y - sig)**2))
+    assert np.isclose(measured, snr, atol=1e-3)
+
+    # a batch row and the chunked path draw the same noise from the same seed
+    assert np.array_equal(batch.add_noise(sig[None, :], fs, snr, seed=7, dtype=dtype)[0], y)
+    outfile = str(tmp_path / "out.wav")
+    chunked.add_noise(test_file, outfile, snr, block_size=1000, seed=7, dtype=dtype)
+    assert np.allclose(read_file(outfile)[1], y, atol=1e-4)
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+def test_seeded_random_cropping(tmp_path, test_file):
+    """
+    Test that seeded croppings are reproducible.
+    """
+    fs, sig = read_file(test_file)
+    y = ops.random_cropping(sig, fs, 1, seed=3)
+
+    # check result
+    assert y.size >= fs
+    assert np.array_equal(y, ops.random_cropping(sig, fs, 1, seed=3))
+
+    infile = str(tmp_path / "test.wav")
+    shutil.copy(test_file, infile)
+    random_cropping(infile, 1, seed=3)
+    assert np.array_equal(read_file(str(tmp_path / "test_augmented_randomly_cropped_1.wav"))[1], y)
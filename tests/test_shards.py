@@ -0,0 +1,102 @@
+################################################################################
+######################### tests for utils.shards ###############################
+################################################################################
+import shutil
+import pytest
+import numpy as np
+from pydiogment import augment_directory
+from pydiogment.auga import apply_gain, fade_in_and_out
+from pydiogment.pipeline import Pipeline
+from pydiogment.utils.io import read_file
+from pydiogment.utils.shards import ShardWriter, iter_shards
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+@pytest.mark.parametrize('max_count', [1, 3, None])
+def test_shard_writer(tmp_path, test_file, max_count):
+    """
+    Test packing clips into shards and reading them back in order.
+    """
+    fs, sig = read_file(test_file)
+    pattern = str(tmp_path / "shard-%04d.tar")
+    with ShardWriter(pattern, max_count=max_count) as writer:
+        for i in range(5):
+            writer.write("clip%d" % i, sig[:1000 * (i + 1)], fs, {"index": i})
+
+    # check result
+    assert len(writer.shards) == (1 if max_count is None else -(-5 // max_count))
+    samples = list(iter_shards(str(tmp_path / "shard-*.tar")))
+    assert [key for key, _, _, _ in samples] == ["clip%d" % i for i in range(5)]
+    for i, (_, fs_out, sig_out, params) in enumerate(samples):
+        assert fs_out == fs and params["index"] == i and params["n_samples"] == len(sig_out)
+        assert np.array_equal(sig_out, sig[:1000 * (i + 1)])
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+def test_shard_writer_write_file(tmp_path, test_file):
+    """
+    Test that augmentation outputs go to the shards inside a ShardWriter block.
+    """
+    pattern = str(tmp_path / "shard-%04d.tar")
+    with ShardWriter(pattern, max_size=200000) as writer:
+        apply_gain(test_file, -25)
+        apply_gain(test_file, -50)
+        fade_in_and_out(test_file)
+
+    # check result
+    assert len(writer.shards) == 3
+    keys = [key for key, _, _, _ in iter_shards(writer.shards)]
+    assert keys == ["test_augmented_with_-25_gain", "test_augmented_with_-50_gain",
+                    "test_augmented_fade_in_out"]
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+def test_shard_writer_params(tmp_path, test_file):
+    """
+    Test that the sidecars of a directory run hold the operations and parameters.
+    """
+    src = tmp_path / "src"
+    src.mkdir()
+    shutil.copy(test_file, str(src / "test.wav"))
+    recipe = [("apply_gain", {"gain": -6}),
+              (Pipeline().add("shift_time", tshift=1, direction="left").add("fade_in_and_out"), {})]
+    with ShardWriter(str(tmp_path / "shard-%04d.tar")) as writer:
+        results = augment_directory(str(src), str(tmp_path / "dst"), recipe, backend="thread")
+
+    # check result
+    assert not results[0].errors
+    params = [params for _, _, _, params in iter_shards(writer.shards)]
+    assert params[0]["operation"] == "apply_gain" and params[0]["params"] == {"gain": -6}
+    assert params[0]["name"] == "test_augmented_apply_gain_gain=-6.wav"
+    assert params[1]["operation"] == "pipeline"
+    assert params[1]["stages"] == [{"operation": "shift_time",
+                                    "params": {"tshift": 1, "direction": "left"}},
+                                   {"operation": "fade_in_and_out", "params": {}}]
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+@pytest.mark.parametrize('root', [True, False])
+def test_shard_writer_keys(tmp_path, test_file, root):
+    """
+    Test that outputs with the same name in different directories keep unique keys.
+    """
+    src, dst = tmp_path / "src", tmp_path / "dst"
+    for folder in "ab":
+        (src / folder).mkdir(parents=True)
+        shutil.copy(test_file, str(src / folder / "x.wav"))
+    with ShardWriter(str(tmp_path / "shard-%04d.tar"), root=str(dst) if root else None) as writer:
+        augment_directory(str(src), str(dst), [("apply_gain", {"gain": -3})], backend="thread",
+                          workers=1)
+        writer.write("x_augmented_apply_gain_gain=-3", *read_file(test_file)[::-1])
+
+    # check result
+    samples = [(key, params) for key, _, _, params in iter_shards(writer.shards)]
+    keys = [key for key, _ in samples]
+    assert len(set(keys)) == 3
+    if root:
+        assert keys[:2] == ["a/x_augmented_apply_gain_gain=-3", "b/x_augmented_apply_gain_gain=-3"]
+        assert [params["path"] for _, params in samples[:2]] == \
+            ["a/x_augmented_apply_gain_gain=-3.wav", "b/x_augmented_apply_gain_gain=-3.wav"]
+    else:
+        assert keys == ["x_augmented_apply_gain_gain=-3", "x_augmented_apply_gain_gain=-3_1",
+                        "x_augmented_apply_gain_gain=-3_2"]
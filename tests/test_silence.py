@@ -0,0 +1,98 @@
+################################################################################
+############################ tests for silence #################################
+################################################################################
+import shutil
+import pytest
+import numpy as np
+from tests.test_utils import assert_file_exists
+from pydiogment import ops
+from pydiogment.augt import eliminate_silence
+from pydiogment.utils.io import read_file
+from pydiogment.utils.silence import remove_silence, SilenceRemover
+
+
+def get_test_signal(fs):
+    # 0.5 s of tone, 0.5 s of silence, 0.2 s of tone, 0.2 s of silence, 0.1 s of tone
+    sig = np.zeros(int(1.5 * fs))
+    for start, stop in [(0, 0.5), (1.0, 1.2), (1.4, 1.5)]:
+        sig[int(start * fs):int(stop * fs)] = 0.5
+    sig *= np.sin(np.arange(len(sig)))
+    return sig
+
+
+@pytest.mark.parametrize('hangover', [0.0, 0.1])
+def test_remove_silence(hangover):
+    """
+    Test that only the silences longer than stop_duration are removed.
+    """
+    fs = 8000
+    sig = get_test_signal(fs)
+    y, with_silence_duration, no_silence_duration = remove_silence(sig, fs, hangover=hangover)
+
+    # check result
+    assert with_silence_duration == 1.5
+    assert np.isclose(no_silence_duration, 1.0 + hangover)
+    assert len(y) == int(round(no_silence_duration * fs))
+    assert np.array_equal(y, ops.eliminate_silence(sig, fs, hangover=hangover))
+
+    # batch
+    ys, with_silence_durations, no_silence_durations = remove_silence(np.stack([sig, sig[::-1]]), fs,
+                                                                      hangover=hangover)
+    assert np.array_equal(ys[0], y)
+    assert np.allclose(no_silence_durations, no_silence_duration)
+
+
+@pytest.mark.parametrize('block_size', [1, 100, 1234, 100000])
+def test_silence_remover(block_size):
+    """
+    Test that streaming gives the same result whatever the block size.
+    """
+    fs = 8000
+    sig = (get_test_signal(fs) * 2**15).astype(np.int16)
+    y, _, no_silence_duration = remove_silence(sig, fs)
+
+    remover = SilenceRemover(fs)
+    y_stream = np.concatenate(list(remover.stream(sig[i:i + block_size]
+                                                  for i in range(0, len(sig), block_size))))
+
+    # check result
+    assert np.array_equal(y_stream, y)
+    assert remover.no_silence_duration == no_silence_duration
+
+
+@pytest.mark.parametrize('block_size', [160, 1234])
+@pytest.mark.parametrize('scale', [1.0, 2**15])
+def test_silence_float_reference(block_size, scale):
+    """
+    Test that float signals, also beyond [-1, 1], use a fixed 0 dB level.
+    """
+    fs = 8000
+    sig = get_test_signal(fs) * scale
+    y, _, no_silence_duration = remove_silence(sig, fs)
+    remover = SilenceRemover(fs)
+    y_stream = np.concatenate(list(remover.stream(sig[i:i + block_size]
+                                                  for i in range(0, len(sig), block_size))))
+
+    # check result
+    assert np.array_equal(y_stream, y)
+    assert np.isclose(no_silence_duration, 1.0)
+    ys, _, _ = remove_silence(np.stack([sig, sig / 1000]), fs)
+    assert np.array_equal(ys[0], y)
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+def test_eliminate_silence_native(tmp_path, test_file):
+    """
+    Test the native eliminate_silence backend.
+    """
+    infile = str(tmp_path / "test.wav")
+    shutil.copy(test_file, infile)
+    with_silence_duration, no_silence_duration = eliminate_silence(infile, backend="native")
+
+    # check result
+    fname = str(tmp_path / "test_augmented_without_silence.wav")
+    assert_file_exists(fname)
+    fs, sig = read_file(test_file)
+    fs_out, y = read_file(fname)
+    assert with_silence_duration == len(sig) / fs
+    assert no_silence_duration == len(y) / fs
@@ -0,0 +1,113 @@
+################################################################################
+############################ tests for stretch #################################
+################################################################################
+import shutil
+import pytest
+import numpy as np
+from tests.test_utils import assert_file_exists
+from pydiogment import augf, augt, ops, sweep
+from pydiogment.pipeline import Pipeline
+from pydiogment.utils.io import read_file
+from pydiogment.utils.resample import get_filter
+from pydiogment.utils.stretch import time_stretch, pitch_shift
+
+
+def get_frequency(sig, fs):
+    spectrum = np.abs(np.fft.rfft(sig * np.hanning(len(sig))))
+    return np.argmax(spectrum) * fs / len(sig)
+
+
+@pytest.mark.parametrize('quality', ["fast", "medium", "high"])
+@pytest.mark.parametrize('rate', [0.8, 1.25, 1.5])
+def test_time_stretch(quality, rate):
+    """
+    Test that the tempo changes but the pitch and level do not.
+    """
+    fs = 16000
+    sig = np.sin(2 * np.pi * 440 * np.arange(2 * fs) / fs)
+    y = time_stretch(sig, fs, rate, quality)
+
+    # check result
+    assert len(y) == int(round(len(sig) / rate))
+    assert abs(get_frequency(y, fs) - 440) < 5
+    assert abs(np.sqrt(np.mean(y[fs // 10:-fs // 10]**2)) - np.sqrt(0.5)) < 0.05
+
+
+def test_time_stretch_batch():
+    """
+    Test that every row of a batch is stretched like a single signal.
+    """
+    fs = 8000
+    sigs = np.random.randn(3, fs)
+    y = time_stretch(sigs, fs, 0.8)
+
+    # check result
+    assert y.shape == (3, 10000)
+    for i in range(3):
+        assert np.allclose(y[i], time_stretch(sigs[i], fs, 0.8))
+
+    with pytest.raises(ValueError):
+        time_stretch(sigs, fs, 0.8, quality="best")
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+def test_native_backend(tmp_path, test_file):
+    """
+    Test the native slow_down and speed backends and their use in pipelines.
+    """
+    infile = str(tmp_path / "test.wav")
+    shutil.copy(test_file, infile)
+    augt.slow_down(infile, coefficient=0.8, backend="native")
+    augt.speed(infile, coefficient=1.25, backend="native")
+
+    # check result
+    fs, sig = read_file(test_file)
+    for name_attribute, n_samples in [("_augmented_slowed.wav", int(round(len(sig) / 0.8))),
+                                      ("_augmented_speeded.wav", int(round(len(sig) / 1.25)))]:
+        fname = str(tmp_path / ("test" + name_attribute))
+        assert_file_exists(fname)
+        y = read_file(fname)[1]
+        assert len(y) == n_samples and y.dtype == sig.dtype
+
+    y = Pipeline([(ops.speed, {"coefficient": 1.25})])(sig, fs)
+    assert len(y) == int(round(len(sig) / 1.25))
+
+
+@pytest.mark.parametrize('tone', [0.9, 1.1, 1.5])
+def test_pitch_shift(tone):
+    """
+    Test that the pitch changes by tone and the duration only without correction.
+    """
+    fs = 16000
+    sig = np.sin(2 * np.pi * 440 * np.arange(2 * fs) / fs)
+    y = pitch_shift(sig, fs, tone)
+    y_ffmpeg = pitch_shift(sig, fs, tone, preserve_duration=False)
+
+    # check result
+    assert len(y) == len(sig)
+    assert abs(len(y_ffmpeg) - len(sig) / tone) <= 1
+    assert abs(get_frequency(y, fs) - 440 * tone) < 5
+    assert abs(get_frequency(y_ffmpeg, fs) - 440 * tone) < 5
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+def test_change_tone_native(tmp_path, test_file):
+    """
+    Test the native change_tone backend and the reuse of the resampling filters.
+    """
+    infile = str(tmp_path / "test.wav")
+    shutil.copy(test_file, infile)
+    augf.change_tone(infile, tone=0.9, backend="native")
+
+    # check result
+    fs, sig = read_file(test_file)
+    fname = str(tmp_path / "test_augmented_0.9_toned.wav")
+    assert_file_exists(fname)
+    y = read_file(fname)[1]
+    assert len(y) == len(sig) and y.dtype == sig.dtype
+
+    hits = get_filter.cache_info().hits
+    y = sweep.change_tone(sig, fs, [0.9, 1.1])
+    assert y.shape == (2, len(sig))
+    assert get_filter.cache_info().hits > hits
+    assert np.allclose(y[1], ops.change_tone(sig, fs, 1.1))
@@ -0,0 +1,64 @@
+################################################################################
+############################# tests for sweep ##################################
+################################################################################
+import pytest
+import numpy as np
+from tests.test_utils import assert_file_exists
+from pydiogment import ops, sweep
+from pydiogment.utils.io import read_file, write_file
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+def test_sweeps(test_file):
+    """
+    Test the sweeps against the single variant operations.
+    """
+    fs, sig = read_file(test_file)
+    sig = sig / 2.0**15
+    gains, levels, tshifts = [-3, 0, 3, 10, 20], [-6, 0, 6], [0.5, 1, 2]
+    y_gain = sweep.apply_gain(sig, fs, gains)
+    y_norm = sweep.normalize(sig, fs, levels)
+    y_shift = sweep.shift_time(sig, fs, tshifts, "right")
+
+    # check result
+    for i, gain in enumerate(gains):
+        assert np.allclose(y_gain[i], ops.apply_gain(sig, fs, gain))
+    for i, level in enumerate(levels):
+        assert np.allclose(y_norm[i], ops.normalize(sig, fs, "rms", level))
+    for i, tshift in enumerate(tshifts):
+        assert np.array_equal(y_shift[i], ops.shift_time(sig, fs, tshift, "right"))
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+def test_sweep_add_noise(test_file):
+    """
+    Test the noise sweep reaches every snr.
+    """
+    fs, sig = read_file(test_file)
+    snrs = [0, 5, 10, 20]
+    ys = sweep.add_noise(sig, fs, snrs)
+
+    # check result
+    sig_power = np.mean(sig.astype(np.float64)**2)
+    assert np.allclose(10 * np.log10(sig_power / np.mean((ys - sig)**2, axis=1)), snrs)
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+def test_sweep_file(tmp_path, test_file):
+    """
+    Test writing one file per swept value.
+    """
+    # work on a copy of the test file
+    infile = str(tmp_path / "test.wav")
+    fs, sig = read_file(test_file)
+    write_file(str(tmp_path), test_file, ".wav", sig, fs)
+
+    sweep.sweep_file(infile, "apply_gain", [-100, -50])
+    sweep.sweep_file(infile, "shift_time", [1], direction="left")
+
+    # check result
+    assert_file_exists(str(tmp_path / "test_augmented_with_-100_gain.wav"))
+    assert_file_exists(str(tmp_path / "test_augmented_with_-50_gain.wav"))
+    assert_file_exists(str(tmp_path / "test_augmented_left_1_shifted.wav"))
+    with pytest.raises(ValueError):
+        sweep.sweep_file(infile, "reverse", [1])
@@ -2,9 +2,17 @@
 ####################### tests for utils.filters ################################
 ################################################################################
 import os
+import shutil
 import pytest
 import numpy as np
-from pydiogment.utils.filters import butter_filter
+from pydiogment.augf import apply_filter_bank
+from pydiogment.utils.filters import (butter_filter, butter_bandpass, get_cutoffs, get_sos,
+                                      BlockFilter, FilterBank)
+
+
+# skip the tests running the ffmpeg binary when it is not installed
+requires_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None,
+                                     reason="ffmpeg is not installed")
 
 
 def assert_file_exists(fname):
@@ -41,3 +49,87 @@ def test_filters(fs, low_cut, high_cut, filter_type, order):
 
     except Exception as e:
         print(e)
+
+
+@pytest.mark.parametrize('filter_type', ["low", "high", "band"])
+def test_filter_design_cache(filter_type):
+    """
+    Test that the designs are cached and that the samples axis can be chosen.
+    """
+    fs = 16000
+    x = np.random.randn(3, 4000)
+    y = butter_filter(x, fs, filter_type, 100, 1500, 5)
+    y_columns = butter_filter(x.T, fs, filter_type, 100, 1500, 5, axis=0)
+
+    # check result
+    assert np.allclose(y_columns.T, y)
+    assert np.allclose(y[1], butter_filter(x[1], fs, filter_type, 100, 1500, 5))
+    sos = get_sos(filter_type, get_cutoffs(filter_type, 100, 1500), fs, 5)
+    assert sos is get_sos(filter_type, get_cutoffs(filter_type, 100, 1500), fs, 5)
+
+    # the shared design is read-only and the block filter works on its own copy
+    assert not sos.flags.writeable
+    with pytest.raises(ValueError):
+        sos[0, 0] = 0.0
+    block_filter = BlockFilter.from_parameters(filter_type, fs, 100, 1500, 5)
+    assert np.allclose(np.concatenate([block_filter.process(x[1, :1000]),
+                                       block_filter.process(x[1, 1000:])]), y[1])
+
+
+@pytest.mark.parametrize('method', ["iir", "fft", "auto"])
+@pytest.mark.parametrize('order', [3, 8])
+def test_filter_bank(method, order):
+    """
+    Test the filter bank against the single filters.
+    """
+    fs = 16000
+    x = np.random.randn(20000)
+    bands = [("low", 500, None), ("high", None, 4000), ("band", 300, 3000), ("band", 1000, 2000)]
+    y = FilterBank(bands, order, method).apply(x, fs)
+
+    # check result
+    assert y.shape == (4, len(x))
+    for i, (ftype, low_cut, high_cut) in enumerate(bands):
+        assert np.allclose(y[i], butter_filter(x, fs, ftype, low_cut, high_cut, order), atol=1e-4)
+    with pytest.raises(ValueError):
+        FilterBank(bands, order, "fir")
+
+
+@pytest.mark.parametrize('test_file', ['tests/testfiles/test.wav'])
+def test_apply_filter_bank(tmp_path, test_file):
+    """
+    Test the filter bank file outputs.
+    """
+    test_file = str(tmp_path / os.path.basename(test_file))
+    shutil.copy('tests/testfiles/test.wav', test_file)
+    bank = FilterBank([("low", 500, None), ("band", 300, 3000), ("band", 1000, 2000)])
+    apply_filter_bank(test_file, bank)
+
+    # check result
+    for name_attribute in ["_augmented_low_pass_filtered_500.wav",
+                           "_augmented_band_pass_filtered_300_3000.wav",
+                           "_augmented_band_pass_filtered_1000_2000.wav"]:
+        assert_file_exists(test_file.split(".wav")[0] + name_attribute)
+
+
+@pytest.mark.parametrize('output', ["sos", "ba"])
+@pytest.mark.parametrize('block_size', [1, 333, 5000])
+def test_block_filter(output, block_size):
+    """
+    Test that the block filter output matches the one-shot filter for 1-D and 2-D blocks.
+    """
+    fs = 16000
+    x = np.random.randn(3, 10000)
+    coefficients = butter_bandpass(300, 3000, fs, 5, output=output)
+    block_filter = BlockFilter(coefficients if output == "sos" else tuple(coefficients))
+    y = np.concatenate(list(block_filter.stream(x[0, i:i + block_size]
+                                                for i in range(0, x.shape[1], block_size))))
+
+    # check result
+    assert np.allclose(y, butter_filter(x[0], fs, "band", 300, 3000, 5))
+
+    # samples along the first axis of blocks with 3 columns
+    block_filter = BlockFilter(coefficients if output == "sos" else tuple(coefficients), axis=0)
+    y = np.concatenate(list(block_filter.stream(x.T[i:i + block_size]
+                                                for i in range(0, x.shape[1], block_size))))
+    assert np.allclose(y.T, butter_filter(x, fs, "band", 300, 3000, 5))